@@ -1,15 +1,30 @@
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import SystemMessage
-from models.llm_generator import build_llm
+from models.llm_generator import get_llm
 from agents.tools_define import get_weather_tool, get_flights_tool, get_visa_requirements_tool
+from agents.vectorDB_tool import search_knowledge_base_tool
+from agents.parallel_executor import ParallelAgentExecutor
+import os
 
-def create_agent():
+# AGENT_PARALLEL_TOOLS=0 runs the tool calls of a turn one after another, as AgentExecutor does
+PARALLEL_TOOLS = os.getenv("AGENT_PARALLEL_TOOLS", "1") != "0"
+# seconds; visa lookups have their own 45s source deadline plus extraction
+TOOL_TIMEOUTS = {
+    'get_visa_requirements_tool': 75,
+    'get_weather_tool': 20,
+    'get_flights_tool': 40,
+    'search_knowledge_base_tool': 30,  # the first call also loads the embedding model
+}
+DEFAULT_TOOL_TIMEOUT = 60
+
+def create_agent(parallel_tools: bool = PARALLEL_TOOLS):
 
     tools = [
         get_visa_requirements_tool,
         get_weather_tool,
-        get_flights_tool
+        get_flights_tool,
+        search_knowledge_base_tool
     ]
 
     prompt = ChatPromptTemplate.from_messages(
@@ -34,15 +49,25 @@ def create_agent():
         ]
     )
 
-    llm = build_llm()
+    llm = get_llm()
 
     agent = create_tool_calling_agent(llm, tools, prompt)
 
-    agent_executor = AgentExecutor(
-        agent=agent,
-        tools=tools,
-        verbose=True,
-        handle_parsing_errors=True
-    )
+    if parallel_tools:
+        agent_executor = ParallelAgentExecutor(
+            agent=agent,
+            tools=tools,
+            verbose=True,
+            handle_parsing_errors=True,
+            tool_timeouts=TOOL_TIMEOUTS,
+            default_tool_timeout=DEFAULT_TOOL_TIMEOUT
+        )
+    else:
+        agent_executor = AgentExecutor(
+            agent=agent,
+            tools=tools,
+            verbose=True,
+            handle_parsing_errors=True
+        )
 
     return agent_executor
\ No newline at end of file
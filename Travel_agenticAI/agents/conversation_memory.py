@@ -0,0 +1,125 @@
+# Keeps the prompt history of a chat session under a token budget: recent turns verbatim, older ones as a summary
+import os
+from typing import List, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from tools.page_pruner import count_tokens
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("CHAT_MEMORY_TOKEN_BUDGET", "2000"))
+MEMORY_RECENT_TURNS = int(os.getenv("CHAT_MEMORY_RECENT_TURNS", "3"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("CHAT_MEMORY_SUMMARY_TOKENS", "300"))
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a traveller and an AI travel agent.
+Keep every concrete fact the agent may need later: origin and destination, dates, passport country,
+budget, preferences, and any visa, weather or flight details already found. Drop greetings and filler.
+Stay under {max_words} words.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{lines}
+
+Updated summary:"""
+
+
+def message_tokens(message: BaseMessage) -> int:
+    # +4 for the role and separators the chat format adds per message
+    return count_tokens(str(message.content)) + 4
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """A turn starts at each human message, anything before the first one (the greeting) is its own turn"""
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class ConversationMemory:
+    """
+    Per-session view of the chat history that is sent to the agent.
+    Nothing is summarized until summary plus verbatim turns exceed token_budget, then the oldest turns
+    (never the last recent_turns) are folded into the summary until they are back under half the budget,
+    so the summarizer runs once every few turns rather than on every turn.
+    """
+
+    def __init__(self, llm=None, token_budget: int = MEMORY_TOKEN_BUDGET, recent_turns: int = MEMORY_RECENT_TURNS,
+                 summary_token_budget: int = SUMMARY_TOKEN_BUDGET):
+        self._llm = llm
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary_token_budget = summary_token_budget
+        self.summary = ""
+        self.folded_messages = 0  # how many messages from the start of the history the summary covers
+        self.summarizations = 0
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from models.llm_generator import get_llm
+            self._llm = get_llm(temperature=0)
+        return self._llm
+
+    def _summary_message(self) -> Optional[SystemMessage]:
+        if not self.summary:
+            return None
+        return SystemMessage(content=f"Summary of the earlier conversation:\n{self.summary}")
+
+    def prompt_history(self, history: List[BaseMessage]) -> List[BaseMessage]:
+        """What to pass as chat_history: the summary (if any) followed by the turns it doesn't cover"""
+        summary_message = self._summary_message()
+        recent = list(history[self.folded_messages:])
+        return ([summary_message] if summary_message else []) + recent
+
+    def prompt_tokens(self, history: List[BaseMessage]) -> int:
+        return sum(message_tokens(message) for message in self.prompt_history(history))
+
+    def compact(self, history: List[BaseMessage]) -> bool:
+        """Fold old turns into the summary once the prompt history is over budget, True when a summary was made"""
+        turns = split_turns(history[self.folded_messages:])
+        turn_tokens = [sum(message_tokens(m) for m in turn) for turn in turns]
+        summary_message = self._summary_message()
+        # the summary is re-sent every turn, so it counts against the budget too
+        remaining = sum(turn_tokens) + (message_tokens(summary_message) if summary_message else 0)
+        if remaining <= self.token_budget:
+            return False
+
+        foldable = max(len(turns) - self.recent_turns, 0)
+        fold = 0
+        while fold < foldable and remaining > self.token_budget // 2:
+            remaining -= turn_tokens[fold]
+            fold += 1
+        if fold == 0:
+            return False
+
+        to_fold = [message for turn in turns[:fold] for message in turn]
+        try:
+            self.summary = self._summarize(to_fold)
+        except Exception as e:
+            # keep the turns verbatim and try again next turn
+            print(f"Error summarizing conversation history: {e}")
+            return False
+        self.folded_messages += len(to_fold)
+        self.summarizations += 1
+        return True
+
+    def _summarize(self, messages: List[BaseMessage]) -> str:
+        lines = '\n'.join(
+            f"{'Traveller' if isinstance(m, HumanMessage) else 'Agent'}: {m.content}" for m in messages
+        )
+        prompt = SUMMARY_PROMPT.format(
+            max_words=int(self.summary_token_budget * 0.75),
+            summary=self.summary or "(none yet)",
+            lines=lines
+        )
+        summary = str(self.llm.invoke(prompt).content).strip()
+        # the model doesn't always respect the length, keep the cap hard
+        while summary and count_tokens(summary) > self.summary_token_budget:
+            summary = summary[:int(len(summary) * 0.9)]
+        return summary
+
+    def reset(self):
+        self.summary = ""
+        self.folded_messages = 0
@@ -0,0 +1,114 @@
+# AgentExecutor that runs the tool calls of one model turn concurrently, each under its own timeout
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, Optional, Union
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+
+# the agent is cached per process, so every chat session shares this pool; threads are only
+# started on demand, and a timed-out tool that keeps its thread (Selenium, up to 45s) leaves the rest free
+TOOL_POOL_WORKERS = int(os.getenv("AGENT_TOOL_WORKERS", "32"))
+# name of the custom event the async path dispatches when a tool call is abandoned, see agents/streaming.py
+TOOL_TIMEOUT_EVENT = "tool_timeout"
+
+
+@lru_cache(maxsize=None)
+def _tool_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Shared by every executor with the same tool_pool_workers, the agent itself lives for the whole process"""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-tool")
+
+
+class _PendingStep:
+    """A submitted tool call, its timeout only starts counting once a pool thread picks it up"""
+
+    def __init__(self, agent_action: AgentAction, timeout: Optional[float]):
+        self.agent_action = agent_action
+        self.timeout = timeout
+        self.future: Optional[Future] = None
+        self.started = threading.Event()
+        self.started_at = None
+
+    def run(self, fn, *args):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return fn(*args)
+
+
+def _timeout_observation(tool_name: str, timeout: float) -> str:
+    return f"Error: {tool_name} did not finish within {timeout:.0f} seconds. Answer without it and say this information is unavailable."
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor whose steps take as long as the slowest tool call instead of the sum of all of them.
+    Observations are still handed back to the model in the order the calls were made.
+    A call that exceeds its timeout is reported to the model as an error observation.
+    """
+
+    tool_timeouts: Dict[str, float] = {}
+    default_tool_timeout: Optional[float] = 60
+    tool_pool_workers: int = TOOL_POOL_WORKERS
+
+    def _tool_timeout(self, tool_name: str) -> Optional[float]:
+        return self.tool_timeouts.get(tool_name, self.default_tool_timeout)
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        # called once per action by AgentExecutor._iter_next_step, submit instead of running inline
+        # so every call of the turn is in flight before the first result is awaited
+        context = contextvars.copy_context()
+        pending = _PendingStep(agent_action, self._tool_timeout(agent_action.tool))
+        pending.future = _tool_pool(self.tool_pool_workers).submit(
+            context.run, pending.run, super()._perform_agent_action, name_to_tool_map, color_mapping, agent_action, run_manager
+        )
+        return pending
+
+    def _resolve(self, pending: _PendingStep) -> AgentStep:
+        if not pending.timeout:
+            return pending.future.result()
+        # waiting for a free thread gets its own allowance, a call stuck in the queue is reported
+        # as timed out without having run instead of eating into the time of the call itself
+        if pending.started.wait(pending.timeout):
+            remaining = pending.started_at + pending.timeout - time.monotonic()
+            try:
+                return pending.future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                pass
+        # a running tool can't be interrupted, it finishes in the background and its result is dropped;
+        # one still queued is cancelled and never runs
+        pending.future.cancel()
+        print(f"Tool {pending.agent_action.tool} timed out after {pending.timeout}s"
+              f"{'' if pending.started.is_set() else ' waiting for a free worker'}")
+        return AgentStep(action=pending.agent_action, observation=_timeout_observation(pending.agent_action.tool, pending.timeout))
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps,
+                        run_manager=None) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending = []
+        for item in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(item, _PendingStep):
+                pending.append(item)
+            else:
+                yield item
+        for item in pending:
+            yield self._resolve(item)
+
+    async def _aperform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None) -> AgentStep:
+        # the async path already gathers the calls of a turn, only the timeout is added here
+        timeout = self._tool_timeout(agent_action.tool)
+        step = super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        if not timeout:
+            return await step
+        try:
+            return await asyncio.wait_for(step, timeout)
+        except asyncio.TimeoutError:
+            print(f"Tool {agent_action.tool} timed out after {timeout}s")
+            # the cancelled tool never reports on_tool_end, tell astream_events consumers it is gone
+            if run_manager is not None:
+                await run_manager.get_child().on_custom_event(
+                    TOOL_TIMEOUT_EVENT, {'tool': agent_action.tool, 'timeout': timeout}
+                )
+            return AgentStep(action=agent_action, observation=_timeout_observation(agent_action.tool, timeout))
@@ -0,0 +1,97 @@
+# Turns the agent's astream_events into a plain generator the Streamlit script can iterate over
+import queue
+import asyncio
+import threading
+import contextvars
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+from agents.parallel_executor import TOOL_TIMEOUT_EVENT
+
+TOOL_LABELS = {
+    'get_visa_requirements_tool': "Checking visa requirements…",
+    'get_weather_tool': "Fetching the weather forecast…",
+    'get_flights_tool': "Searching for flights…",
+    'search_knowledge_base_tool': "Searching the travel knowledge base…",
+}
+
+_DONE = object()
+
+
+@dataclass
+class AgentEvent:
+    """kind is one of 'tool_start', 'tool_end', 'tool_failed', 'token', 'final' or 'error'"""
+    kind: str
+    text: str = ""
+    tool: Optional[str] = None
+    data: Any = None
+
+
+def tool_label(tool_name: str) -> str:
+    return TOOL_LABELS.get(tool_name, f"Running {tool_name}…")
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, 'content', chunk)
+    if isinstance(content, str):
+        return content
+    # content blocks, keep only the text parts
+    if isinstance(content, list):
+        return ''.join(block.get('text', '') if isinstance(block, dict) else str(block) for block in content)
+    return ''
+
+
+async def _produce(agent_executor, inputs: Dict[str, Any], events: queue.Queue):
+    # run_id -> tool name; a tool cancelled by its timeout never sends on_tool_end,
+    # a bare counter would then stay above zero and hold back every later token
+    running_tools = {}
+    final_output = None
+    try:
+        async for event in agent_executor.astream_events(inputs, version="v2"):
+            kind = event['event']
+            if kind == 'on_tool_start':
+                running_tools[event['run_id']] = event['name']
+                events.put(AgentEvent('tool_start', tool_label(event['name']), event['name'], event['data'].get('input')))
+            elif kind == 'on_tool_end':
+                running_tools.pop(event['run_id'], None)
+                events.put(AgentEvent('tool_end', tool_label(event['name']), event['name'], event['data'].get('output')))
+            elif kind == 'on_tool_error':
+                running_tools.pop(event['run_id'], None)
+                events.put(AgentEvent('tool_failed', tool_label(event['name']), event['name'], event['data'].get('error')))
+            elif kind == 'on_custom_event' and event['name'] == TOOL_TIMEOUT_EVENT:
+                tool = event['data']['tool']
+                run_id = next((run_id for run_id, name in running_tools.items() if name == tool), None)
+                if run_id is not None:
+                    del running_tools[run_id]
+                events.put(AgentEvent('tool_failed', tool_label(tool), tool, event['data']))
+            elif kind == 'on_chat_model_stream' and not running_tools:
+                # models called from inside a tool (visa extraction) are not part of the answer
+                text = _chunk_text(event['data'].get('chunk'))
+                if text:
+                    events.put(AgentEvent('token', text))
+            elif kind == 'on_chain_end' and not event.get('parent_ids'):
+                output = event['data'].get('output')
+                final_output = output.get('output') if isinstance(output, dict) else output
+        events.put(AgentEvent('final', final_output if isinstance(final_output, str) else str(final_output or '')))
+    except Exception as e:
+        events.put(AgentEvent('error', str(e), data=e))
+    finally:
+        events.put(_DONE)
+
+
+def stream_agent_events(agent_executor, inputs: Dict[str, Any]) -> Iterator[AgentEvent]:
+    """
+    Runs the agent on its own event loop in a worker thread and yields events as they arrive,
+    so the (synchronous) Streamlit script can render them immediately.
+    The last event is always 'final' or 'error'.
+    """
+    events = queue.Queue()
+    # copied context: spans recorded by the agent belong to the caller's trace
+    context = contextvars.copy_context()
+    worker = threading.Thread(target=lambda: context.run(asyncio.run, _produce(agent_executor, inputs, events)), daemon=True)
+    worker.start()
+    while True:
+        event = events.get()
+        if event is _DONE:
+            # no join: asyncio.run would hold the thread until any timed-out tool thread finishes
+            break
+        yield event
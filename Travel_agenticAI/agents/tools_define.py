@@ -1,10 +1,26 @@
 from langchain.tools import tool
-from tools.api_caller import APICaller
 import json
-from tools.web_scrapper import LLMWebScrapper
+import threading
+from tools.telemetry import span
 
-api_caller = APICaller()
-web_scrapper = LLMWebScrapper()
+# Backends are built on first use and shared by every session in the process.
+# Importing this module stays cheap: no airport table, Selenium or LLM client until a tool runs.
+_backends = {}
+_backends_lock = threading.Lock()
+
+def _get_backend(name, factory):
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = factory()
+        return _backends[name]
+
+def get_api_caller():
+    from tools.api_caller import APICaller
+    return _get_backend('api_caller', APICaller)
+
+def get_web_scrapper():
+    from tools.web_scrapper import LLMWebScrapper
+    return _get_backend('web_scrapper', LLMWebScrapper)
 
 @tool
 def get_weather_tool (city: str) ->str:
@@ -13,7 +29,8 @@ def get_weather_tool (city: str) ->str:
     Use this for any questions about weather conditions.
     Input should be a single city name (e.g. 'Paris').
     """
-    weather_data = api_caller.get_weather_forecast(city=city)
+    with span("get_weather_tool", kind="tool", city=city):
+        weather_data = get_api_caller().get_weather_forecast(city=city)
     return json.dumps(weather_data)
 
 @tool
@@ -23,7 +40,8 @@ def get_flights_tool(origin_city: str, dest_city: str) -> str:
     Use this for any questions about finding flights.
     Input should be two city names separated by a comma (e.g. 'New Delhi, London').
     """
-    flight_data = api_caller.plan_flights(origin_place=origin_city, dest_place=dest_city)
+    with span("get_flights_tool", kind="tool", origin=origin_city, destination=dest_city):
+        flight_data = get_api_caller().plan_flights(origin_place=origin_city, dest_place=dest_city)
     return json.dumps(flight_data)
 
 @tool
@@ -35,5 +53,8 @@ def get_visa_requirements_tool (dest_country: str, passport_country: str) -> str
     """
     if not passport_country:
         passport_country = "India"
-    visa_data = web_scrapper.scrape_visa_requirements(destination_country=dest_country, passport_country=passport_country)
+    with span("get_visa_requirements_tool", kind="tool", destination=dest_country, passport=passport_country) as current:
+        visa_data = get_web_scrapper().scrape_visa_requirements(destination_country=dest_country, passport_country=passport_country)
+        if current is not None:
+            current.set(cache_hit=bool(visa_data.get('cache_hit')))
     return json.dumps(visa_data)
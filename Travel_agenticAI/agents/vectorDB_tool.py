@@ -0,0 +1,275 @@
+# Knowledge-base search over the Chroma collection built by seed_database.py
+import os
+import json
+import time
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Union
+from langchain.tools import tool
+
+CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "chroma_db")
+CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "langchain")  # langchain_chroma's default collection name
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+KB_TOP_K = 3              # hybrid ranking is precise enough that a small k is sufficient
+KB_FETCH_K = 20           # candidates pulled from each index before thresholding / fusion / MMR
+KB_HYBRID = os.getenv("KB_HYBRID", "1") != "0"
+# 'memmap' searches the quantized copy written by seed_database.py --memmap instead of Chroma's HNSW index
+KB_VECTOR_BACKEND = os.getenv("KB_VECTOR_BACKEND", "chroma")
+KB_MIN_SIMILARITY = float(os.getenv("KB_MIN_SIMILARITY", "0.3"))
+KB_MMR_LAMBDA = 0.5       # 1 = pure relevance, 0 = pure diversity
+SNIPPET_CHARS = 500
+
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """Loaded on the first query, the model takes a few seconds and ~90MB"""
+    from langchain_community.embeddings import SentenceTransformerEmbeddings
+    from tools.embedding_cache import CachedEmbeddings, EMBEDDING_CACHE_ENABLED
+    embedder = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
+    # repeated queries (and ones seen in earlier sessions) skip the model
+    return CachedEmbeddings(embedder, EMBEDDING_MODEL) if EMBEDDING_CACHE_ENABLED else embedder
+
+
+@lru_cache(maxsize=1)
+def get_collection():
+    import chromadb
+    client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+    return client.get_collection(CHROMA_COLLECTION)
+
+
+def _similarity(distance: float, space: str) -> float:
+    # MiniLM embeddings are unit length, so every metric maps onto cosine similarity
+    if space == 'l2':
+        return 1 - distance / 2
+    return 1 - distance
+
+
+def _snippet(text: str, max_chars: int = SNIPPET_CHARS) -> str:
+    text = ' '.join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(' ', 0, max_chars)
+    return text[:cut if cut > 0 else max_chars] + '…'
+
+
+_memmap_lock = threading.Lock()
+_memmap_cache = {'version': None, 'store': None}
+
+
+def get_memmap_store():
+    """
+    None when the backend is not enabled or the store hasn't been built.
+    MemmapVectorStore.build swaps in a new directory, a changed meta.json (inode / mtime) means a re-seed
+    happened and the store is reopened; searches still running on the old one keep their mapped files.
+    """
+    from tools.vector_store import MEMMAP_STORE_DIR, MemmapVectorStore
+    if KB_VECTOR_BACKEND != 'memmap':
+        return None
+    try:
+        meta = os.stat(os.path.join(MEMMAP_STORE_DIR, 'meta.json'))
+    except FileNotFoundError:
+        return None
+    version = (meta.st_ino, meta.st_mtime_ns)
+    with _memmap_lock:
+        if _memmap_cache['version'] != version:
+            try:
+                _memmap_cache['store'] = MemmapVectorStore(MEMMAP_STORE_DIR)
+            except FileNotFoundError:
+                # caught in the middle of a swap, keep the current store until the next query
+                return _memmap_cache['store']
+            _memmap_cache['version'] = version
+        return _memmap_cache['store']
+
+
+@lru_cache(maxsize=1)
+def get_bm25_index():
+    """None until seed_database.py has built the lexical index"""
+    from tools.bm25_index import BM25Index, BM25_DB
+    return BM25Index(BM25_DB) if os.path.exists(BM25_DB) else None
+
+
+class KnowledgeBase:
+    """
+    Hybrid retrieval: MiniLM similarity (with a similarity floor) and BM25 rankings fused by reciprocal rank,
+    falling back to dense top-k or MMR when there is no BM25 index. Returns short snippets with their source.
+    """
+
+    def __init__(self, embedder=None, collection=None, bm25=None, hybrid: bool = KB_HYBRID, vector_store=None):
+        self._embedder = embedder
+        self._collection = collection
+        self._bm25 = bm25
+        self._vector_store = vector_store
+        self.hybrid = hybrid
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.total_seconds = 0.0
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection()
+        return self._collection
+
+    @property
+    def vector_store(self):
+        # not kept on the instance, so a store rebuilt by seed_database.py --memmap is picked up
+        return self._vector_store if self._vector_store is not None else get_memmap_store()
+
+    @property
+    def bm25(self):
+        if self._bm25 is None and self.hybrid:
+            self._bm25 = get_bm25_index()
+        return self._bm25
+
+    def search(self, query: str, k: int = KB_TOP_K, mmr: bool = True,
+               min_similarity: float = KB_MIN_SIMILARITY) -> List[Dict[str, Any]]:
+        return self.search_many([query], k=k, mmr=mmr, min_similarity=min_similarity)[0]
+
+    def search_many(self, queries: List[str], k: int = KB_TOP_K, mmr: bool = True,
+                    min_similarity: float = KB_MIN_SIMILARITY) -> List[List[Dict[str, Any]]]:
+        """One embedding batch and one index query for all queries, results in the same order"""
+        start = time.perf_counter()
+        query_embeddings = self.embedder.embed_documents(queries)
+        embed_time = time.perf_counter() - start
+
+        bm25 = self.bm25 if self.hybrid else None
+        # with fusion the dense side is only one of two rankings, MMR is skipped
+        mmr = mmr and bm25 is None
+        n_results = max(KB_FETCH_K if mmr or bm25 is not None else k, k)
+        vector_store = self.vector_store
+        if vector_store is not None:
+            dense = self._memmap_candidates(vector_store, query_embeddings, n_results, mmr)
+        else:
+            dense = self._chroma_candidates(query_embeddings, n_results, mmr)
+
+        results = []
+        for i, query_embedding in enumerate(query_embeddings):
+            candidates = [c for c in dense[i] if c['similarity'] >= min_similarity]
+
+            if mmr and len(candidates) > k:
+                from langchain_core.vectorstores.utils import maximal_marginal_relevance
+                import numpy as np
+                picked = maximal_marginal_relevance(
+                    np.array(query_embedding), [c['embedding'] for c in candidates], lambda_mult=KB_MMR_LAMBDA, k=k
+                )
+                candidates = [candidates[p] for p in picked]
+
+            if bm25 is not None:
+                candidates = self._fuse(bm25, queries[i], candidates, k)
+
+            results.append([
+                {
+                    'snippet': _snippet(c['document']),
+                    'source': os.path.basename(c['metadata'].get('source', 'unknown')),
+                    'similarity': round(float(c['similarity']), 3) if c['similarity'] is not None else None
+                }
+                for c in candidates[:k]
+            ])
+
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.queries += len(queries)
+            self.total_seconds += elapsed
+        print(f"Knowledge base: {len(queries)} quer{'y' if len(queries) == 1 else 'ies'} in {elapsed * 1000:.1f} ms "
+              f"(embedding {embed_time * 1000:.1f} ms)")
+        return results
+
+    def _chroma_candidates(self, query_embeddings, n_results: int, with_embeddings: bool) -> List[List[Dict[str, Any]]]:
+        include = ['documents', 'metadatas', 'distances'] + (['embeddings'] if with_embeddings else [])
+        raw = self.collection.query(query_embeddings=query_embeddings, n_results=n_results, include=include)
+        space = (self.collection.metadata or {}).get('hnsw:space', 'l2')
+        return [
+            [
+                {
+                    'id': raw['ids'][i][j],
+                    'document': document,
+                    'metadata': raw['metadatas'][i][j] or {},
+                    'similarity': _similarity(raw['distances'][i][j], space),
+                    'embedding': raw['embeddings'][i][j] if with_embeddings else None
+                }
+                for j, document in enumerate(raw['documents'][i])
+            ]
+            for i in range(len(query_embeddings))
+        ]
+
+    def _memmap_candidates(self, vector_store, query_embeddings, n_results: int,
+                           with_embeddings: bool) -> List[List[Dict[str, Any]]]:
+        hits = vector_store.search(query_embeddings, k=n_results)
+        # vectors come from the memmap, text and metadata still from the Chroma sqlite
+        wanted = list({chunk_id for query_hits in hits for chunk_id, _ in query_hits})
+        stored = self.collection.get(ids=wanted, include=['documents', 'metadatas']) if wanted else {'ids': []}
+        records = {chunk_id: (stored['documents'][n], stored['metadatas'][n] or {}) for n, chunk_id in enumerate(stored['ids'])}
+        candidates = []
+        for query_hits in hits:
+            ids = [chunk_id for chunk_id, _ in query_hits if chunk_id in records]
+            vectors = vector_store.get_vectors(ids) if with_embeddings and ids else None
+            candidates.append([
+                {
+                    'id': chunk_id,
+                    'document': records[chunk_id][0],
+                    'metadata': records[chunk_id][1],
+                    'similarity': score,
+                    'embedding': vectors[n] if vectors is not None else None
+                }
+                for n, (chunk_id, score) in enumerate((hit for hit in query_hits if hit[0] in records))
+            ])
+        return candidates
+
+    def _fuse(self, bm25, query: str, dense: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion of the dense candidates and the BM25 top hits"""
+        from tools.bm25_index import reciprocal_rank_fusion
+        lexical = [chunk_id for chunk_id, _ in bm25.search(query, KB_FETCH_K)]
+        fused = reciprocal_rank_fusion([[c['id'] for c in dense], lexical])[:k]
+
+        by_id = {c['id']: c for c in dense}
+        lexical_only = bm25.get([chunk_id for chunk_id, _ in fused if chunk_id not in by_id])
+        results = []
+        for chunk_id, _ in fused:
+            if chunk_id in by_id:
+                results.append(by_id[chunk_id])
+            elif chunk_id in lexical_only:
+                document, metadata = lexical_only[chunk_id]
+                results.append({'id': chunk_id, 'document': document, 'metadata': metadata, 'similarity': None})
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'name': 'knowledge_base',
+            'queries': self.queries,
+            'avg_ms': round(1000 * self.total_seconds / self.queries, 2) if self.queries else 0.0
+        }
+
+
+@lru_cache(maxsize=1)
+def get_knowledge_base() -> KnowledgeBase:
+    from tools.telemetry import register_stats
+    knowledge_base = KnowledgeBase()
+    register_stats("retrieval", "knowledge_base", knowledge_base.stats)
+    return knowledge_base
+
+
+@tool
+def search_knowledge_base_tool(query: str) -> str:
+    """
+    Searches the travel knowledge base for destination guides, travel tips and cultural information.
+    Use this for general questions about a place (what to see, customs, safety, food, getting around).
+    Input should be a short search query (e.g. 'things to do in Barcelona').
+    """
+    from tools.telemetry import span
+    try:
+        with span("search_knowledge_base_tool", kind="tool", query=query) as current:
+            results = get_knowledge_base().search(query)
+            if current is not None:
+                current.set(results=len(results))
+    except Exception as e:
+        return json.dumps({"error": f"Knowledge base unavailable: {e}"})
+    if not results:
+        return json.dumps({"results": [], "note": "Nothing relevant in the knowledge base."})
+    return json.dumps({"results": results}, ensure_ascii=False)
@@ -0,0 +1,57 @@
+# Micro-benchmark: linear airportsdata scan vs the prebuilt AirportIndex
+# Run from the Travel_agenticAI directory: python -m benchmarks.bench_airport_lookup
+import time
+import airportsdata
+from tools.airport_index import AirportIndex
+
+QUERIES = ["delhi", "london", "paris", "mumbai", "new york", "bengalore", "tokyo", "kuala lumpur", "nice", "zurich"]
+ROUNDS = 50
+
+
+def linear_scan(airports, city, country=None, max_results=3):
+    """The original APICaller.get_iata_codes_for_city implementation"""
+    matching_airports = []
+    for iata_code, airport_data in airports.items():
+        if (city.lower() in airport_data.get('city', '').lower() or
+                city.lower() in airport_data.get('name', '').lower()):
+            if country and country.lower() != airport_data.get('country', '').lower():
+                continue
+            matching_airports.append({
+                'airport_name': airport_data.get('name'),
+                'iata_code': iata_code,
+                'city': airport_data.get('city'),
+                'country': airport_data.get('country')
+            })
+            if len(matching_airports) >= max_results:
+                break
+    return matching_airports
+
+
+def time_per_lookup(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES))
+
+
+if __name__ == "__main__":
+    airports = airportsdata.load('IATA')
+
+    start = time.perf_counter()
+    index = AirportIndex(airports)
+    build_time = time.perf_counter() - start
+
+    scan_time = time_per_lookup(lambda q: linear_scan(airports, q))
+    index_time = time_per_lookup(lambda q: index.search(q))
+
+    print(f"airports loaded:        {len(airports)}")
+    print(f"index build (one-off):  {build_time * 1000:.1f} ms")
+    print(f"linear scan per lookup: {scan_time * 1e6:.1f} us")
+    print(f"index per lookup:       {index_time * 1e6:.1f} us")
+    print(f"speed-up:               {scan_time / index_time:.1f}x")
+    print()
+    for query in QUERIES:
+        scan_codes = [a['iata_code'] for a in linear_scan(airports, query)]
+        index_codes = [a['iata_code'] for a in index.search(query)]
+        print(f"{query:>14}: scan={scan_codes} index={index_codes}")
@@ -0,0 +1,64 @@
+# Before/after token counts and extraction latency for the visa page pruner
+# Run from the Travel_agenticAI directory:
+#   python -m benchmarks.bench_page_pruning           token counts and prune time only
+#   python -m benchmarks.bench_page_pruning --llm     also time structured_visa_llm on both inputs (needs Azure creds)
+import sys
+import glob
+import time
+from bs4 import BeautifulSoup
+from tools.page_pruner import prune_page_text, count_tokens, PRUNE_TOKEN_BUDGET
+
+FIXTURES = {
+    "benchmarks/fixtures/visaindex_france_visa.html": ("India", "France"),
+    "benchmarks/fixtures/visaindex_result_india_united_kingdom.html": ("India", "United Kingdom"),
+}
+
+PROMPT = """
+Extract visa requirement information for {origin} citizens traveling to {dest} from this webpage content:
+
+{content}
+"""
+
+
+def full_text(html: str) -> str:
+    """What the scraper sent to the LLM before pruning"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style', 'nav', 'footer']):
+        element.decompose()
+    return soup.get_text(separator='\n', strip=True)
+
+
+def time_extraction(structured_llm, origin, dest, content):
+    start = time.perf_counter()
+    structured_llm.invoke(PROMPT.format(origin=origin, dest=dest, content=content))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with_llm = "--llm" in sys.argv
+    structured_llm = None
+    if with_llm:
+        from models.llm_generator import build_llm
+        from data.visa_data_class import ExtractedVisaInfo
+        structured_llm = build_llm().with_structured_output(ExtractedVisaInfo)
+
+    print(f"token budget: {PRUNE_TOKEN_BUDGET}")
+    for path in sorted(glob.glob("benchmarks/fixtures/*.html")):
+        origin, dest = FIXTURES.get(path, ("India", "France"))
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        before = full_text(html)
+        start = time.perf_counter()
+        after = prune_page_text(html, origin, dest)
+        prune_time = time.perf_counter() - start
+
+        before_tokens, after_tokens = count_tokens(before), count_tokens(after)
+        print(f"\n{path}")
+        print(f"  tokens before: {before_tokens}")
+        print(f"  tokens after:  {after_tokens} ({100 * (1 - after_tokens / before_tokens):.1f}% fewer)")
+        print(f"  prune time:    {prune_time * 1000:.1f} ms")
+
+        if structured_llm:
+            print(f"  extraction before: {time_extraction(structured_llm, origin, dest, before):.2f} s")
+            print(f"  extraction after:  {time_extraction(structured_llm, origin, dest, after):.2f} s")
@@ -0,0 +1,44 @@
+# Cold-start cost of the agent: module import, create_agent(), and the first answer
+# Run from the Travel_agenticAI directory:
+#   python -m benchmarks.bench_startup            import and construction times only
+#   python -m benchmarks.bench_startup --invoke   also time the first and second agent reply (needs Azure creds)
+import sys
+import time
+import subprocess
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import agents.agent_orchestrator
+print(time.perf_counter() - start)
+"""
+
+QUERY = "What's the weather like in Paris?"
+
+
+def import_time() -> float:
+    """Measured in a fresh interpreter so nothing is already in sys.modules"""
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    print(f"import agents.agent_orchestrator: {import_time() * 1000:.0f} ms (fresh process)")
+
+    from agents.agent_orchestrator import create_agent
+    from agents import tools_define
+
+    start = time.perf_counter()
+    agent_executor = create_agent()
+    print(f"create_agent() first call:        {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    create_agent()
+    print(f"create_agent() second call:       {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"backends built so far:            {sorted(tools_define._backends) or 'none'}")
+
+    if "--invoke" in sys.argv:
+        for label in ("first", "second"):
+            start = time.perf_counter()
+            agent_executor.invoke({"input": QUERY, "chat_history": []})
+            print(f"{label} reply:                      {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,89 @@
+# Recall vs memory vs latency of the memmap vector store variants, against exact float32 search and Chroma
+# Run from the Travel_agenticAI directory:
+#   python -m benchmarks.bench_vector_store                     vectors from the chroma_db collection
+#   python -m benchmarks.bench_vector_store --synthetic 200000  clustered random vectors, no Chroma needed
+import sys
+import time
+import tempfile
+import argparse
+import numpy as np
+from tools.vector_store import MemmapVectorStore, load_chroma_embeddings, _normalize
+
+K = 10
+QUERIES = 200
+
+
+def synthetic_vectors(count: int, dim: int = 384, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Topic-like clusters, uniform random vectors would make every neighbour equally far"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    assignment = rng.integers(0, clusters, size=count)
+    return _normalize((centers[assignment] + rng.normal(scale=0.6, size=(count, dim))).astype(np.float32))
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int):
+    scores = queries @ vectors.T
+    return [set(np.argpartition(-row, k)[:k]) for row in scores]
+
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(f & t) / len(t) for f, t in zip(found, truth)]))
+
+
+def time_queries(search, queries) -> float:
+    start = time.perf_counter()
+    results = [search(query) for query in queries]
+    return (time.perf_counter() - start) / len(queries) * 1000, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=0, help="number of synthetic vectors instead of chroma_db")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF clusters (default: sqrt(n))")
+    args = parser.parse_args()
+
+    collection = None
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+        ids = [str(i) for i in range(len(vectors))]
+    else:
+        from agents.vectorDB_tool import get_collection
+        collection = get_collection()
+        ids, vectors = load_chroma_embeddings(collection)
+        vectors = _normalize(vectors)
+    if len(vectors) <= K:
+        sys.exit(f"need more than {K} vectors, found {len(vectors)}")
+
+    rng = np.random.default_rng(1)
+    # held-in vectors plus noise, like a query that paraphrases a stored chunk
+    queries = _normalize(vectors[rng.choice(len(vectors), min(QUERIES, len(vectors)), replace=False)]
+                         + rng.normal(scale=0.05, size=(min(QUERIES, len(vectors)), vectors.shape[1])).astype(np.float32))
+    truth = exact_top_k(vectors, queries, K)
+    row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+    nlist = args.nlist or max(int(len(vectors) ** 0.5), 1)
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, k={K}, {len(queries)} queries")
+    print(f"{'variant':<28}{'MB':>9}{'recall@k':>10}{'ms/query':>10}")
+    print(f"{'float32 exact (in memory)':<28}{vectors.nbytes / 1e6:>9.1f}{1.0:>10.3f}"
+          f"{time_queries(lambda q: np.argpartition(-(vectors @ q), K)[:K], queries)[0]:>10.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in ("float16", "int8"):
+            for ivf in (0, nlist):
+                if ivf and len(vectors) < ivf * 4:
+                    continue
+                store = MemmapVectorStore.build(f"{tmp}/{dtype}-{ivf}", ids, vectors, dtype=dtype, nlist=ivf)
+                probes = [None] if not ivf else [4, 16]
+                for nprobe in probes:
+                    ms, results = time_queries(lambda q: store.search(q, k=K, nprobe=nprobe or 1)[0], queries)
+                    found = [{row_of[chunk_id] for chunk_id, _ in result} for result in results]
+                    label = f"{dtype}" + (f" IVF{ivf} nprobe={nprobe}" if ivf else " brute force")
+                    print(f"{label:<28}{store.nbytes() / 1e6:>9.1f}{recall(found, truth):>10.3f}{ms:>10.2f}")
+
+    if collection is not None:
+        ms, results = time_queries(
+            lambda q: collection.query(query_embeddings=[q.tolist()], n_results=K, include=[])['ids'][0], queries
+        )
+        found = [{row_of[chunk_id] for chunk_id in result} for result in results]
+        # HNSW graph plus float32 vectors, roughly what every serving process keeps resident
+        print(f"{'chroma HNSW (float32)':<28}{vectors.nbytes / 1e6:>9.1f}{recall(found, truth):>10.3f}{ms:>10.2f}")
@@ -0,0 +1,339 @@
+# Local stand-ins for OpenWeather, AviationStack, visaindex.com, Nominatim and Azure OpenAI,
+# with injectable latency and error rates, so the tools can be measured offline.
+#   with FakeServices(default=FaultProfile(latency=0.05)) as services:
+#       os.environ.update(services.env())   # before importing tools.*, the base URLs are read at import time
+import os
+import re
+import json
+import time
+import zlib
+import random
+import datetime
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+VISA_PAGE_FIXTURE = os.path.join(FIXTURES_DIR, "visaindex_france_visa.html")
+AZURE_API_VERSION = "2024-10-21"
+
+# enough for the benchmark cities, anything else gets a country picked from its hash
+NOMINATIM_PLACES = {
+    "gotham": "United States", "atlantis": "Greece", "shangri-la": "China", "el dorado": "Colombia",
+    "wakanda": "Kenya", "narnia": "United Kingdom", "asgard": "Norway", "zion": "Israel"
+}
+COUNTRIES = ["France", "India", "Japan", "Brazil", "Canada", "Germany", "Kenya", "Australia"]
+WEATHER = [("Clear", "clear sky"), ("Clouds", "scattered clouds"), ("Rain", "light rain"), ("Clouds", "overcast clouds")]
+
+
+@dataclass
+class FaultProfile:
+    latency: float = 0.0      # seconds added before every response
+    jitter: float = 0.0       # +/- uniform seconds around latency
+    error_rate: float = 0.0   # share of requests answered with error_status
+    error_status: int = 503   # 502/503/504 go through HTTPClient's retries (not for AviationStack), 4xx do not
+
+
+def _stable(text: str, modulo: int) -> int:
+    return zlib.crc32(text.lower().encode('utf-8')) % modulo
+
+
+def openweather_forecast(query: Dict[str, str]) -> Dict[str, Any]:
+    city = query.get('q', 'Unknown')
+    count = int(query.get('cnt', 40))
+    start = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    base = 10 + _stable(city, 20)
+    items = []
+    for step in range(count):
+        moment = start + datetime.timedelta(hours=3 * step)
+        main, description = WEATHER[(_stable(city, 4) + step // 8) % len(WEATHER)]
+        temp = round(base + 6 * np.sin((moment.hour - 9) / 24 * 2 * np.pi), 1)
+        items.append({
+            'dt': int(moment.timestamp()),
+            'dt_txt': moment.strftime('%Y-%m-%d %H:%M:%S'),
+            'main': {'temp': temp, 'feels_like': round(temp - 1.5, 1), 'humidity': 40 + _stable(city + str(step), 50)},
+            'weather': [{'main': main, 'description': description}],
+            'wind': {'speed': round(1 + _stable(city, 60) / 10, 1)},
+            'clouds': {'all': _stable(city + main, 100)}
+        })
+    return {'cod': '200', 'cnt': count, 'list': items,
+            'city': {'name': city, 'country': city[:2].upper(), 'timezone': 3600 * (_stable(city, 24) - 11)}}
+
+
+def aviationstack(endpoint: str, query: Dict[str, str]) -> Dict[str, Any]:
+    origin, destination = query.get('dep_iata', 'XXX'), query.get('arr_iata', 'YYY')
+    airlines = [("Fake Air", "FA"), ("Offline Airways", "OA"), ("Loopback Lines", "LL")]
+    if endpoint == 'routes':
+        data = [{'airline_name': name, 'airline_iata': code, 'flight_number': str(100 + i),
+                 'departure_time': f"{6 + 4 * i:02d}:00:00", 'arrival_time': f"{9 + 4 * i:02d}:30:00",
+                 'departure_iata': origin, 'arrival_iata': destination}
+                for i, (name, code) in enumerate(airlines)]
+        return {'pagination': {'count': len(data)}, 'data': data}
+
+    date = query.get('flight_date') or datetime.date.today().isoformat()
+    data = []
+    for i, (name, code) in enumerate(airlines * 2):
+        departure = f"{date}T{6 + 2 * i:02d}:00:00+00:00"
+        data.append({
+            'flight_date': date,
+            'flight_status': 'scheduled',
+            'departure': {'airport': f"{origin} International", 'iata': origin, 'scheduled': departure,
+                          'estimated': departure, 'terminal': str(1 + i % 3), 'gate': f"A{i + 1}"},
+            'arrival': {'airport': f"{destination} International", 'iata': destination,
+                        'scheduled': f"{date}T{9 + 2 * i:02d}:30:00+00:00", 'estimated': None,
+                        'terminal': None, 'gate': None},
+            'airline': {'name': name, 'iata': code},
+            'flight': {'number': str(100 + i), 'iata': f"{code}{100 + i}"},
+            'aircraft': {'registration': f"F-{code}{i:02d}"}
+        })
+    return {'pagination': {'count': len(data)}, 'data': data}
+
+
+def visaindex_page(path: str) -> Tuple[int, str]:
+    match = re.match(r'^/visa/([a-z0-9-]+)-visa/?$', path)
+    if path in ('', '/'):
+        return 200, "<html><body><h1>VisaIndex</h1><p>Offline stand-in, the interactive form is not emulated.</p></body></html>"
+    if not match:
+        return 404, "<html><body>Not found</body></html>"
+    country = match.group(1).replace('-', ' ').title()
+    with open(VISA_PAGE_FIXTURE, 'r', encoding='utf-8') as f:
+        # the recorded France page, re-labelled so the pruner keeps the same sections
+        return 200, f.read().replace('France', country)
+
+
+def nominatim_search(query: Dict[str, str]) -> List[Dict[str, Any]]:
+    place = query.get('q', '').strip()
+    if not place:
+        return []
+    country = NOMINATIM_PLACES.get(place.lower(), COUNTRIES[_stable(place, len(COUNTRIES))])
+    return [{
+        'place_id': _stable(place, 10 ** 6), 'lat': str(_stable(place, 180) - 90), 'lon': str(_stable(place, 360) - 180),
+        'display_name': f"{place}, {country}", 'address': {'city': place, 'country': country}
+    }]
+
+
+def _extraction(prompt: str) -> Dict[str, Any]:
+    """An ExtractedVisaInfo for the countries named in the extraction prompt"""
+    match = re.search(r'for (.+?) citizens traveling to (.+?) from', prompt)
+    passport, destination = match.groups() if match else ("Unknown", "Unknown")
+    return {
+        'destination_country': destination,
+        'passport_country': passport,
+        'visa_requirement': {
+            'visa_type': 'e_visa' if _stable(passport + destination, 2) else 'visa_required',
+            'max_stay_days': 90, 'processing_time': '5-10 business days', 'validity_period': '180 days',
+            'cost': 'EUR 80', 'requirements': ['Valid passport', 'Return ticket', 'Proof of accommodation']
+        },
+        'special_notes': ['Offline stand-in answer'],
+        'reciprocity_info': None, 'embassy_info': None, 'last_updated': None,
+        'confidence_level': 0.9
+    }
+
+
+def azure_chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    messages = body.get('messages') or []
+    prompt = '\n'.join(str(m.get('content') or '') for m in messages if m.get('role') == 'user')
+    message = {'role': 'assistant', 'content': None}
+    finish_reason = 'stop'
+    structured = (body.get('response_format') or {}).get('type') == 'json_schema'
+    tool_choice = body.get('tool_choice')
+    if structured:
+        message['content'] = json.dumps(_extraction(prompt))
+    elif body.get('tools') and tool_choice not in (None, 'auto', 'none'):
+        # with_structured_output(method='function_calling') forces the schema "tool"
+        name = tool_choice['function']['name'] if isinstance(tool_choice, dict) else body['tools'][0]['function']['name']
+        message['tool_calls'] = [{'id': 'call_0', 'type': 'function',
+                                  'function': {'name': name, 'arguments': json.dumps(_extraction(prompt))}}]
+        finish_reason = 'tool_calls'
+    else:
+        message['content'] = "This is an offline stand-in answer."
+    prompt_tokens = max(len(prompt) // 4, 1)
+    completion_tokens = len(json.dumps(message)) // 4
+    return {
+        'id': f"chatcmpl-{_stable(prompt, 10 ** 9)}", 'object': 'chat.completion', 'created': int(time.time()),
+        'model': 'gpt-4o', 'choices': [{'index': 0, 'message': message, 'finish_reason': finish_reason}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens}
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+    # headers and body go out in separate writes, with Nagle on every response would wait on a delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle(None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self._handle(json.loads(self.rfile.read(length) or b'{}'))
+
+    def _handle(self, body: Optional[Dict[str, Any]]):
+        services = self.server.services
+        url = urlparse(self.path)
+        service, _, path = url.path.lstrip('/').partition('/')
+        path = '/' + path
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if not services.inject_faults(service):
+            return self._send(services.profile(service).error_status, {'error': 'injected failure'})
+        try:
+            if service == 'openweather' and path.endswith('/forecast'):
+                return self._send(200, openweather_forecast(query))
+            if service == 'aviationstack' and path.rstrip('/').endswith(('/flights', '/routes')):
+                return self._send(200, aviationstack(path.rstrip('/').rsplit('/', 1)[1], query))
+            if service == 'visaindex':
+                status, html = visaindex_page(path)
+                return self._send(status, html, content_type='text/html; charset=utf-8')
+            if service == 'nominatim' and path.rstrip('/') == '/search':
+                return self._send(200, nominatim_search(query))
+            if service == 'azure' and path.endswith('/chat/completions') and body is not None:
+                return self._send(200, azure_chat_completion(body))
+        except Exception as e:
+            return self._send(500, {'error': str(e)})
+        self._send(404, {'error': f"no fake for {url.path}"})
+
+    def _send(self, status: int, payload, content_type: str = 'application/json'):
+        data = payload.encode('utf-8') if isinstance(payload, str) else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeServices:
+    """
+    One threaded HTTP server, each upstream under its own path prefix (/openweather, /aviationstack,
+    /visaindex, /nominatim, /azure) with its own FaultProfile. Faults are drawn from a seeded RNG.
+    """
+
+    SERVICES = ('openweather', 'aviationstack', 'visaindex', 'nominatim', 'azure')
+
+    def __init__(self, profiles: Optional[Dict[str, FaultProfile]] = None, default: Optional[FaultProfile] = None,
+                 host: str = '127.0.0.1', port: int = 0, seed: int = 0):
+        self.profiles = dict(profiles or {})
+        self.default = default or FaultProfile()
+        self.host = host
+        self.port = port
+        self.requests = Counter()
+        self.failures = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def profile(self, service: str) -> FaultProfile:
+        return self.profiles.get(service, self.default)
+
+    def inject_faults(self, service: str) -> bool:
+        """Sleeps the configured latency, False when this request should fail"""
+        profile = self.profile(service)
+        with self._lock:
+            self.requests[service] += 1
+            delay = max(profile.latency + self._rng.uniform(-profile.jitter, profile.jitter), 0.0)
+            fail = self._rng.random() < profile.error_rate
+            if fail:
+                self.failures[service] += 1
+        if delay:
+            time.sleep(delay)
+        return not fail
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the tools at this server"""
+        netloc = self.base_url.split('://', 1)[1]
+        return {
+            'OPENWEATHER_API_ENDPOINT': f"{self.base_url}/openweather/data/2.5",
+            'OPENWEATHER_API_KEY': 'offline',
+            'AVIATIONSTACK_API_ENDPOINT': f"{self.base_url}/aviationstack/v1",
+            'AVIATIONSTACK_API_KEY': 'offline',
+            'VISAINDEX_BASE_URL': f"{self.base_url}/visaindex",
+            'NOMINATIM_DOMAIN': f"{netloc}/nominatim",
+            'NOMINATIM_SCHEME': 'http',
+            'AZURE_OPENAI_API_ENDPOINT': f"{self.base_url}/azure",
+            'AZURE_OPENAI_API_KEY': 'offline',
+            'AZURE_OPENAI_API_VERSION': AZURE_API_VERSION
+        }
+
+    def start(self) -> 'FakeServices':
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.services = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {service: {'requests': self.requests[service], 'injected_failures': self.failures[service]}
+                for service in self.SERVICES}
+
+
+class HashingEmbedder:
+    """
+    Deterministic stand-in for the MiniLM model (hashed word unigrams and bigrams, unit length), offers both
+    the SentenceTransformer.encode signature used by EmbeddingPipeline and the LangChain Embeddings methods.
+    Lets seeding / retrieval be measured without downloading a model; the model's own cost is not included.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size: int = 64, show_progress_bar: bool = False) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r'\w+', text.lower())
+            for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket = zlib.crc32(gram.encode('utf-8'))
+                vectors[row, bucket % self.dim] += 1.0 if bucket & 1 << 31 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+
+if __name__ == "__main__":
+    # run the stand-ins on their own, e.g. to point the Streamlit app at them
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    services = FakeServices(default=FaultProfile(args.latency, args.jitter, args.error_rate), port=args.port).start()
+    for name, value in services.env().items():
+        print(f"export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
@@ -0,0 +1,349 @@
+# Offline benchmark suite: every tool runs against the stand-ins in benchmarks/fake_services.py, results go to JSON
+# Run from the Travel_agenticAI directory:
+#   python -m benchmarks.run_benchmarks                                     every component, no injected faults
+#   python -m benchmarks.run_benchmarks --latency 0.08 --jitter 0.02 --error-rate 0.05 --only weather,flights
+#   python -m benchmarks.run_benchmarks --compare benchmarks/results/<earlier>.json --fail-on-regression
+# Caches and state files are written to a temporary working directory, the real scraped_data/ is not touched.
+import io
+import os
+import sys
+import json
+import time
+import glob
+import argparse
+import warnings
+import platform
+import tempfile
+import subprocess
+import contextlib
+from typing import Any, Callable, Dict, List, Sequence
+import numpy as np
+from benchmarks.fake_services import FakeServices, FaultProfile, HashingEmbedder
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+WEATHER_CITIES = ["Delhi", "London", "Paris", "Tokyo", "Barcelona", "Nairobi", "Sydney", "Toronto", "Lima", "Oslo"]
+FLIGHT_PAIRS = [("delhi", "london"), ("mumbai", "paris"), ("new york", "tokyo"), ("bengaluru", "dubai"),
+                ("zurich", "singapore"), ("madrid", "rome")]
+VISA_PAIRS = [("France", "India"), ("Japan", "India"), ("Paris", "Delhi"), ("United Kingdom", "Brazil"),
+              ("Spain", "Canada"), ("Thailand", "Germany")]
+# what the offline gazetteer must answer; None means the name is ambiguous and has to be left to Nominatim
+OFFLINE_PLACES = {"Paris": "France", "Delhi": "India", "Cusco": "Peru", "Reykjavik": "Iceland", "Goa": "India",
+                  "Tokyo": "Japan", "Florence": None, "Venice": None, "Valencia": None, "Santiago": None,
+                  "El Dorado": None, "Kochi": None}
+UNKNOWN_PLACES = ["Gotham", "Atlantis", "Shangri-La", "El Dorado", "Wakanda", "Narnia", "Asgard", "Zion"]
+IATA_QUERIES = ["delhi", "london", "paris", "new york", "bengalore", "kuala lumpur", "nice", "zurich", "sao paulo", "rio"]
+KB_QUERIES = ["things to do in Barcelona", "tapas and local food", "is it safe to travel at night",
+              "best time of year to visit Spain", "public transport and getting around", "festivals in Valencia",
+              "tipping customs in restaurants", "beaches near Malaga"]
+
+COMPONENTS = ("weather", "flights", "visa", "city_to_country", "iata", "knowledge_base")
+LOWER_IS_BETTER = ("mean_ms", "p50_ms", "p95_ms")
+HIGHER_IS_BETTER = ("per_second",)
+
+
+def summarize(latencies: Sequence[float], errors: int = 0, wall: float = None, **extra) -> Dict[str, Any]:
+    latencies = np.asarray(latencies, dtype=np.float64) * 1000
+    wall = wall if wall is not None else latencies.sum() / 1000
+    summary = {
+        'count': int(len(latencies)),
+        'errors': int(errors),
+        'error_rate': round(errors / len(latencies), 4) if len(latencies) else 0.0,
+        'mean_ms': round(float(latencies.mean()), 3) if len(latencies) else None,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3) if len(latencies) else None,
+        'max_ms': round(float(latencies.max()), 3) if len(latencies) else None,
+        'per_second': round(len(latencies) / wall, 2) if wall else None
+    }
+    summary.update(extra)
+    return summary
+
+
+def measure(fn: Callable, items: Sequence, failed: Callable[[Any], bool] = lambda result: False, **extra) -> Dict[str, Any]:
+    """Calls fn(item) for every item in turn, failed(result) decides what counts as an error"""
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for item in items:
+        call_start = time.perf_counter()
+        try:
+            result = fn(item)
+            errors += bool(failed(result))
+        except Exception as e:
+            print(f"benchmark call failed for {item!r}: {e}", file=sys.stderr)
+            errors += 1
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, errors, time.perf_counter() - start, **extra)
+
+
+def has_error(result) -> bool:
+    return not result or (isinstance(result, dict) and 'error' in result)
+
+
+def bench_weather(rounds: int) -> Dict[str, Any]:
+    from tools.api_caller import APICaller
+    api = APICaller()
+    return {
+        'cold': measure(api.get_weather_forecast, WEATHER_CITIES, has_error),
+        'warm': measure(api.get_weather_forecast, WEATHER_CITIES * rounds, has_error)
+    }
+
+
+def bench_flights(rounds: int) -> Dict[str, Any]:
+    from tools.api_caller import APICaller
+    api = APICaller()
+    plan = lambda pair: api.plan_flights(*pair)
+    return {
+        'cold': measure(plan, FLIGHT_PAIRS, has_error),
+        'warm': measure(plan, FLIGHT_PAIRS * rounds, has_error)
+    }
+
+
+def bench_visa(rounds: int) -> Dict[str, Any]:
+    from tools.web_scrapper import LLMWebScrapper
+    scraper = LLMWebScrapper()
+    scrape = lambda pair: scraper.scrape_visa_requirements(*pair)
+    failed = lambda result: not result.get('cache_hit') and not result.get('total_sources')
+    try:
+        return {
+            # static page + structured extraction through the fake Azure deployment
+            'cold': measure(scrape, VISA_PAIRS, failed),
+            'warm': measure(scrape, VISA_PAIRS * rounds, failed)
+        }
+    finally:
+        scraper.source_executor.shutdown(wait=False)
+        scraper.browser_pool.close()
+
+
+def bench_city_to_country(rounds: int) -> Dict[str, Any]:
+    from tools.gazetteer import Gazetteer
+    start = time.perf_counter()
+    gazetteer = Gazetteer()
+    setup_ms = round((time.perf_counter() - start) * 1000, 1)
+    unresolved = lambda result: result in UNKNOWN_PLACES
+    offline_matches = lambda place: gazetteer.lookup_offline(place) == OFFLINE_PLACES[place]
+    return {
+        'offline': measure(offline_matches, list(OFFLINE_PLACES) * rounds, lambda matched: not matched,
+                           setup_ms=setup_ms),
+        'nominatim': measure(gazetteer.city_to_country, UNKNOWN_PLACES, unresolved),
+        'nominatim_cached': measure(gazetteer.city_to_country, UNKNOWN_PLACES * rounds, unresolved)
+    }
+
+
+def bench_iata(rounds: int) -> Dict[str, Any]:
+    from tools.api_caller import APICaller
+    api = APICaller()
+    start = time.perf_counter()
+    api.airport_index
+    setup_ms = round((time.perf_counter() - start) * 1000, 1)
+    return {'lookup': measure(api.get_iata_codes_for_city, IATA_QUERIES * rounds, lambda result: not result, setup_ms=setup_ms)}
+
+
+def knowledge_base_chunks(copies: int):
+    """The repo's knowledge_base/ split like seed_database.py does, repeated `copies` times with distinct text"""
+    from seed_database import split_file
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "knowledge_base", "**", "*.txt"), recursive=True)):
+        chunks.extend(split_file(path))
+    texts, metadatas = [], []
+    for copy in range(copies):
+        for chunk in chunks:
+            texts.append(chunk.page_content if copy == 0 else f"{chunk.page_content} (copy {copy})")
+            metadatas.append(dict(chunk.metadata))
+    return texts, metadatas
+
+
+def bench_knowledge_base(rounds: int, embedder_name: str = "hashing", copies: int = 20,
+                         batch_size: int = 64, workers: int = 1) -> Dict[str, Any]:
+    import chromadb
+    from tools.embedding_pipeline import EmbeddingPipeline, EMBEDDING_MODEL
+    from tools.bm25_index import BM25Index
+    from agents.vectorDB_tool import KnowledgeBase, KB_MIN_SIMILARITY
+
+    if embedder_name == "hashing":
+        model = query_embedder = HashingEmbedder()
+    else:
+        from langchain_community.embeddings import SentenceTransformerEmbeddings
+        model, query_embedder = None, SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
+
+    texts, metadatas = knowledge_base_chunks(copies)
+    if not texts:
+        return {'seeding': {'error': 'knowledge_base/ has no .txt files'}}
+    ids = [f"chunk-{n}" for n in range(len(texts))]
+    collection = chromadb.PersistentClient(path="chroma_db").get_or_create_collection("benchmark")
+
+    with EmbeddingPipeline(EMBEDDING_MODEL, batch_size=batch_size, workers=workers, model=model) as pipeline:
+        throughput = pipeline.upsert(collection, ids, texts, metadatas)
+    bm25 = BM25Index("chroma_db/bm25.sqlite3")
+    start = time.perf_counter()
+    bm25.upsert(ids, texts, metadatas)
+    bm25_seconds = time.perf_counter() - start
+
+    results = {
+        'seeding': {
+            'embedder': embedder_name,
+            'chunks': throughput['chunks'],
+            'per_second': throughput['chunks_per_second'],
+            'embed_seconds': throughput['embed_seconds'],
+            'write_seconds': throughput['write_seconds'],
+            'bm25_seconds': round(bm25_seconds, 3),
+            'bm25_per_second': round(len(texts) / bm25_seconds, 1) if bm25_seconds else None
+        }
+    }
+    queries = KB_QUERIES * rounds
+    # hashed-word similarities sit far below MiniLM's, the similarity floor would drop every candidate
+    min_similarity = -1.0 if embedder_name == "hashing" else KB_MIN_SIMILARITY
+    dense = KnowledgeBase(embedder=query_embedder, collection=collection, hybrid=False)
+    hybrid = KnowledgeBase(embedder=query_embedder, collection=collection, bm25=bm25, hybrid=True)
+    results['retrieval_dense'] = measure(lambda query: dense.search(query, min_similarity=min_similarity),
+                                         queries, lambda result: not result)
+    results['retrieval_hybrid'] = measure(lambda query: hybrid.search(query, min_similarity=min_similarity),
+                                          queries, lambda result: not result)
+    return results
+
+
+def git_commit() -> Dict[str, Any]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True, timeout=30).stdout.strip()
+    try:
+        return {'commit': git("rev-parse", "--short", "HEAD") or None, 'dirty': bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except Exception:
+        return {'commit': None, 'dirty': None}
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """'component.case' -> summary, skipping components that failed"""
+    flat = {}
+    for component, cases in results.items():
+        for case, summary in cases.items():
+            if isinstance(summary, dict) and 'error' not in summary:
+                flat[f"{component}.{case}"] = summary
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1, floor_ms: float = 0.5) -> List[str]:
+    """Prints metric deltas against an earlier results file, returns the regressed metric names"""
+    old, new = flatten(baseline['results']), flatten(current['results'])
+    regressions = []
+    print(f"\ncompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    print(f"{'metric':<42}{'before':>12}{'after':>12}{'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = old[key].get(metric), new[key].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            # sub-millisecond swings are noise on a laptop
+            if worse and metric in LOWER_IS_BETTER and after - before < floor_ms:
+                worse = False
+            flag = "  <-- regression" if worse else ""
+            print(f"{key + '.' + metric:<42}{before:>12.3f}{after:>12.3f}{change:>+9.1%}{flag}")
+            if worse:
+                regressions.append(f"{key}.{metric}")
+    return regressions
+
+
+def print_summary(results: Dict[str, Any]):
+    print(f"{'component.case':<34}{'count':>7}{'errors':>8}{'mean ms':>10}{'p95 ms':>10}{'per s':>10}")
+    for component, cases in results.items():
+        for case, summary in cases.items():
+            if 'error' in summary:
+                print(f"{component + '.' + case:<34}  failed: {summary['error']}")
+                continue
+            cells = [summary.get(key) for key in ('count', 'errors', 'mean_ms', 'p95_ms', 'per_second')]
+            print(f"{component + '.' + case:<34}" + ''.join(
+                f"{'-' if cell is None else cell:>{width}}" for cell, width in zip(cells, (7, 8, 10, 10, 10))
+            ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the travel tools against local fake upstreams")
+    parser.add_argument("--only", default=",".join(COMPONENTS), help=f"comma separated subset of {','.join(COMPONENTS)}")
+    parser.add_argument("--rounds", type=int, default=5, help="repetitions of the warm / cached cases")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fake upstream response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of uniform jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake upstream responses that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--profile", action="append", default=[], metavar="SERVICE:LATENCY:ERROR_RATE",
+                        help=f"per-service override, services: {','.join(FakeServices.SERVICES)}")
+    parser.add_argument("--embedder", choices=["hashing", "minilm"], default="hashing",
+                        help="hashing needs no model download but leaves out the model's own cost")
+    parser.add_argument("--kb-copies", type=int, default=20, help="times the knowledge base is repeated for seeding")
+    parser.add_argument("--with-browser", action="store_true", help="keep the Selenium visa source (needs Chrome)")
+    parser.add_argument("--output", default=None, help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to diff against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="show the tools' own output")
+    args = parser.parse_args()
+
+    components = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        sys.exit(f"unknown components: {', '.join(sorted(unknown))}")
+
+    profiles = {}
+    for spec in args.profile:
+        service, latency, error_rate = spec.split(":")
+        profiles[service] = FaultProfile(float(latency), args.jitter, float(error_rate), args.error_status)
+    default = FaultProfile(args.latency, args.jitter, args.error_rate, args.error_status)
+
+    meta = {
+        **git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'args': vars(args)
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{meta['commit'] or 'unknown'}.json")
+    output = os.path.abspath(output)
+
+    results = {}
+    with FakeServices(profiles, default) as services, tempfile.TemporaryDirectory(prefix="travel-bench-") as workdir:
+        os.environ.update(services.env())
+        os.environ.update({
+            'AVIATIONSTACK_MONTHLY_QUOTA': str(10 ** 6),
+            'VISA_INTERACTIVE_SOURCE': '1' if args.with_browser else '0',
+            'EMBEDDING_CACHE': '0'
+        })
+        # modules are imported after this, so every relative cache / state path lands in the temp directory
+        sys.path.insert(0, REPO_DIR)
+        os.chdir(workdir)
+
+        runners = {
+            'weather': lambda: bench_weather(args.rounds),
+            'flights': lambda: bench_flights(args.rounds),
+            'visa': lambda: bench_visa(args.rounds),
+            'city_to_country': lambda: bench_city_to_country(args.rounds),
+            'iata': lambda: bench_iata(args.rounds),
+            'knowledge_base': lambda: bench_knowledge_base(args.rounds, args.embedder, args.kb_copies)
+        }
+        if not args.verbose:
+            warnings.simplefilter("ignore")
+        for name in components:
+            print(f"running {name}...", file=sys.stderr)
+            quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            try:
+                with quiet:
+                    results[name] = runners[name]()
+            except Exception as e:
+                results[name] = {'setup': {'error': f"{type(e).__name__}: {e}"}}
+        os.chdir(REPO_DIR)
+        fake_stats = services.stats()
+
+    report = {'meta': meta, 'fake_services': fake_stats, 'results': results}
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+
+    print_summary(results)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, threshold=args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
@@ -0,0 +1,126 @@
+# Bundled country table for the offline gazetteer (tools/gazetteer.py)
+# Names follow the English names Nominatim returns, which is what visaindex.com expects
+
+COUNTRY_NAMES = {
+    'AD': 'Andorra', 'AE': 'United Arab Emirates', 'AF': 'Afghanistan', 'AG': 'Antigua and Barbuda',
+    'AI': 'Anguilla', 'AL': 'Albania', 'AM': 'Armenia', 'AO': 'Angola', 'AQ': 'Antarctica',
+    'AR': 'Argentina', 'AS': 'American Samoa', 'AT': 'Austria', 'AU': 'Australia', 'AW': 'Aruba',
+    'AZ': 'Azerbaijan', 'BA': 'Bosnia and Herzegovina', 'BB': 'Barbados', 'BD': 'Bangladesh',
+    'BE': 'Belgium', 'BF': 'Burkina Faso', 'BG': 'Bulgaria', 'BH': 'Bahrain', 'BI': 'Burundi',
+    'BJ': 'Benin', 'BL': 'Saint Barthélemy', 'BM': 'Bermuda', 'BN': 'Brunei', 'BO': 'Bolivia',
+    'BQ': 'Caribbean Netherlands', 'BR': 'Brazil', 'BS': 'The Bahamas', 'BT': 'Bhutan', 'BW': 'Botswana',
+    'BY': 'Belarus', 'BZ': 'Belize', 'CA': 'Canada', 'CC': 'Cocos (Keeling) Islands',
+    'CD': 'Democratic Republic of the Congo', 'CF': 'Central African Republic', 'CG': 'Congo-Brazzaville',
+    'CH': 'Switzerland', 'CI': "Côte d'Ivoire", 'CK': 'Cook Islands', 'CL': 'Chile', 'CM': 'Cameroon',
+    'CN': 'China', 'CO': 'Colombia', 'CR': 'Costa Rica', 'CU': 'Cuba', 'CV': 'Cape Verde',
+    'CW': 'Curaçao', 'CX': 'Christmas Island', 'CY': 'Cyprus', 'CZ': 'Czechia', 'DE': 'Germany',
+    'DJ': 'Djibouti', 'DK': 'Denmark', 'DM': 'Dominica', 'DO': 'Dominican Republic', 'DZ': 'Algeria',
+    'EC': 'Ecuador', 'EE': 'Estonia', 'EG': 'Egypt', 'EH': 'Western Sahara', 'ER': 'Eritrea',
+    'ES': 'Spain', 'ET': 'Ethiopia', 'FI': 'Finland', 'FJ': 'Fiji', 'FK': 'Falkland Islands',
+    'FM': 'Federated States of Micronesia', 'FO': 'Faroe Islands', 'FR': 'France', 'GA': 'Gabon',
+    'GB': 'United Kingdom', 'GD': 'Grenada', 'GE': 'Georgia', 'GF': 'French Guiana', 'GG': 'Guernsey',
+    'GH': 'Ghana', 'GI': 'Gibraltar', 'GL': 'Greenland', 'GM': 'The Gambia', 'GN': 'Guinea',
+    'GP': 'Guadeloupe', 'GQ': 'Equatorial Guinea', 'GR': 'Greece', 'GT': 'Guatemala', 'GU': 'Guam',
+    'GW': 'Guinea-Bissau', 'GY': 'Guyana', 'HK': 'Hong Kong', 'HN': 'Honduras', 'HR': 'Croatia',
+    'HT': 'Haiti', 'HU': 'Hungary', 'ID': 'Indonesia', 'IE': 'Ireland', 'IL': 'Israel',
+    'IM': 'Isle of Man', 'IN': 'India', 'IQ': 'Iraq', 'IR': 'Iran', 'IS': 'Iceland', 'IT': 'Italy',
+    'JE': 'Jersey', 'JM': 'Jamaica', 'JO': 'Jordan', 'JP': 'Japan', 'KE': 'Kenya', 'KG': 'Kyrgyzstan',
+    'KH': 'Cambodia', 'KI': 'Kiribati', 'KM': 'Comoros', 'KN': 'Saint Kitts and Nevis',
+    'KP': 'North Korea', 'KR': 'South Korea', 'KW': 'Kuwait', 'KY': 'Cayman Islands',
+    'KZ': 'Kazakhstan', 'LA': 'Laos', 'LB': 'Lebanon', 'LC': 'Saint Lucia', 'LI': 'Liechtenstein',
+    'LK': 'Sri Lanka', 'LR': 'Liberia', 'LS': 'Lesotho', 'LT': 'Lithuania', 'LU': 'Luxembourg',
+    'LV': 'Latvia', 'LY': 'Libya', 'MA': 'Morocco', 'MC': 'Monaco', 'MD': 'Moldova',
+    'ME': 'Montenegro', 'MF': 'Saint Martin', 'MG': 'Madagascar', 'MH': 'Marshall Islands',
+    'MK': 'North Macedonia', 'ML': 'Mali', 'MM': 'Myanmar', 'MN': 'Mongolia', 'MO': 'Macao',
+    'MP': 'Northern Mariana Islands', 'MQ': 'Martinique', 'MR': 'Mauritania', 'MS': 'Montserrat',
+    'MT': 'Malta', 'MU': 'Mauritius', 'MV': 'Maldives', 'MW': 'Malawi', 'MX': 'Mexico',
+    'MY': 'Malaysia', 'MZ': 'Mozambique', 'NA': 'Namibia', 'NC': 'New Caledonia', 'NE': 'Niger',
+    'NF': 'Norfolk Island', 'NG': 'Nigeria', 'NI': 'Nicaragua', 'NL': 'Netherlands', 'NO': 'Norway',
+    'NP': 'Nepal', 'NR': 'Nauru', 'NU': 'Niue', 'NZ': 'New Zealand', 'OM': 'Oman', 'PA': 'Panama',
+    'PE': 'Peru', 'PF': 'French Polynesia', 'PG': 'Papua New Guinea', 'PH': 'Philippines',
+    'PK': 'Pakistan', 'PL': 'Poland', 'PM': 'Saint Pierre and Miquelon', 'PR': 'Puerto Rico',
+    'PS': 'Palestinian Territory', 'PT': 'Portugal', 'PW': 'Palau', 'PY': 'Paraguay', 'QA': 'Qatar',
+    'RE': 'Réunion', 'RO': 'Romania', 'RS': 'Serbia', 'RU': 'Russia', 'RW': 'Rwanda',
+    'SA': 'Saudi Arabia', 'SB': 'Solomon Islands', 'SC': 'Seychelles', 'SD': 'Sudan', 'SE': 'Sweden',
+    'SG': 'Singapore', 'SH': 'Saint Helena, Ascension and Tristan da Cunha', 'SI': 'Slovenia',
+    'SK': 'Slovakia', 'SL': 'Sierra Leone', 'SM': 'San Marino', 'SN': 'Senegal', 'SO': 'Somalia',
+    'SR': 'Suriname', 'SS': 'South Sudan', 'ST': 'São Tomé and Príncipe', 'SV': 'El Salvador',
+    'SX': 'Sint Maarten', 'SY': 'Syria', 'SZ': 'Eswatini', 'TC': 'Turks and Caicos Islands',
+    'TD': 'Chad', 'TG': 'Togo', 'TH': 'Thailand', 'TJ': 'Tajikistan', 'TL': 'Timor-Leste',
+    'TM': 'Turkmenistan', 'TN': 'Tunisia', 'TO': 'Tonga', 'TR': 'Türkiye', 'TT': 'Trinidad and Tobago',
+    'TV': 'Tuvalu', 'TW': 'Taiwan', 'TZ': 'Tanzania', 'UA': 'Ukraine', 'UG': 'Uganda',
+    'UM': 'United States Minor Outlying Islands', 'US': 'United States', 'UY': 'Uruguay',
+    'UZ': 'Uzbekistan', 'VA': 'Vatican City', 'VC': 'Saint Vincent and the Grenadines',
+    'VE': 'Venezuela', 'VG': 'British Virgin Islands', 'VI': 'United States Virgin Islands',
+    'VN': 'Vietnam', 'VU': 'Vanuatu', 'WF': 'Wallis and Futuna', 'WS': 'Samoa', 'XK': 'Kosovo',
+    'YE': 'Yemen', 'YT': 'Mayotte', 'ZA': 'South Africa', 'ZM': 'Zambia', 'ZW': 'Zimbabwe'
+}
+
+# Extra spellings people type for a country, mapped to the ISO code
+COUNTRY_ALIASES = {
+    'uk': 'GB', 'u k': 'GB', 'britain': 'GB', 'great britain': 'GB', 'england': 'GB', 'scotland': 'GB',
+    'wales': 'GB', 'northern ireland': 'GB',
+    'usa': 'US', 'us': 'US', 'u s': 'US', 'u s a': 'US', 'america': 'US', 'united states of america': 'US',
+    'uae': 'AE', 'u a e': 'AE', 'emirates': 'AE',
+    'holland': 'NL', 'the netherlands': 'NL',
+    'czech republic': 'CZ', 'turkey': 'TR', 'burma': 'MM', 'ivory coast': 'CI', 'cote d ivoire': 'CI',
+    'south korea': 'KR', 'korea': 'KR', 'republic of korea': 'KR', 'north korea': 'KP',
+    'russian federation': 'RU', 'viet nam': 'VN', 'srilanka': 'LK', 'ceylon': 'LK',
+    'bahamas': 'BS', 'gambia': 'GM', 'swaziland': 'SZ', 'east timor': 'TL', 'macau': 'MO',
+    'vatican': 'VA', 'holy see': 'VA', 'macedonia': 'MK', 'cape verde': 'CV', 'cabo verde': 'CV',
+    'drc': 'CD', 'dr congo': 'CD', 'republic of the congo': 'CG', 'congo': 'CG',
+    'palestine': 'PS', 'persia': 'IR', 'bharat': 'IN', 'hindustan': 'IN', 'deutschland': 'DE',
+    'espana': 'ES', 'nippon': 'JP'
+}
+
+# Adjectives pages use for a country's people and passports ("Indian citizens"), by ISO code.
+# Countries whose name doubles as the adjective, or that have no common one, are left out.
+COUNTRY_DEMONYMS = {
+    'AD': 'Andorran', 'AE': ('Emirati', 'Emirian'), 'AF': 'Afghan', 'AG': 'Antiguan', 'AI': 'Anguillan',
+    'AL': 'Albanian', 'AM': 'Armenian', 'AO': 'Angolan', 'AR': 'Argentine', 'AS': 'American Samoan',
+    'AT': 'Austrian', 'AU': 'Australian', 'AW': 'Aruban', 'AZ': ('Azerbaijani', 'Azeri'),
+    'BA': ('Bosnian', 'Herzegovinian'), 'BB': 'Barbadian', 'BD': 'Bangladeshi', 'BE': 'Belgian',
+    'BF': 'Burkinabe', 'BG': 'Bulgarian', 'BH': 'Bahraini', 'BI': 'Burundian', 'BJ': 'Beninese',
+    'BM': 'Bermudian', 'BN': 'Bruneian', 'BO': 'Bolivian', 'BR': 'Brazilian', 'BS': 'Bahamian',
+    'BT': 'Bhutanese', 'BW': ('Botswanan', 'Motswana'), 'BY': 'Belarusian', 'BZ': 'Belizean',
+    'CA': 'Canadian', 'CD': 'Congolese', 'CF': 'Central African', 'CG': 'Congolese', 'CH': 'Swiss',
+    'CI': 'Ivorian', 'CK': 'Cook Islander', 'CL': 'Chilean', 'CM': 'Cameroonian', 'CN': 'Chinese',
+    'CO': 'Colombian', 'CR': 'Costa Rican', 'CU': 'Cuban', 'CV': 'Cape Verdean', 'CW': 'Curaçaoan',
+    'CY': 'Cypriot', 'CZ': 'Czech', 'DE': 'German', 'DJ': 'Djiboutian', 'DK': 'Danish',
+    'DO': 'Dominican', 'DZ': 'Algerian', 'EC': 'Ecuadorian', 'EE': 'Estonian',
+    'EG': 'Egyptian', 'EH': 'Sahrawi', 'ER': 'Eritrean', 'ES': 'Spanish', 'ET': 'Ethiopian',
+    'FI': 'Finnish', 'FJ': 'Fijian', 'FK': 'Falkland Islander', 'FM': 'Micronesian', 'FO': 'Faroese',
+    'FR': 'French', 'GA': 'Gabonese', 'GB': 'British', 'GD': 'Grenadian', 'GE': 'Georgian',
+    'GF': 'French Guianese', 'GH': 'Ghanaian', 'GI': 'Gibraltarian', 'GL': 'Greenlandic', 'GM': 'Gambian',
+    'GN': 'Guinean', 'GP': 'Guadeloupean', 'GQ': 'Equatorial Guinean', 'GR': 'Greek', 'GT': 'Guatemalan',
+    'GU': 'Guamanian', 'GW': 'Bissau-Guinean', 'GY': 'Guyanese', 'HK': 'Hongkonger', 'HN': 'Honduran',
+    'HR': 'Croatian', 'HT': 'Haitian', 'HU': 'Hungarian', 'ID': 'Indonesian', 'IE': 'Irish',
+    'IL': 'Israeli', 'IM': 'Manx', 'IN': 'Indian', 'IQ': 'Iraqi', 'IR': 'Iranian', 'IS': 'Icelandic',
+    'IT': 'Italian', 'JM': 'Jamaican', 'JO': 'Jordanian', 'JP': 'Japanese', 'KE': 'Kenyan',
+    'KG': ('Kyrgyz', 'Kyrgyzstani'), 'KH': 'Cambodian', 'KI': 'I-Kiribati', 'KM': 'Comoran',
+    'KN': ('Kittitian', 'Nevisian'), 'KP': 'North Korean', 'KR': 'South Korean', 'KW': 'Kuwaiti',
+    'KY': 'Caymanian', 'KZ': ('Kazakh', 'Kazakhstani'), 'LA': ('Lao', 'Laotian'), 'LB': 'Lebanese',
+    'LC': 'Saint Lucian', 'LI': 'Liechtensteiner', 'LK': 'Sri Lankan', 'LR': 'Liberian', 'LS': 'Basotho',
+    'LT': 'Lithuanian', 'LU': 'Luxembourgish', 'LV': 'Latvian', 'LY': 'Libyan', 'MA': 'Moroccan',
+    'MC': 'Monégasque', 'MD': 'Moldovan', 'ME': 'Montenegrin', 'MG': 'Malagasy', 'MH': 'Marshallese',
+    'MK': 'Macedonian', 'ML': 'Malian', 'MM': 'Burmese', 'MN': 'Mongolian', 'MO': 'Macanese',
+    'MQ': 'Martiniquais', 'MR': 'Mauritanian', 'MS': 'Montserratian', 'MT': 'Maltese', 'MU': 'Mauritian',
+    'MV': 'Maldivian', 'MW': 'Malawian', 'MX': 'Mexican', 'MY': 'Malaysian', 'MZ': 'Mozambican',
+    'NA': 'Namibian', 'NC': 'New Caledonian', 'NE': 'Nigerien', 'NG': 'Nigerian', 'NI': 'Nicaraguan',
+    'NL': 'Dutch', 'NO': 'Norwegian', 'NP': 'Nepali', 'NR': 'Nauruan', 'NU': 'Niuean',
+    'OM': 'Omani', 'PA': 'Panamanian', 'PE': 'Peruvian', 'PF': 'French Polynesian', 'PG': 'Papua New Guinean',
+    'PH': 'Filipino', 'PK': 'Pakistani', 'PL': 'Polish', 'PR': 'Puerto Rican', 'PS': 'Palestinian',
+    'PT': 'Portuguese', 'PW': 'Palauan', 'PY': 'Paraguayan', 'QA': 'Qatari', 'RO': 'Romanian',
+    'RS': 'Serbian', 'RU': 'Russian', 'RW': 'Rwandan', 'SA': 'Saudi', 'SB': 'Solomon Islander',
+    'SC': 'Seychellois', 'SD': 'Sudanese', 'SE': 'Swedish', 'SG': 'Singaporean', 'SH': 'Saint Helenian',
+    'SI': 'Slovenian', 'SK': 'Slovak', 'SL': 'Sierra Leonean', 'SM': 'Sammarinese', 'SN': 'Senegalese',
+    'SO': 'Somali', 'SR': 'Surinamese', 'SS': 'South Sudanese', 'ST': 'Santomean', 'SV': 'Salvadoran',
+    'SY': 'Syrian', 'SZ': ('Swazi', 'Liswati'), 'TC': 'Turks and Caicos Islander', 'TD': 'Chadian',
+    'TG': 'Togolese', 'TH': 'Thai', 'TJ': 'Tajik', 'TL': 'Timorese', 'TM': 'Turkmen', 'TN': 'Tunisian',
+    'TO': 'Tongan', 'TR': ('Turkish', 'Turkey'), 'TT': ('Trinidadian', 'Tobagonian'), 'TV': 'Tuvaluan',
+    'TW': 'Taiwanese', 'TZ': 'Tanzanian', 'UA': 'Ukrainian', 'UG': 'Ugandan', 'US': 'American',
+    'UY': 'Uruguayan', 'UZ': 'Uzbek', 'VA': 'Vatican', 'VC': 'Vincentian', 'VE': 'Venezuelan',
+    'VG': 'British Virgin Islander', 'VI': 'US Virgin Islander', 'VN': 'Vietnamese', 'VU': 'Ni-Vanuatu',
+    'WS': 'Samoan', 'XK': ('Kosovar', 'Kosovan'), 'YE': 'Yemeni', 'ZA': 'South African', 'ZM': 'Zambian',
+    'ZW': 'Zimbabwean'
+}
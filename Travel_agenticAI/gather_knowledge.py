@@ -3,10 +3,14 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import re
+import asyncio
+import argparse
+from tools.crawler import PoliteCrawler, CrawlState, CRAWL_CONCURRENCY
+from tools.url_frontier import URLFrontier
 
 # --- 1. Configuration ---
 KNOWLEDGE_BASE_DIR = "knowledge_base"
-# Add any high-quality travel blog/guide URLs you want to scrape here
+# Hand-picked seed URLs, always added to the frontier. url_finder.py adds the rest there.
 URLS_TO_SCRAPE = [
     "https://www.nomadicmatt.com/travel-guides/spain-travel-guide/",
     "https://www.ricksteves.com/europe/spain/itinerary",
@@ -14,7 +18,50 @@ URLS_TO_SCRAPE = [
     "https://www.lonelyplanet.com/articles/top-things-to-do-in-spain"
 ]
 
-# --- 2. The Scraper Function ---
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36'
+
+# --- 2. The Scraper Functions ---
+def output_path(url):
+    # Create a simple filename from the URL
+    filename = url.split("/")[-2] + ".txt"
+    return os.path.join(KNOWLEDGE_BASE_DIR, filename)
+
+
+def clean_article(html, url):
+    """
+    Extracts the main content of an article page, cleaning out boilerplate.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # --- Content Extraction Logic ---
+        # This is the most crucial part. We try different common tags for main content.
+        # You might need to adjust this based on the websites you scrape.
+    main_content = soup.find('article') or soup.find('main') or soup.find(id='main-content') or soup.find(class_='post-content')
+
+    if not main_content:
+        print(f"Warning: Could not find a clear main content element for {url}. Falling back to body.")
+        main_content = soup.body
+
+    # Remove common unwanted elements like scripts, styles, navs, footers
+    for element in main_content(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+        element.decompose()
+
+    # Get text and clean it up
+    text = main_content.get_text(separator='\n', strip=True)
+    # Remove excessive blank lines
+    cleaned_text = re.sub(r'\n\s*\n', '\n\n', text)
+
+    return cleaned_text
+
+
+def save_article(url, content):
+    filepath = output_path(url)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(content)
+    print(f"Successfully saved content to {filepath}")
+    return filepath
+
+
 def scrape_and_clean_article(url):
     """
     Scrapes the main content of an article from a URL, cleaning out boilerplate.
@@ -22,60 +69,81 @@ def scrape_and_clean_article(url):
     print(f"Scraping: {url}")
     try:
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36'
+            'User-Agent': USER_AGENT
         }
         response = requests.get(url, headers=headers, timeout=15)
         response.raise_for_status()  # Raise an exception for bad status codes
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # --- Content Extraction Logic ---
-        # This is the most crucial part. We try different common tags for main content.
-        # You might need to adjust this based on the websites you scrape.
-        main_content = soup.find('article') or soup.find('main') or soup.find(id='main-content') or soup.find(class_='post-content')
-        
-        if not main_content:
-            print(f"Warning: Could not find a clear main content element for {url}. Falling back to body.")
-            main_content = soup.body
-
-        # Remove common unwanted elements like scripts, styles, navs, footers
-        for element in main_content(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-            element.decompose()
-
-        # Get text and clean it up
-        text = main_content.get_text(separator='\n', strip=True)
-        # Remove excessive blank lines
-        cleaned_text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        return cleaned_text
+        return clean_article(response.text, url)
 
     except requests.RequestException as e:
         print(f"Error fetching {url}: {e}")
         return None
 
-# --- 3. Main Execution ---
-if __name__ == "__main__":
-    if not os.path.exists(KNOWLEDGE_BASE_DIR):
-        os.makedirs(KNOWLEDGE_BASE_DIR)
 
-    print(f"--- Starting Knowledge Base Population from {len(URLS_TO_SCRAPE)} URLs ---")
-
-    for url in URLS_TO_SCRAPE:
+def crawl_sequential(urls, frontier=None):
+    """The original one-at-a-time crawl, kept for debugging a single site"""
+    for url in urls:
         content = scrape_and_clean_article(url)
-        
+
         if content:
-            # Create a simple filename from the URL
-            filename = url.split("/")[-2] + ".txt"
-            filepath = os.path.join(KNOWLEDGE_BASE_DIR, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"Successfully saved content to {filepath}")
+            filepath = save_article(url, content)
+            if frontier is not None:
+                frontier.mark(url, 'fetched', file=filepath)
         else:
             print(f"Failed to retrieve content from {url}")
+            if frontier is not None:
+                frontier.mark(url, 'failed')
 
         # Be a good web citizen: wait a second between requests
         time.sleep(1)
 
-    print("--- Knowledge Base Population Complete ---")
+
+async def crawl_concurrent(urls, concurrency=CRAWL_CONCURRENCY, fresh=False, frontier=None):
+    """
+    Fetches pages concurrently over one session while staying polite to each host
+    (robots.txt, crawl-delay, at least a second between requests to the same host).
+    Pages that return 304 Not Modified keep their existing file.
+    Each URL's outcome is written back to the frontier when one is given.
+    """
+    async def handle_page(url, html):
+        # BeautifulSoup is CPU work, keep it off the event loop so other fetches keep going
+        content = await asyncio.to_thread(clean_article, html, url)
+        if not content:
+            print(f"Failed to retrieve content from {url}")
+            return {'file': None}
+        return {'file': save_article(url, content)}
+
+    crawler = PoliteCrawler(USER_AGENT, concurrency=concurrency, state=CrawlState())
+    on_status = frontier.mark if frontier is not None else None
+    counts = await crawler.crawl(urls, handle_page, has_output=lambda url: os.path.exists(output_path(url)),
+                                 fresh=fresh, on_status=on_status)
+    print(f"fetched {counts['fetched']}, unchanged {counts['not_modified']}, disallowed {counts['skipped_robots']}, "
+          f"failed {counts['failed']}, already done before resume {counts['resumed']}")
+    return counts
+
+# --- 3. Main Execution ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape the URL frontier into knowledge_base/*.txt")
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY, help="requests in flight across all hosts")
+    parser.add_argument("--fresh", action="store_true", help="start a new run instead of resuming an unfinished one")
+    parser.add_argument("--sequential", action="store_true", help="one request at a time, no robots / conditional requests")
+    parser.add_argument("--all", action="store_true", help="revisit every known URL, not only new or failed ones")
+    args = parser.parse_args()
+
+    if not os.path.exists(KNOWLEDGE_BASE_DIR):
+        os.makedirs(KNOWLEDGE_BASE_DIR)
+
+    frontier = URLFrontier()
+    frontier.add_many(URLS_TO_SCRAPE, topic="seed")
+    urls = frontier.urls() if args.all else frontier.pending()
+
+    print(f"--- Starting Knowledge Base Population from {len(urls)} URLs (frontier: {frontier.counts()}) ---")
+
+    start = time.perf_counter()
+    if args.sequential:
+        crawl_sequential(urls, frontier=frontier)
+    else:
+        asyncio.run(crawl_concurrent(urls, concurrency=args.concurrency, fresh=args.fresh, frontier=frontier))
+
+    print(f"--- Knowledge Base Population Complete ({time.perf_counter() - start:.1f}s) ---")
 
@@ -1,13 +1,72 @@
+import os
 import streamlit as st
 from agents.agent_orchestrator import create_agent
+from agents.streaming import stream_agent_events
+from agents.conversation_memory import ConversationMemory
+from tools import telemetry
 from langchain_core.messages import HumanMessage, AIMessage
 
 st.set_page_config(page_title="🤖 AI Travel Agent", layout="wide")
 st.title("🤖 Your Personal AI Travel Agent")
 
-agent_executor = create_agent()
+@st.cache_resource(show_spinner=False)
+def get_agent_executor():
+    # built once per server process, every rerun and session reuses it
+    return create_agent()
+
+agent_executor = get_agent_executor()
+
+@st.cache_resource(show_spinner=False)
+def start_telemetry():
+    # Prometheus /metrics on TELEMETRY_PORT, one server per process
+    return telemetry.start_metrics_server()
+
+start_telemetry()
+
+# STREAM_RESPONSES=0 falls back to the blocking invoke behind a spinner
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") != "0"
+
+
+def stream_response(inputs):
+    """Shows tool progress in a status box and the answer token by token, returns the final answer"""
+    status = None
+    answer_placeholder = st.empty()
+    streamed = ""
+    final_output = None
+
+    for event in stream_agent_events(agent_executor, inputs):
+        if event.kind == "tool_start":
+            if status is None:
+                status = st.status("Working on it…", expanded=False)
+            status.update(label=event.text)
+            status.write(event.text)
+            # text the model wrote before deciding to call a tool is not the answer
+            streamed = ""
+            answer_placeholder.empty()
+        elif event.kind == "tool_end":
+            status.write(f"✓ {event.text.rstrip('…')}")
+        elif event.kind == "tool_failed":
+            status.write(f"✗ {event.text.rstrip('…')}")
+        elif event.kind == "token":
+            streamed += event.text
+            answer_placeholder.markdown(streamed + "▌")
+        elif event.kind == "final":
+            final_output = event.text or streamed
+        elif event.kind == "error":
+            if status is not None:
+                status.update(label="Something went wrong", state="error")
+            raise event.data
+
+    if status is not None:
+        status.update(label="Done", state="complete")
+    answer_placeholder.markdown(final_output)
+    return final_output
 
 # Initializing chat history in st.session_state
+# full history is kept for display, the agent only sees memory.prompt_history(...)
+if "memory" not in st.session_state:
+    st.session_state.memory = ConversationMemory()
+
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = [
         AIMessage(
@@ -31,15 +90,19 @@ if user_query is not None and user_query.strip() != "":
     with st.chat_message("Human"):
         st.markdown(user_query)
     
-    with st.chat_message("AI"):
-        with st.spinner("Thinking..."):
-            response = agent_executor.invoke(
-                {
-                    "input": user_query,
-                    "chat_history": st.session_state.chat_history
-                }
-            )
-
-            st.markdown(response["output"])
-    
-    st.session_state.chat_history.append(AIMessage(content=response["output"]))
\ No newline at end of file
+    inputs = {
+        "input": user_query,
+        "chat_history": st.session_state.memory.prompt_history(st.session_state.chat_history)
+    }
+    # one trace per turn: its breakdown (LLM vs tools vs HTTP / Selenium time) goes to the telemetry log
+    with st.chat_message("AI"), telemetry.trace("chat_turn", streaming=STREAM_RESPONSES):
+        if STREAM_RESPONSES:
+            output = stream_response(inputs)
+        else:
+            with st.spinner("Thinking..."):
+                output = agent_executor.invoke(inputs)["output"]
+                st.markdown(output)
+
+    st.session_state.chat_history.append(AIMessage(content=output))
+    # after the answer is on screen, so summarizing never delays a reply
+    st.session_state.memory.compact(st.session_state.chat_history)
\ No newline at end of file
@@ -0,0 +1,149 @@
+# Content-addressed, disk-backed cache for chat model calls, plugs into LangChain's `cache=` hook
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "scraped_data/llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    llm_string carries the deployment, temperature and any bound tools / response_format
+    (which is how with_structured_output passes the schema), prompt carries the messages.
+    """
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode('utf-8')).hexdigest()
+
+
+class DiskLLMCache(BaseCache):
+    """SQLite store of serialized generations, least recently used entries go first once max_bytes is exceeded"""
+
+    def __init__(self, db_path: str = LLM_CACHE_DB, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        # running byte total, so updates don't scan the table; recounted exactly whenever it passes max_bytes
+        self._bytes = self._stored_bytes()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _stored_bytes(self) -> int:
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        conn = self._connection()
+        row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            generations = loads(row[0])
+        except Exception as e:
+            print(f"Dropping unreadable LLM cache entry: {e}")
+            with conn:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+        with conn:
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = dumps(list(return_val))
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (cache_key(prompt, llm_string), value, size, time.time())
+            )
+        with self._lock:
+            # a replaced entry is counted twice here, the recount in _evict corrects that
+            self._bytes += size
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        conn = self._connection()
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            with self._lock:
+                self._bytes = total
+            return
+
+        # trim to 90% so we don't evict on every insert once full
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        with conn:
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        with self._lock:
+            self._bytes = total - freed
+
+    def clear(self, **kwargs: Any) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM llm_cache")
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'name': 'llm',
+            'entries': self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0],
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> DiskLLMCache:
+    """One cache instance per process, shared by every model built with cache=True"""
+    from tools.telemetry import register_stats
+    cache = DiskLLMCache()
+    register_stats("cache", "llm", cache.stats)
+    return cache
@@ -1,5 +1,6 @@
 from langchain_openai import AzureChatOpenAI
 from dotenv import load_dotenv
+from functools import lru_cache
 import os
 
 load_dotenv()
@@ -8,15 +9,33 @@ key = os.getenv("AZURE_OPENAI_API_KEY")
 endpoint = os.getenv("AZURE_OPENAI_API_ENDPOINT")
 version = os.getenv("AZURE_OPENAI_API_VERSION")
 
-def build_llm() :
+def build_llm(temperature: float = 1, cache: bool = False) :
+    """
+    cache=True answers repeated identical calls from the disk cache in models/llm_cache.py.
+    Only worth it for deterministic calls (temperature 0) such as structured extraction.
+    """
+    llm_cache = None
+    if cache and os.getenv("LLM_CACHE_ENABLED", "1") != "0":
+        from models.llm_cache import get_llm_cache
+        llm_cache = get_llm_cache()
+
+    # latency and token counts of every call, see tools/telemetry.py
+    from tools.telemetry import get_callback_handler
+    handler = get_callback_handler()
+
     llm = AzureChatOpenAI (
         api_key=key,
         azure_endpoint=endpoint,
         api_version=version,
         deployment_name="gpt-4o",
-        temperature=1
+        temperature=temperature,
+        cache=llm_cache,
+        callbacks=[handler] if handler else None
     )
 
     return llm
 
-    
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_llm(temperature: float = 1, cache: bool = False):
+    """Process-wide shared client per (temperature, cache) so reruns don't rebuild it"""
+    return build_llm(temperature=temperature, cache=cache)
@@ -1,66 +1,316 @@
 import os
-import chromadb
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain_community.embeddings import SentenceTransformerEmbeddings
+import json
+import time
+import glob
+import hashlib
+import argparse
+from langchain_community.document_loaders import TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
+from tools.embedding_pipeline import EmbeddingPipeline, EMBEDDING_MODEL, EMBED_BATCH_SIZE, EMBED_WORKERS
+from tools.embedding_cache import get_embedding_cache, EMBEDDING_CACHE_ENABLED
+from tools.near_dedup import DedupStage, DEDUP_THRESHOLD
+from tools.bm25_index import BM25Index
+from tools.vector_store import build_from_chroma, MemmapVectorStore, MEMMAP_STORE_DIR, MEMMAP_DTYPE
 
 KNOWLEDGE_BASE_DIR  = "knowledge_base"
 CHROMA_PERSIST_DIR =  "chroma_db"
+# which file / chunk hashes are already in the collection, so a re-run only touches what changed
+MANIFEST_FILE = os.path.join(CHROMA_PERSIST_DIR, "seed_manifest.json")
 
-print("starting database seeding")
+# RecursiveCharacterTextSplitter tries to break text intelligently: It first tries splitting by paragraphs (\n\n).
+# If the chunk is still too big, it tries sentences. Then words.nFinally, if needed, by characters.
+text_splitter = RecursiveCharacterTextSplitter(chunk_size = 1000, chunk_overlap=200)
 
-print("Loading docs from {KNOWLEDGE_BASE_DIR}")
 
-#make an object of DirectoryLoader class
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            sha.update(block)
+    return sha.hexdigest()
 
-loader = DirectoryLoader(
-    KNOWLEDGE_BASE_DIR,
-    glob="**/*.txt",#glob — Unix style pathname pattern expansion 
-    loader_cls=TextLoader,
-    loader_kwargs={'encoding':'utf-8'},
-    show_progress=True
-)
 
-# loader itself is like a “manager” that:
-# Knows where to search (KNOWLEDGE_BASE_DIR).
-# Knows what to include (glob="**/*.txt").
-# Knows how to read each file (loader_cls=TextLoader).
-# Knows extra settings for reading (loader_kwargs).
+def chunk_ids(source, chunks):
+    """
+    Content-addressed ids: the same chunk text from the same file always gets the same id,
+    so upserts are idempotent and an edit only changes the ids of the chunks it touched.
+    """
+    ids = []
+    seen = {}
+    for chunk in chunks:
+        digest = hashlib.sha256(f"{source}\x00{chunk.page_content}".encode('utf-8')).hexdigest()
+        # identical chunks inside one file still need distinct ids
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return ids
 
-documents = loader.load()#returns a list, documents is a list
-print(f"loaded {len(documents)} documents")
 
-# -----------split documents into chunks----------------
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return None
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading seed manifest, falling back to a full rebuild: {e}")
+        return None
 
-text_splitter = RecursiveCharacterTextSplitter(chunk_size = 1000, chunk_overlap=200)
-# RecursiveCharacterTextSplitter tries to break text intelligently: It first tries splitting by paragraphs (\n\n).
-# If the chunk is still too big, it tries sentences. Then words.nFinally, if needed, by characters.
-docs = text_splitter.split_documents(documents)
 
-# Input: a list of LangChain Document objects.
-# Output: a list of new Document objects, each chunk is a document, and metadata is preserved.
-# in case of .split_text(text) input is a single string and outpur is list of strings
-# docs = RecursiveCharacterTextSplitter(chunk_size = 1000, chunk_overlap=200).split_documents(documents)
+def save_manifest(manifest):
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    tmp_file = f"{MANIFEST_FILE}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_file, MANIFEST_FILE)
+
+
+def split_file(path):
+    # TextLoader gives one Document per file with metadata {'source': path}, the same as DirectoryLoader did
+    documents = TextLoader(path, encoding='utf-8').load()
+    return text_splitter.split_documents(documents)
+
+
+def load_file_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def find_orphaned(old_files, paths, changed):
+    """
+    Unchanged files that left content out as a copy of something in `changed` (edited or removed files):
+    a whole file skipped as duplicate_of one of them, or a chunk dropped as a copy of one of their chunks.
+    Those files are looked at again, they may lose further chunks and so orphan others in turn.
+    """
+    owner = {chunk_id: path for path, entry in old_files.items() for chunk_id in entry['chunk_ids']}
+    orphaned = set()
+    while True:
+        stale = changed.union(orphaned)
+        found = set()
+        for path in paths:
+            entry = old_files.get(path)
+            if entry is None or path in stale:
+                continue
+            # a target without an owner is already gone from the store
+            targets = {owner.get(target) for target in entry.get('chunk_duplicate_of', {}).values()}
+            if entry.get('duplicate_of') in stale or targets & stale or None in targets:
+                found.add(path)
+        if not found:
+            return orphaned
+        orphaned |= found
+
+
+def plan_changes(manifest, dedup=None):
+    """
+    Compare knowledge_base/ against the manifest, only new or edited files are loaded and split.
+    With a DedupStage, near-duplicate files and chunks are left out; files already in the store
+    are indexed first so new content is compared against them as well.
+    """
+    old_files = manifest.get('files', {})
+    paths = sorted(glob.glob(os.path.join(KNOWLEDGE_BASE_DIR, "**", "*.txt"), recursive=True))
+    hashes = {path: file_hash(path) for path in paths}
+    # deciding what is a duplicate again means looking at every file, and turning dedup off
+    # has to bring back the files and chunks an earlier deduplicated seed left out
+    threshold = None if dedup is None else dedup.threshold
+    recheck_all = bool(old_files) and manifest.get('dedup_threshold') != threshold
+
+    removed = [path for path in old_files if path not in hashes]
+    edited = {path for path in paths if path in old_files and old_files[path]['hash'] != hashes[path]}
+    orphaned = find_orphaned(old_files, paths, edited.union(removed))
+    to_process = [path for path in paths if path not in old_files or path in edited or path in orphaned or recheck_all]
+
+    plan = {'add': [], 'add_ids': [], 'delete_ids': [], 'files': {},
+            'new_files': [], 'changed_files': [], 'removed_files': removed, 'unchanged_files': []}
+    for path in paths:
+        if path not in to_process:
+            plan['unchanged_files'].append(path)
+            plan['files'][path] = old_files[path]
+            if dedup is not None and to_process:
+                chunks = split_file(path)
+                kept = set(old_files[path]['chunk_ids'])
+                dedup.seed(path, load_file_text(path),
+                           [(chunk_id, chunk.page_content) for chunk, chunk_id in zip(chunks, chunk_ids(path, chunks)) if chunk_id in kept])
+
+    for path in to_process:
+        previous = old_files.get(path)
+        chunks = split_file(path)
+        ids = chunk_ids(path, chunks)
+        entry = {'hash': hashes[path], 'chunk_ids': ids}
+
+        if dedup is not None:
+            duplicate_of = dedup.check_document(path, load_file_text(path))
+            if duplicate_of is not None:
+                print(f"  duplicate {path} ~ {duplicate_of}")
+                chunks, ids = [], []
+                entry = {'hash': hashes[path], 'chunk_ids': [], 'duplicate_of': duplicate_of}
+            else:
+                duplicates = dedup.filter_chunks(list(zip(ids, (chunk.page_content for chunk in chunks))))
+                kept = [(chunk, chunk_id) for chunk, chunk_id in zip(chunks, ids) if duplicates[chunk_id] is None]
+                chunks, ids = [chunk for chunk, _ in kept], [chunk_id for _, chunk_id in kept]
+                entry['chunk_ids'] = ids
+                dropped = {chunk_id: target for chunk_id, target in duplicates.items() if target is not None}
+                if dropped:
+                    # dropped chunk -> chunk it matched, see find_orphaned
+                    entry['chunk_duplicate_of'] = dropped
+
+        old_ids = set(previous['chunk_ids']) if previous else set()
+        for chunk, chunk_id in zip(chunks, ids):
+            if chunk_id not in old_ids:
+                plan['add'].append(chunk)
+                plan['add_ids'].append(chunk_id)
+        plan['delete_ids'].extend(old_ids - set(ids))
+        plan['files'][path] = entry
+        if previous is None:
+            plan['new_files'].append(path)
+        elif previous['hash'] != hashes[path]:
+            plan['changed_files'].append(path)
+        else:
+            plan['unchanged_files'].append(path)
+
+    for path in removed:
+        plan['delete_ids'].extend(old_files[path]['chunk_ids'])
+    return plan
+
+
+def print_plan(plan):
+    print(f"files: {len(plan['new_files'])} new, {len(plan['changed_files'])} changed, "
+          f"{len(plan['removed_files'])} removed, {len(plan['unchanged_files'])} unchanged")
+    for label in ('new_files', 'changed_files', 'removed_files'):
+        for path in plan[label]:
+            print(f"  {label.split('_')[0]:<8} {path}")
+    print(f"chunks: {len(plan['add'])} to embed and add, {len(plan['delete_ids'])} to delete")
+
+
+def open_store():
+    from langchain_chroma import Chroma
+    # no embedding function needed here, vectors come from the EmbeddingPipeline
+    return Chroma(persist_directory=CHROMA_PERSIST_DIR)
+
+
+def sync_bm25_index(plan, rebuild, open_collection):
+    """
+    Mirror the plan into the BM25 index under the same chunk ids, then repair any drift
+    (e.g. the index is newer than the vector store) by copying missing chunks from Chroma.
+    """
+    bm25 = BM25Index()
+    if rebuild:
+        bm25.reset()
+    if plan['delete_ids']:
+        bm25.delete(plan['delete_ids'])
+    if plan['add']:
+        bm25.upsert(plan['add_ids'], [chunk.page_content for chunk in plan['add']],
+                    [chunk.metadata for chunk in plan['add']])
+
+    expected = {chunk_id for entry in plan['files'].values() for chunk_id in entry['chunk_ids']}
+    indexed = bm25.ids()
+    stale = list(indexed - expected)
+    missing = list(expected - indexed)
+    if stale:
+        bm25.delete(stale)
+    if missing:
+        collection = open_collection()
+        for start in range(0, len(missing), 1000):
+            stored = collection.get(ids=missing[start:start + 1000], include=['documents', 'metadatas'])
+            bm25.upsert(stored['ids'], stored['documents'], stored['metadatas'])
+    if stale or missing:
+        print(f"BM25 index: backfilled {len(missing)} chunks, removed {len(stale)} stale ones")
+    print(f"BM25 index count: {bm25.count()}")
+
+
+def build_memmap_store(collection, dtype=MEMMAP_DTYPE, nlist=None):
+    """Quantized copy of the collection's vectors for KB_VECTOR_BACKEND=memmap, rebuilt whole (no embedding involved)"""
+    count = collection.count()
+    if nlist is None:
+        # IVF only pays off once brute force gets slow
+        nlist = int(count ** 0.5) if count >= 20000 else 0
+    store = build_from_chroma(collection, MEMMAP_STORE_DIR, dtype=dtype, nlist=nlist)
+    print(f"memmap store: {store.meta['count']} vectors as {dtype}, {store.nbytes() / 1e6:.1f} MB, "
+          f"{'IVF nlist=' + str(nlist) if store.meta['nlist'] else 'brute force'}")
+
+
+def seed(full=False, dry_run=False, batch_size=EMBED_BATCH_SIZE, workers=EMBED_WORKERS, dedup_threshold=DEDUP_THRESHOLD,
+         memmap=False, memmap_dtype=MEMMAP_DTYPE, ivf_nlist=None, embedding_cache=EMBEDDING_CACHE_ENABLED):
+    start = time.perf_counter()
+    print("starting database seeding")
+
+    manifest = None if full else load_manifest()
+    if manifest and manifest.get('embedding_model') != EMBEDDING_MODEL:
+        print(f"manifest was built with {manifest.get('embedding_model')}, re-embedding everything")
+        manifest = None
+    rebuild = manifest is None
+    if rebuild:
+        print("no manifest (or --full): every file is treated as new and the collection is rebuilt")
+    # dedup_threshold=None (--no-dedup) embeds everything
+    dedup = DedupStage(dedup_threshold) if dedup_threshold is not None else None
+    plan = plan_changes(manifest or {}, dedup=dedup)
+    print_plan(plan)
+    if dedup is not None:
+        print(dedup.report())
+
+    if dry_run:
+        print(f"dry run, nothing written ({time.perf_counter() - start:.2f}s)")
+        return plan
+
+    if not rebuild and not plan['add'] and not plan['delete_ids']:
+        save_manifest({'files': plan['files'], 'embedding_model': EMBEDDING_MODEL, 'dedup_threshold': dedup_threshold})
+        sync_bm25_index(plan, rebuild=False, open_collection=lambda: open_store()._collection)
+        if memmap and not MemmapVectorStore.exists(MEMMAP_STORE_DIR):
+            build_memmap_store(open_store()._collection, memmap_dtype, ivf_nlist)
+        print(f"knowledge base unchanged ({time.perf_counter() - start:.2f}s)")
+        return plan
 
-print(f"split documents into {len(docs)} chunks")
+    print("----------Now Initializing Embedding pipeline-----------------")
+    db = open_store()
+    if rebuild:
+        # chunks seeded before the manifest existed have random ids and can't be matched, start clean
+        db.reset_collection()
 
-print("----------Now Initializing Embedding model-----------------")
+    if plan['delete_ids']:
+        db.delete(ids=plan['delete_ids'])
+    if plan['add']:
+        # embeddings are computed by the pipeline and upserted straight into the collection,
+        # upserts are idempotent so re-running after a crash is safe, and the embedding cache
+        # makes that re-run (or a --full rebuild with new chunk / HNSW settings) mostly free
+        cache = get_embedding_cache() if embedding_cache else None
+        with EmbeddingPipeline(EMBEDDING_MODEL, batch_size=batch_size, workers=workers, cache=cache) as pipeline:
+            throughput = pipeline.upsert(
+                db._collection,
+                plan['add_ids'],
+                [chunk.page_content for chunk in plan['add']],
+                [chunk.metadata for chunk in plan['add']]
+            )
+        print(f"embedded {throughput['chunks']} chunks ({throughput['cached']} from the cache) at {throughput['chunks_per_second']} chunks/s "
+              f"(batch size {batch_size}, {workers} worker{'s' if workers > 1 else ''}, "
+              f"embedding {throughput['embed_seconds']}s, writing {throughput['write_seconds']}s)")
 
-embedding_function = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-# SentenceTransformerEmbeddings = a LangChain wrapper around HuggingFace’s SentenceTransformers library.
+    save_manifest({'files': plan['files'], 'embedding_model': EMBEDDING_MODEL, 'dedup_threshold': dedup_threshold})
+    # lexical side of hybrid retrieval, same chunk ids as the vectors
+    sync_bm25_index(plan, rebuild, open_collection=lambda: db._collection)
+    if memmap:
+        build_memmap_store(db._collection, memmap_dtype, ivf_nlist)
 
-print(f"creating chromaDB at {CHROMA_PERSIST_DIR}")
-# -------------------------crearing chroma db----------------------
+    print("Database updated")
+    print(f"chromaDB collection count: {db._collection.count()}")
+    print(f"took {time.perf_counter() - start:.2f}s")
+    return plan
 
-db= Chroma.from_documents(
-    docs, 
-    embedding_function,
-    persist_directory=CHROMA_PERSIST_DIR
-)
-# db is your LangChain Chroma vectorstore object.
-#.from_documents is a class method to create a chroma db directly from your documents
 
-print("Database made")
-print(f"Total chunks processed  {len(docs)}")
-print(f"chromaDB collection count: {db._collection.count()}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed knowledge_base/*.txt into the Chroma store, only re-embedding what changed")
+    parser.add_argument("--full", action="store_true", help="drop the collection and re-embed every file")
+    parser.add_argument("--dry-run", action="store_true", help="print what would be added / deleted and exit")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="chunks per model forward pass")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="CPU processes used for embedding")
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD,
+                        help="drop documents / chunks whose estimated Jaccard similarity to earlier ones is at least this")
+    parser.add_argument("--no-dedup", action="store_true", help="embed near-duplicates too")
+    parser.add_argument("--memmap", action="store_true", default=os.getenv("KB_VECTOR_BACKEND") == "memmap",
+                        help="also write the quantized memory-mapped copy used by KB_VECTOR_BACKEND=memmap")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="embed every chunk with the model, ignoring cached vectors")
+    parser.add_argument("--memmap-dtype", choices=["int8", "float16"], default=MEMMAP_DTYPE)
+    parser.add_argument("--ivf-nlist", type=int, default=None, help="IVF clusters for the memmap store (0 = brute force, default: auto)")
+    args = parser.parse_args()
+    seed(full=args.full, dry_run=args.dry_run, batch_size=args.batch_size, workers=args.workers,
+         dedup_threshold=None if args.no_dedup else args.dedup_threshold,
+         memmap=args.memmap, memmap_dtype=args.memmap_dtype, ivf_nlist=args.ivf_nlist,
+         embedding_cache=EMBEDDING_CACHE_ENABLED and not args.no_embedding_cache)
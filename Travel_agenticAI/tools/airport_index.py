@@ -0,0 +1,254 @@
+# In-memory index over airportsdata so city -> IATA lookups don't scan the whole table
+import re
+import unicodedata
+import difflib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Any
+
+# Well known hubs, also used as the fallback mapping in APICaller.get_main_iata_for_place
+CITY_TO_IATA = {
+    'delhi': 'DEL',
+    'new delhi': 'DEL',
+    'london': 'LHR',
+    'mumbai': 'BOM',
+    'chennai': 'MAA',
+    'bangalore': 'BLR',
+    'bengaluru': 'BLR',
+    'kolkata': 'CCU',
+    'paris': 'CDG',
+    'new york': 'JFK',
+    'los angeles': 'LAX',
+    'tokyo': 'NRT',
+    'dubai': 'DXB',
+    'singapore': 'SIN',
+    'hong kong': 'HKG',
+    'amsterdam': 'AMS',
+    'frankfurt': 'FRA',
+    'madrid': 'MAD',
+    'rome': 'FCO',
+    'sydney': 'SYD',
+    'melbourne': 'MEL',
+    'toronto': 'YYZ',
+    'vancouver': 'YVR',
+    'beijing': 'PEK',
+    'shanghai': 'PVG',
+    'seoul': 'ICN',
+    'bangkok': 'BKK',
+    'kuala lumpur': 'KUL',
+    'istanbul': 'IST',
+    'cairo': 'CAI',
+    'johannesburg': 'JNB',
+    'sao paulo': 'GRU',
+    'mexico city': 'MEX',
+    'montreal': 'YUL'
+}
+
+MAJOR_HUBS = set(CITY_TO_IATA.values())
+
+# Words that appear in thousands of airport names and say nothing about the place
+GENERIC_NAME_TOKENS = {
+    'airport', 'international', 'intl', 'aerodrome', 'airfield', 'field', 'regional',
+    'municipal', 'the', 'de', 'del', 'da', 'do', 'of', 'la', 'el', 'air', 'base', 'afb'
+}
+
+MINOR_FACILITY_TOKENS = {'heliport', 'airstrip', 'airfield', 'field', 'strip', 'seaplane', 'base', 'afb', 'army'}
+
+# Match tiers, lower is better
+TIER_EXACT_CITY = 0
+TIER_CITY_TOKEN = 1
+TIER_NAME_TOKEN = 2
+TIER_PREFIX = 3
+TIER_FUZZY = 4
+
+
+@lru_cache(maxsize=1)
+def load_airports() -> Dict[str, Dict[str, Any]]:
+    """Load the airportsdata IATA table once per process"""
+    import airportsdata
+    return airportsdata.load('IATA')
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r'[^a-z0-9]+', ' ', text.lower())
+    return text.strip()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in normalize_text(text).split() if token not in GENERIC_NAME_TOKENS]
+
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def airport_importance(iata_code: str, airport_data: Dict[str, Any], city_airport_count: int = 1) -> float:
+    """Heuristic importance score, airportsdata has no passenger numbers so we use the name and hub list"""
+    name_tokens = set(normalize_text(airport_data.get('name', '')).split())
+    score = 0.0
+
+    if iata_code in MAJOR_HUBS:
+        score += 6
+    if 'international' in name_tokens or 'intl' in name_tokens:
+        score += 4
+    if 'airport' in name_tokens:
+        score += 1
+    if name_tokens & MINOR_FACILITY_TOKENS:
+        score -= 3
+    if airport_data.get('icao'):
+        score += 0.5
+    # cities served by several airports are usually the bigger ones
+    score += min(city_airport_count - 1, 4) * 0.5
+
+    return score
+
+
+class _PrefixTrie:
+    """Character trie mapping every indexed key to itself, used for prefix completion"""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key: str):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node['$'] = key
+
+    def keys_with_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        found = []
+        stack = [node]
+        while stack and len(found) < limit:
+            current = stack.pop()
+            for ch, child in current.items():
+                if ch == '$':
+                    found.append(child)
+                else:
+                    stack.append(child)
+        return found
+
+
+class AirportIndex:
+    """Prebuilt lookup structures over the airportsdata IATA table"""
+
+    def __init__(self, airports: Dict[str, Dict[str, Any]]):
+        self.airports = airports
+        self.city_map = defaultdict(set)        # normalized full city name -> codes
+        self.city_token_map = defaultdict(set)  # single token from the city name -> codes
+        self.name_token_map = defaultdict(set)  # single token from the airport name -> codes
+        self.trie = _PrefixTrie()
+        self.importance = {}
+
+        city_counts = defaultdict(int)
+        for airport_data in airports.values():
+            city_counts[(normalize_text(airport_data.get('city', '')), airport_data.get('country', ''))] += 1
+
+        for iata_code, airport_data in airports.items():
+            city = airport_data.get('city', '')
+            city_norm = normalize_text(city)
+            if city_norm:
+                self.city_map[city_norm].add(iata_code)
+                # airportsdata stores some cities as "Bengkulu, Sumatra Island"
+                head = normalize_text(city.split(',')[0])
+                if head and head != city_norm:
+                    self.city_map[head].add(iata_code)
+
+            for token in tokenize(city):
+                self.city_token_map[token].add(iata_code)
+            for token in tokenize(airport_data.get('name', '')):
+                self.name_token_map[token].add(iata_code)
+
+            self.importance[iata_code] = airport_importance(
+                iata_code, airport_data, city_counts[(city_norm, airport_data.get('country', ''))]
+            )
+
+        for key in set(self.city_map) | set(self.city_token_map) | set(self.name_token_map):
+            self.trie.insert(key)
+
+        # character bigrams narrow the fuzzy fallback down to a handful of candidates
+        self.bigram_map = defaultdict(set)
+        for key in set(self.city_map) | set(self.name_token_map):
+            for bigram in _bigrams(key):
+                self.bigram_map[bigram].add(key)
+
+    def _codes_for_key(self, key: str) -> set:
+        return self.city_map.get(key, set()) | self.city_token_map.get(key, set()) | self.name_token_map.get(key, set())
+
+    def _token_match(self, tokens: List[str], token_map: Dict[str, set]) -> set:
+        """Airports that contain every query token"""
+        if not tokens:
+            return set()
+        matched = None
+        for token in tokens:
+            codes = token_map.get(token, set())
+            matched = set(codes) if matched is None else matched & codes
+            if not matched:
+                return set()
+        return matched
+
+    def _fuzzy_keys(self, query: str, limit: int = 5, cutoff: float = 0.8) -> List[str]:
+        query_bigrams = _bigrams(query)
+        shared = defaultdict(int)
+        for bigram in query_bigrams:
+            for key in self.bigram_map.get(bigram, ()):
+                shared[key] += 1
+
+        min_shared = len(query_bigrams) // 2
+        candidates = [key for key, count in shared.items()
+                      if count >= min_shared and abs(len(key) - len(query)) <= 2]
+        return difflib.get_close_matches(query, candidates, n=limit, cutoff=cutoff)
+
+    def search(self, city: str, country: Optional[str] = None, max_results: int = 3, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """Find airports for a city, best match tier first and then by airport importance"""
+        query = normalize_text(city)
+        if not query:
+            return []
+        tokens = tokenize(city) or query.split()
+
+        tiers = {}
+
+        def add(codes, tier):
+            for code in codes:
+                if code not in tiers or tier < tiers[code]:
+                    tiers[code] = tier
+
+        add(self.city_map.get(query, set()), TIER_EXACT_CITY)
+        add(self._token_match(tokens, self.city_token_map), TIER_CITY_TOKEN)
+        add(self._token_match(tokens, self.name_token_map), TIER_NAME_TOKEN)
+
+        if not tiers and len(query) >= 3:
+            for key in self.trie.keys_with_prefix(query):
+                add(self._codes_for_key(key), TIER_PREFIX)
+
+        if not tiers and fuzzy and len(query) >= 4:
+            for key in self._fuzzy_keys(query):
+                add(self._codes_for_key(key), TIER_FUZZY)
+
+        if country:
+            country_lc = country.lower()
+            tiers = {code: tier for code, tier in tiers.items()
+                     if self.airports[code].get('country', '').lower() == country_lc}
+
+        ranked = sorted(tiers, key=lambda code: (tiers[code], -self.importance[code], code))
+
+        results = []
+        for iata_code in ranked[:max_results]:
+            airport_data = self.airports[iata_code]
+            results.append({
+                'airport_name': airport_data.get('name'),
+                'iata_code': iata_code,
+                'city': airport_data.get('city'),
+                'country': airport_data.get('country')
+            })
+        return results
@@ -1,14 +1,31 @@
 # weather and flight APIs are working, rest are not working
-import requests
 import json
 import os
 from typing import Dict, Optional, Any
 from datetime import datetime, timedelta
-import airportsdata
 from dotenv import load_dotenv
+from tools.airport_index import AirportIndex, CITY_TO_IATA, load_airports, normalize_text
+from tools.http_client import HTTPClient
+from tools.ttl_cache import TTLCache
+from tools.request_coalescing import SingleFlight, QuotaBudget
+from tools.telemetry import register_stats, span
 
 load_dotenv()
 
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "1800"))
+WEATHER_CACHE_STALE_TTL = int(os.getenv("WEATHER_CACHE_STALE_TTL", "10800"))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "512"))
+WEATHER_CACHE_FILE = os.getenv("WEATHER_CACHE_FILE", "scraped_data/weather_cache.json")
+FLIGHT_CACHE_TTL = int(os.getenv("FLIGHT_CACHE_TTL", "600"))
+FLIGHT_CACHE_SIZE = int(os.getenv("FLIGHT_CACHE_SIZE", "512"))
+ROUTE_CACHE_TTL = int(os.getenv("ROUTE_CACHE_TTL", str(7 * 24 * 3600)))
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "2048"))
+ROUTE_CACHE_FILE = os.getenv("ROUTE_CACHE_FILE", "scraped_data/route_cache.json")
+AVIATIONSTACK_MONTHLY_QUOTA = int(os.getenv("AVIATIONSTACK_MONTHLY_QUOTA", "100"))
+AVIATIONSTACK_QUOTA_RESERVE = int(os.getenv("AVIATIONSTACK_QUOTA_RESERVE", "5"))
+AVIATIONSTACK_QUOTA_FILE = os.getenv("AVIATIONSTACK_QUOTA_FILE", "scraped_data/aviationstack_quota.json")
+OPENWEATHER_API_ENDPOINT = os.getenv("OPENWEATHER_API_ENDPOINT", "http://api.openweathermap.org/data/2.5")
+
 class APICallerError(Exception):
     """Custom exception for API caller errors"""
     pass
@@ -18,252 +35,364 @@ class APICaller:
         self.openweather_api_key = os.getenv("OPENWEATHER_API_KEY")
         self.aviationstack_api_key = os.getenv("AVIATIONSTACK_API_KEY")
         self.aviationstack_api_endpoint = os.getenv("AVIATIONSTACK_API_ENDPOINT")
-        self.airports_iata = airportsdata.load('IATA')
+        self._airport_index = None
+        # keep-alive pool shared by every upstream call, see tools/http_client.py for limits
+        self.http = HTTPClient()
+        # forecasts are 3-hourly, so a city asked about twice in a chat doesn't need a second call
+        self.weather_cache = TTLCache(
+            ttl=WEATHER_CACHE_TTL,
+            stale_ttl=WEATHER_CACHE_STALE_TTL,
+            max_entries=WEATHER_CACHE_SIZE,
+            persist_path=WEATHER_CACHE_FILE or None,
+            should_cache=lambda result: result is not None and 'error' not in result,
+            name="weather"
+        )
 
-    def get_weather_forecast(self, city:str, days:int = 5) -> Dict[str, Any]:
-        """Get weather forecast for a city"""
+        # identical AviationStack searches in flight share one upstream call
+        self.aviationstack_calls = SingleFlight()
+        self.aviationstack_quota = QuotaBudget(
+            monthly_limit=AVIATIONSTACK_MONTHLY_QUOTA,
+            reserve=AVIATIONSTACK_QUOTA_RESERVE,
+            state_file=AVIATIONSTACK_QUOTA_FILE,
+            name="aviationstack"
+        )
+        cacheable = lambda result: result is not None and 'error' not in result and not result.get('quota_limited')
+        self.flight_cache = TTLCache(ttl=FLIGHT_CACHE_TTL, max_entries=FLIGHT_CACHE_SIZE,
+                                     should_cache=cacheable, name="flights")
+        # /routes is schedule data that changes a few times a year
+        self.route_cache = TTLCache(ttl=ROUTE_CACHE_TTL, max_entries=ROUTE_CACHE_SIZE,
+                                    persist_path=ROUTE_CACHE_FILE or None, should_cache=cacheable, name="routes")
 
-        try:
-            url = "http://api.openweathermap.org/data/2.5/forecast"
-            params = {
-                'q': city,
-                'appid': self.openweather_api_key,
-                'units': 'metric',
-                'cnt': min(days * 8, 40)
-            }
+        for cache in (self.weather_cache, self.flight_cache, self.route_cache):
+            register_stats("cache", cache.name, cache.stats)
+        register_stats("quota", "aviationstack", self.aviationstack_quota.stats)
+
+    @property
+    def airport_index(self) -> AirportIndex:
+        # built on the first IATA lookup rather than at start-up
+        if self._airport_index is None:
+            with span("airport_index.load", kind="startup"):
+                self._airport_index = AirportIndex(load_airports())
+        return self._airport_index
+
+    def _weather_request(self, city: str, days: int):
+        url = f"{OPENWEATHER_API_ENDPOINT}/forecast"
+        params = {
+            'q': city,
+            'appid': self.openweather_api_key,
+            'units': 'metric',
+            'cnt': min(days * 8, 40)
+        }
+        return url, params
 
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
-            forecasts = []
-            daily_forecasts = {}
-
-            for item in data['list']:
-                date = item['dt_txt'].split(' ')[0]  
-                if date not in daily_forecasts:
-                    daily_forecasts[date] = []
-                daily_forecasts[date].append(item)
-
-            for date, day_forecasts in list(daily_forecasts.items())[:days]:  
-                midday_forecast = None
-                for forecast in day_forecasts:
-                    if '12:00:00' in forecast['dt_txt']:
-                        midday_forecast = forecast
-                        break
-                
-                if not midday_forecast:
-                    midday_forecast = day_forecasts[0]
-                
-                forecasts.append({
-                    'date': date,
-                    'datetime': midday_forecast['dt_txt'],
-                    'temperature': midday_forecast['main']['temp'],
-                    'feels_like': midday_forecast['main']['feels_like'],
-                    'humidity': midday_forecast['main']['humidity'],
-                    'description': midday_forecast['weather'][0]['description'].title(),
-                    'main': midday_forecast['weather'][0]['main'],
-                    'wind_speed': midday_forecast.get('wind', {}).get('speed', 'N/A'),
-                    'clouds': midday_forecast.get('clouds', {}).get('all', 'N/A')
-                })
+    def _parse_weather(self, city: str, days: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        forecasts = []
+        daily_forecasts = {}
+
+        for item in data['list']:
+            date = item['dt_txt'].split(' ')[0]  
+            if date not in daily_forecasts:
+                daily_forecasts[date] = []
+            daily_forecasts[date].append(item)
+
+        for date, day_forecasts in list(daily_forecasts.items())[:days]:  
+            midday_forecast = None
+            for forecast in day_forecasts:
+                if '12:00:00' in forecast['dt_txt']:
+                    midday_forecast = forecast
+                    break
             
-            return {
-                'city': city,
-                'country': data['city']['country'],
-                'timezone': data['city']['timezone'],
-                'forecasts': forecasts,
-                'total_forecasts': len(forecasts)
-            }
-        except Exception as e:
-            return {
-                'city': city,
-                'error': f"Could not fetch weather info: {str(e)}",
-                'forecasts': []
-            }
+            if not midday_forecast:
+                midday_forecast = day_forecasts[0]
+            
+            forecasts.append({
+                'date': date,
+                'datetime': midday_forecast['dt_txt'],
+                'temperature': midday_forecast['main']['temp'],
+                'feels_like': midday_forecast['main']['feels_like'],
+                'humidity': midday_forecast['main']['humidity'],
+                'description': midday_forecast['weather'][0]['description'].title(),
+                'main': midday_forecast['weather'][0]['main'],
+                'wind_speed': midday_forecast.get('wind', {}).get('speed', 'N/A'),
+                'clouds': midday_forecast.get('clouds', {}).get('all', 'N/A')
+            })
         
-    def find_flights(self, origin: str, destination: str, departure_date: str = None,
-                     return_date: str = None, adults: int = 1) -> Dict[str, Any]:
-        """Find flights between two locations"""
-        try:
-            url = f"{self.aviationstack_api_endpoint}/flights"
-            params = {
-                'access_key': self.aviationstack_api_key,
-                'dep_iata': origin,
-                'arr_iata': destination,
-                'limit': 10
-            }
+        return {
+            'city': city,
+            'country': data['city']['country'],
+            'timezone': data['city']['timezone'],
+            'forecasts': forecasts,
+            'total_forecasts': len(forecasts)
+        }
 
-            if departure_date:
-                params['flight_date'] = departure_date
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+    def _weather_error(self, city: str, e: Exception) -> Dict[str, Any]:
+        return {
+            'city': city,
+            'error': f"Could not fetch weather info: {str(e)}",
+            'forecasts': []
+        }
 
-            data = response.json()
-            flights = []
-            
-            if not data.get('data'):
-                return {
-                    'origin': origin,
-                    'destination': destination,
-                    'flights': [],
-                    'error': 'No flights found for the specified route',
-                    'suggestions': 'Try checking major airport codes or different dates'
-                }
-            for flight in data['data'][:5]:
-                airline = flight.get('airline') or {}
-                flight_info = {
-                    'flight_number': f"{airline.get('iata', 'N/A')}{(flight.get('flight') or {}).get('number', '')}",
-                    'airline': airline.get('name', 'Unknown'),
-                    'aircraft': (flight.get('aircraft') or {}).get('registration', 'N/A'),
-                    'departure': {
-                        'airport': (flight.get('departure') or {}).get('airport', 'N/A'),
-                        'scheduled': (flight.get('departure') or {}).get('scheduled', 'N/A'),
-                        'estimated': (flight.get('departure') or {}).get('estimated', 'N/A'),
-                        'terminal': (flight.get('departure') or {}).get('terminal', 'N/A'),
-                        'gate': (flight.get('departure') or {}).get('gate', 'N/A')
-                    },
-                    'arrival': {
-                        'airport': (flight.get('arrival') or {}).get('airport', 'N/A'),
-                        'scheduled': (flight.get('arrival') or {}).get('scheduled', 'N/A'),
-                        'estimated': (flight.get('arrival') or {}).get('estimated', 'N/A'),
-                        'terminal': (flight.get('arrival') or {}).get('terminal', 'N/A'),
-                        'gate': (flight.get('arrival') or {}).get('gate', 'N/A')
-                    },
-                    'status': flight.get('flight_status', 'Unknown')
-                }
-                flights.append(flight_info)
+    def _fetch_weather_forecast(self, city: str, days: int) -> Dict[str, Any]:
+        try:
+            url, params = self._weather_request(city, days)
+            data = self.http.get_json(url, params=params, endpoint='weather')
+            return self._parse_weather(city, days, data)
+        except Exception as e:
+            return self._weather_error(city, e)
 
-            return {
-                'origin': origin,
-                'destination': destination,
-                'flights': flights,
-                'search_date': departure_date or 'Live data',
-                'note': 'Live flight tracking data'
-            }
+    async def _afetch_weather_forecast(self, city: str, days: int) -> Dict[str, Any]:
+        try:
+            url, params = self._weather_request(city, days)
+            data = await self.http.aget_json(url, params=params, endpoint='weather')
+            return self._parse_weather(city, days, data)
         except Exception as e:
+            return self._weather_error(city, e)
+
+    def _weather_cache_key(self, city: str, days: int) -> str:
+        return f"{normalize_text(city)}|{days}"
+
+    def get_weather_forecast(self, city:str, days:int = 5) -> Dict[str, Any]:
+        """Get weather forecast for a city, served from the forecast cache when possible"""
+        return self.weather_cache.get_or_load(
+            self._weather_cache_key(city, days),
+            lambda: self._fetch_weather_forecast(city, days)
+        )
+
+    async def aget_weather_forecast(self, city: str, days: int = 5) -> Dict[str, Any]:
+        """Async variant of get_weather_forecast"""
+        return await self.weather_cache.aget_or_load(
+            self._weather_cache_key(city, days),
+            lambda: self._afetch_weather_forecast(city, days)
+        )
+
+    def _flights_request(self, origin: str, destination: str, departure_date: str = None):
+        url = f"{self.aviationstack_api_endpoint}/flights"
+        params = {
+            'access_key': self.aviationstack_api_key,
+            'dep_iata': origin,
+            'arr_iata': destination,
+            'limit': 10
+        }
+
+        if departure_date:
+            params['flight_date'] = departure_date
+        return url, params
+
+    def _parse_flights(self, origin: str, destination: str, departure_date: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        flights = []
+        
+        if not data.get('data'):
             return {
                 'origin': origin,
                 'destination': destination,
-                'error': f"Could not fetch flight details {str(e)}",
                 'flights': [],
-                'suggestion': 'Please verify airport codes and try again'
+                'error': 'No flights found for the specified route',
+                'suggestions': 'Try checking major airport codes or different dates'
             }
+        for flight in data['data'][:5]:
+            airline = flight.get('airline') or {}
+            flight_info = {
+                'flight_number': f"{airline.get('iata', 'N/A')}{(flight.get('flight') or {}).get('number', '')}",
+                'airline': airline.get('name', 'Unknown'),
+                'aircraft': (flight.get('aircraft') or {}).get('registration', 'N/A'),
+                'departure': {
+                    'airport': (flight.get('departure') or {}).get('airport', 'N/A'),
+                    'scheduled': (flight.get('departure') or {}).get('scheduled', 'N/A'),
+                    'estimated': (flight.get('departure') or {}).get('estimated', 'N/A'),
+                    'terminal': (flight.get('departure') or {}).get('terminal', 'N/A'),
+                    'gate': (flight.get('departure') or {}).get('gate', 'N/A')
+                },
+                'arrival': {
+                    'airport': (flight.get('arrival') or {}).get('airport', 'N/A'),
+                    'scheduled': (flight.get('arrival') or {}).get('scheduled', 'N/A'),
+                    'estimated': (flight.get('arrival') or {}).get('estimated', 'N/A'),
+                    'terminal': (flight.get('arrival') or {}).get('terminal', 'N/A'),
+                    'gate': (flight.get('arrival') or {}).get('gate', 'N/A')
+                },
+                'status': flight.get('flight_status', 'Unknown')
+            }
+            flights.append(flight_info)
+
+        return {
+            'origin': origin,
+            'destination': destination,
+            'flights': flights,
+            'search_date': departure_date or 'Live data',
+            'note': 'Live flight tracking data'
+        }
+
+    def _flights_error(self, origin: str, destination: str, e: Exception) -> Dict[str, Any]:
+        return {
+            'origin': origin,
+            'destination': destination,
+            'error': f"Could not fetch flight details {str(e)}",
+            'flights': [],
+            'suggestion': 'Please verify airport codes and try again'
+        }
         
-    def get_route_flights(self, origin: str, destination: str) -> Dict[str, Any]:
-        """Get route information between airports using AviationStack"""
+    def _fetch_flights(self, origin: str, destination: str, departure_date: str = None) -> Dict[str, Any]:
         try:
-            url = f"{self.aviationstack_api_endpoint}/routes"
-            
-            params = {
-                'access_key': self.aviationstack_api_key,
-                'dep_iata': origin,
-                'arr_iata': destination
-            }
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if not data.get('data'):
-                return {
-                    'origin': origin,
-                    'destination': destination,
-                    'routes': [],
-                    'message': 'No routes found between these airports'
-                }
-            
-            routes = []
-            for route in data['data']:
-                route_info = {
-                    'airline': route.get('airline_name', 'Unknown'),
-                    'airline_iata': route.get('airline_iata', 'N/A'),
-                    'flight_number': route.get('flight_number', 'N/A'),
-                    'departure_airport': route.get('dep_airport', 'N/A'),
-                    'arrival_airport': route.get('arr_airport', 'N/A')
-                }
-                routes.append(route_info)
-            
-            return {
-                'origin': origin,
-                'destination': destination,
-                'routes': routes,
-                'total_routes': len(routes)
-            }
+            url, params = self._flights_request(origin, destination, departure_date)
+            data = self.http.get_json(url, params=params, endpoint='flights')
+            return self._parse_flights(origin, destination, departure_date, data)
+        except Exception as e:
+            return self._flights_error(origin, destination, e)
+
+    async def _afetch_flights(self, origin: str, destination: str, departure_date: str = None) -> Dict[str, Any]:
+        try:
+            url, params = self._flights_request(origin, destination, departure_date)
+            data = await self.http.aget_json(url, params=params, endpoint='flights')
+            return self._parse_flights(origin, destination, departure_date, data)
         except Exception as e:
+            return self._flights_error(origin, destination, e)
+        
+    def find_flights(self, origin: str, destination: str, departure_date: str = None,
+                     return_date: str = None, adults: int = 1) -> Dict[str, Any]:
+        """Find flights between two locations"""
+        key = self._aviationstack_key('flights', origin, destination, departure_date)
+        return self.flight_cache.get_or_load(key, lambda: self.aviationstack_calls.do(
+            key, lambda: self._quota_guarded(
+                key, self.flight_cache,
+                lambda: self._fetch_flights(origin, destination, departure_date),
+                lambda: self._quota_error(origin, destination, 'flights')
+            )
+        ))
+
+    async def afind_flights(self, origin: str, destination: str, departure_date: str = None,
+                            return_date: str = None, adults: int = 1) -> Dict[str, Any]:
+        """Async variant of find_flights"""
+        key = self._aviationstack_key('flights', origin, destination, departure_date)
+
+        async def guarded():
+            if not self.aviationstack_quota.try_consume():
+                return self._quota_fallback(key, self.flight_cache, lambda: self._quota_error(origin, destination, 'flights'))
+            return await self._afetch_flights(origin, destination, departure_date)
+
+        return await self.flight_cache.aget_or_load(key, lambda: self.aviationstack_calls.ado(key, guarded))
+
+    def _routes_request(self, origin: str, destination: str):
+        url = f"{self.aviationstack_api_endpoint}/routes"
+        
+        params = {
+            'access_key': self.aviationstack_api_key,
+            'dep_iata': origin,
+            'arr_iata': destination
+        }
+        return url, params
+
+    def _parse_routes(self, origin: str, destination: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if not data.get('data'):
             return {
                 'origin': origin,
                 'destination': destination,
-                'error': f"Could not fetch route info: {str(e)}",
-                'routes': []
+                'routes': [],
+                'message': 'No routes found between these airports'
             }
         
-    def get_iata_codes_for_city(self, city: str, country: str = None, max_results: int = 3) -> list:
-        """Get IATA codes for a city using offline database"""
-        matching_airports = []
+        routes = []
+        for route in data['data']:
+            route_info = {
+                'airline': route.get('airline_name', 'Unknown'),
+                'airline_iata': route.get('airline_iata', 'N/A'),
+                'flight_number': route.get('flight_number', 'N/A'),
+                'departure_airport': route.get('dep_airport', 'N/A'),
+                'arrival_airport': route.get('arr_airport', 'N/A')
+            }
+            routes.append(route_info)
         
-        for iata_code, airport_data in self.airports_iata.items():
-            # Match by city name
-            if (city.lower() in airport_data.get('city', '').lower() or 
-                city.lower() in airport_data.get('name', '').lower()):
-                
-                # Filter by country if specified
-                if country and country.lower() != airport_data.get('country', '').lower():
-                    continue
-                
-                matching_airports.append({
-                    'airport_name': airport_data.get('name'),
-                    'iata_code': iata_code,
-                    'city': airport_data.get('city'),
-                    'country': airport_data.get('country')
-                })
-                
-                if len(matching_airports) >= max_results:
-                    break
+        return {
+            'origin': origin,
+            'destination': destination,
+            'routes': routes,
+            'total_routes': len(routes)
+        }
+
+    def _routes_error(self, origin: str, destination: str, e: Exception) -> Dict[str, Any]:
+        return {
+            'origin': origin,
+            'destination': destination,
+            'error': f"Could not fetch route info: {str(e)}",
+            'routes': []
+        }
+        
+    def _fetch_route_flights(self, origin: str, destination: str) -> Dict[str, Any]:
+        try:
+            url, params = self._routes_request(origin, destination)
+            data = self.http.get_json(url, params=params, endpoint='routes')
+            return self._parse_routes(origin, destination, data)
+        except Exception as e:
+            return self._routes_error(origin, destination, e)
+
+    async def _afetch_route_flights(self, origin: str, destination: str) -> Dict[str, Any]:
+        try:
+            url, params = self._routes_request(origin, destination)
+            data = await self.http.aget_json(url, params=params, endpoint='routes')
+            return self._parse_routes(origin, destination, data)
+        except Exception as e:
+            return self._routes_error(origin, destination, e)
         
-        return matching_airports
+    def get_route_flights(self, origin: str, destination: str) -> Dict[str, Any]:
+        """Get route information between airports using AviationStack"""
+        key = self._aviationstack_key('routes', origin, destination)
+        return self.route_cache.get_or_load(key, lambda: self.aviationstack_calls.do(
+            key, lambda: self._quota_guarded(
+                key, self.route_cache,
+                lambda: self._fetch_route_flights(origin, destination),
+                lambda: self._quota_error(origin, destination, 'routes')
+            )
+        ))
+
+    async def aget_route_flights(self, origin: str, destination: str) -> Dict[str, Any]:
+        """Async variant of get_route_flights"""
+        key = self._aviationstack_key('routes', origin, destination)
+
+        async def guarded():
+            if not self.aviationstack_quota.try_consume():
+                return self._quota_fallback(key, self.route_cache, lambda: self._quota_error(origin, destination, 'routes'))
+            return await self._afetch_route_flights(origin, destination)
+
+        return await self.route_cache.aget_or_load(key, lambda: self.aviationstack_calls.ado(key, guarded))
+
+    def _aviationstack_key(self, endpoint: str, origin: str, destination: str, departure_date: str = None) -> str:
+        return f"{endpoint}|{origin.strip().upper()}|{destination.strip().upper()}|{departure_date or 'live'}"
+
+    def _quota_guarded(self, key: str, cache: TTLCache, fetch, on_refused) -> Dict[str, Any]:
+        """Spend one AviationStack request on `fetch`, or degrade once the monthly budget is nearly gone"""
+        if not self.aviationstack_quota.try_consume():
+            return self._quota_fallback(key, cache, on_refused)
+        return fetch()
+
+    def _quota_fallback(self, key: str, cache: TTLCache, on_refused) -> Dict[str, Any]:
+        stale = cache.get(key, allow_expired=True)
+        if stale is not None:
+            return {**stale, 'quota_limited': True, 'note': 'Served from cache, AviationStack quota is running low'}
+        return on_refused()
+
+    def _quota_error(self, origin: str, destination: str, endpoint: str) -> Dict[str, Any]:
+        return {
+            'origin': origin,
+            'destination': destination,
+            endpoint: [],
+            'error': 'AviationStack monthly request budget is nearly used up, live data is unavailable',
+            'quota_limited': True
+        }
         
-    def get_main_iata_for_place(self, place: str, country=None):
-        """Get primary IATA code for a city or place"""
-        # Enhanced fallback mapping for major cities
-        CITY_TO_IATA = {
-            'delhi': 'DEL',
-            'new delhi': 'DEL',
-            'london': 'LHR',
-            'mumbai': 'BOM',
-            'chennai': 'MAA',
-            'bangalore': 'BLR',
-            'bengaluru': 'BLR',
-            'kolkata': 'CCU',
-            'paris': 'CDG',
-            'new york': 'JFK',
-            'los angeles': 'LAX',
-            'tokyo': 'NRT',
-            'dubai': 'DXB',
-            'singapore': 'SIN',
-            'hong kong': 'HKG',
-            'amsterdam': 'AMS',
-            'frankfurt': 'FRA',
-            'madrid': 'MAD',
-            'rome': 'FCO',
-            'sydney': 'SYD',
-            'melbourne': 'MEL',
-            'toronto': 'YYZ',
-            'vancouver': 'YVR',
-            'beijing': 'PEK',
-            'shanghai': 'PVG',
-            'seoul': 'ICN',
-            'bangkok': 'BKK',
-            'kuala lumpur': 'KUL',
-            'istanbul': 'IST',
-            'cairo': 'CAI',
-            'johannesburg': 'JNB',
-            'sao paulo': 'GRU',
-            'mexico city': 'MEX',
-            'montreal': 'YUL'
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the response caches"""
+        return {
+            'weather': self.weather_cache.stats(),
+            'flights': self.flight_cache.stats(),
+            'routes': self.route_cache.stats(),
+            'aviationstack_shared_calls': self.aviationstack_calls.shared,
+            'aviationstack_quota': self.aviationstack_quota.stats()
         }
+
+    def get_iata_codes_for_city(self, city: str, country: str = None, max_results: int = 3) -> list:
+        """Get IATA codes for a city using the prebuilt airport index"""
+        return self.airport_index.search(city, country=country, max_results=max_results)
         
+    def get_main_iata_for_place(self, place: str, country=None):
+        """Get primary IATA code for a city or place"""
         place_lower = place.lower().strip()
         
         # Try fallback mapping first
@@ -272,10 +401,10 @@ class APICaller:
             return CITY_TO_IATA[place_lower]
         
         # Search in offline database
-        airports = self.get_iata_codes_for_city(place, country)  # FIXED: use correct method name
+        airports = self.get_iata_codes_for_city(place, country)
         if airports:
             print(f"📍 Found from database: {place} -> {airports[0]['iata_code']}")
-            return airports['iata_code']  # FIXED: return the iata_code from the first airport
+            return airports[0]['iata_code']
         
         print(f"❌ No IATA code found for: {place}")
         return None
@@ -289,3 +418,13 @@ class APICaller:
                 "error": f"Could not resolve airport codes for '{origin_place}' or '{dest_place}'"
             }
         return self.find_flights(origin=origin_code, destination=dest_code, departure_date=departure_date, return_date=return_date)
+
+    async def aplan_flights(self, origin_place, dest_place, departure_date=None, return_date=None):
+        """Async variant of plan_flights"""
+        origin_code = self.get_main_iata_for_place(origin_place)
+        dest_code = self.get_main_iata_for_place(dest_place)
+        if not origin_code or not dest_code:
+            return {
+                "error": f"Could not resolve airport codes for '{origin_place}' or '{dest_place}'"
+            }
+        return await self.afind_flights(origin=origin_code, destination=dest_code, departure_date=departure_date, return_date=return_date)
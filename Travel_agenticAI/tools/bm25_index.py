@@ -0,0 +1,154 @@
+# SQLite inverted index with BM25 scoring, kept next to the Chroma collection under the same chunk ids
+import os
+import re
+import json
+import math
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BM25_DB = os.getenv("BM25_DB", "chroma_db/bm25.sqlite3")
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60  # the usual reciprocal rank fusion constant
+
+_TOKEN = re.compile(r'\w+')
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'how', 'i', 'if', 'in',
+    'into', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'so', 'than', 'that', 'the', 'their', 'then', 'there',
+    'these', 'they', 'this', 'to', 'was', 'we', 'were', 'what', 'when', 'where', 'which', 'while', 'who', 'will',
+    'with', 'you', 'your'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    # no stemming: exact entities (place and festival names, IATA codes) are what BM25 is here for
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Ids ordered by sum(1 / (k + rank)) over every ranking they appear in"""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    """
+    Postings live in SQLite so the index can be updated chunk by chunk, exactly like the vector store.
+    Scoring happens in Python over the postings of the query terms only.
+    """
+
+    def __init__(self, db_path: str = BM25_DB, k1: float = BM25_K1, b: float = BM25_B):
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id TEXT PRIMARY KEY,
+                    length INTEGER NOT NULL,
+                    document TEXT NOT NULL,
+                    metadata TEXT
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS postings_chunk ON postings (chunk_id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: Optional[List[Dict[str, Any]]] = None):
+        metadatas = metadatas or [None] * len(ids)
+        conn = self._connection()
+        with conn:
+            self._delete(conn, ids)
+            for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                counts = Counter(tokenize(document))
+                conn.execute(
+                    "INSERT INTO chunks (id, length, document, metadata) VALUES (?, ?, ?, ?)",
+                    (chunk_id, sum(counts.values()), document, json.dumps(metadata) if metadata else None)
+                )
+                conn.executemany(
+                    "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+                    [(term, chunk_id, tf) for term, tf in counts.items()]
+                )
+
+    @staticmethod
+    def _delete(conn, ids: List[str]):
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            marks = ','.join('?' * len(batch))
+            conn.execute(f"DELETE FROM postings WHERE chunk_id IN ({marks})", batch)
+            conn.execute(f"DELETE FROM chunks WHERE id IN ({marks})", batch)
+
+    def delete(self, ids: List[str]):
+        conn = self._connection()
+        with conn:
+            self._delete(conn, list(ids))
+
+    def reset(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM chunks")
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def ids(self) -> set:
+        return {row[0] for row in self._connection().execute("SELECT id FROM chunks")}
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        conn = self._connection()
+        total, average_length = conn.execute("SELECT COUNT(*), AVG(length) FROM chunks").fetchone()
+        if not total:
+            return []
+        average_length = average_length or 1.0
+
+        marks = ','.join('?' * len(terms))
+        document_frequency = dict(conn.execute(
+            f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", terms
+        ))
+        scores = {}
+        rows = conn.execute(
+            f"SELECT p.term, p.chunk_id, p.tf, c.length FROM postings p JOIN chunks c ON c.id = p.chunk_id "
+            f"WHERE p.term IN ({marks})", terms
+        )
+        for term, chunk_id, tf, length in rows:
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / average_length))
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+    def get(self, ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """id -> (document, metadata) for the ids that are indexed"""
+        if not ids:
+            return {}
+        marks = ','.join('?' * len(ids))
+        rows = self._connection().execute(f"SELECT id, document, metadata FROM chunks WHERE id IN ({marks})", list(ids))
+        return {chunk_id: (document, json.loads(metadata) if metadata else {}) for chunk_id, document, metadata in rows}
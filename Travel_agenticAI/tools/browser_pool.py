@@ -0,0 +1,127 @@
+# Bounded pool of warm headless Chrome sessions for the interactive visa lookup
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+
+BROWSER_POOL_SIZE = int(os.getenv("VISA_BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_USES = int(os.getenv("VISA_BROWSER_MAX_USES", "25"))
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("VISA_BROWSER_ACQUIRE_TIMEOUT", "60"))
+BROWSER_PREWARM = int(os.getenv("VISA_BROWSER_PREWARM", "0"))
+
+
+class BrowserPoolError(Exception):
+    """Raised when no browser session could be handed out"""
+    pass
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Keeps up to `size` Chrome sessions alive between visa lookups.
+    Sessions are health checked on checkout and recycled after `max_uses` lookups.
+    """
+
+    def __init__(self, chrome_options, size: int = BROWSER_POOL_SIZE, max_uses: int = BROWSER_MAX_USES,
+                 prelaunch: int = 0, acquire_timeout: float = BROWSER_ACQUIRE_TIMEOUT):
+        self.chrome_options = chrome_options
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = queue.LifoQueue()
+        # bounds how many lookups hold a session at the same time
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._closed = False
+        self._alive = 0
+        self._alive_lock = threading.Lock()
+
+        for _ in range(min(prelaunch, self.size)):
+            self._idle.put(self._launch())
+
+    def _launch(self) -> _PooledDriver:
+        pooled = _PooledDriver(webdriver.Chrome(options=self.chrome_options))
+        with self._alive_lock:
+            self._alive += 1
+        return pooled
+
+    def _is_healthy(self, pooled: _PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: _PooledDriver):
+        with self._alive_lock:
+            self._alive -= 1
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"Error closing browser session: {e}")
+
+    def prewarm(self, count: int = None):
+        """Launch sessions in the background so the first lookup doesn't pay Chrome start-up"""
+        count = self.size if count is None else min(count, self.size)
+
+        def launch():
+            while self._alive < count and not self._closed:
+                try:
+                    self._idle.put(self._launch())
+                except Exception as e:
+                    print(f"Could not prelaunch browser: {e}")
+                    return
+
+        threading.Thread(target=launch, daemon=True).start()
+
+    @contextmanager
+    def session(self):
+        """Check out a healthy driver, give it back (or recycle it) afterwards"""
+        if self._closed:
+            raise BrowserPoolError("Browser pool is closed")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise BrowserPoolError(f"No browser session free after {self.acquire_timeout}s")
+
+        pooled = None
+        try:
+            while pooled is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    pooled = self._launch()
+                    break
+                if self._is_healthy(candidate):
+                    pooled = candidate
+                else:
+                    self._discard(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = not self._is_healthy(pooled)
+            raise
+        finally:
+            pooled.uses += 1
+            if broken or self._closed or pooled.uses >= self.max_uses:
+                self._discard(pooled)
+            else:
+                self._idle.put(pooled)
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
@@ -0,0 +1,207 @@
+# Async crawler for the knowledge base: bounded concurrency, per-host pacing, robots.txt and conditional GETs
+import os
+import json
+import time
+import asyncio
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_HOST_DELAY = float(os.getenv("CRAWL_HOST_DELAY", "1.0"))  # seconds between requests to one host
+CRAWL_MAX_HOST_DELAY = 30.0  # cap for robots.txt crawl-delay, some sites ask for minutes
+CRAWL_TIMEOUT = 15
+CRAWL_STATE_FILE = "scraped_data/crawl_state.json"
+
+
+class CrawlState:
+    """
+    Validators (ETag / Last-Modified) per URL plus the URLs finished in the current run.
+    Saved after every page, so a crashed run picks up where it stopped.
+    """
+
+    def __init__(self, path: str = CRAWL_STATE_FILE):
+        self.path = path
+        self.data = {'pages': {}, 'run': None}
+        self._done = set()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data.update(json.load(f))
+            except Exception as e:
+                print(f"Error reading crawl state, starting fresh: {e}")
+
+    def start_run(self, fresh: bool = False) -> bool:
+        """True when an unfinished run is being resumed"""
+        run = self.data.get('run')
+        if run and not run.get('complete') and not fresh:
+            self._done = set(run['done'])
+            return True
+        self.data['run'] = {'started': time.time(), 'done': [], 'complete': False}
+        self._done = set()
+        self.save()
+        return False
+
+    def finish_run(self):
+        self.data['run']['complete'] = True
+        self.save()
+
+    def is_done(self, url: str) -> bool:
+        return url in self._done
+
+    def page(self, url: str) -> Dict[str, Any]:
+        return self.data['pages'].get(url, {})
+
+    def record(self, url: str, **fields):
+        page = self.data['pages'].setdefault(url, {})
+        page.update(fields)
+        self.data['run']['done'].append(url)
+        self._done.add(url)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class HostThrottle:
+    """Spaces requests to the same host at least `delay` seconds apart, other hosts are unaffected"""
+
+    def __init__(self, default_delay: float = CRAWL_HOST_DELAY):
+        self.default_delay = default_delay
+        self.delays = {}
+        self.next_slot = {}
+        self.locks = {}
+
+    def set_delay(self, host: str, delay: float):
+        self.delays[host] = min(max(delay, self.default_delay), CRAWL_MAX_HOST_DELAY)
+
+    async def wait(self, host: str):
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = self.next_slot.get(host, now)
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            self.next_slot[host] = max(slot, now) + self.delays.get(host, self.default_delay)
+
+
+class PoliteCrawler:
+    """
+    Fetches many URLs over one keep-alive session, at most `concurrency` at a time.
+    handle_page(url, html) is called for every page that changed since the last crawl.
+    """
+
+    def __init__(self, user_agent: str, concurrency: int = CRAWL_CONCURRENCY, host_delay: float = CRAWL_HOST_DELAY,
+                 state: Optional[CrawlState] = None, timeout: float = CRAWL_TIMEOUT):
+        self.user_agent = user_agent
+        self.concurrency = concurrency
+        self.throttle = HostThrottle(host_delay)
+        self.state = state or CrawlState()
+        self.timeout = timeout
+        self.robots = {}
+        self.robots_locks = {}
+        self.counts = {'fetched': 0, 'not_modified': 0, 'skipped_robots': 0, 'resumed': 0, 'failed': 0}
+        self.on_status = None
+
+    async def _robots(self, session, semaphore: asyncio.Semaphore, url: str) -> Optional[RobotFileParser]:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        lock = self.robots_locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            if origin in self.robots:
+                return self.robots[origin]
+            parser = None
+            try:
+                await self.throttle.wait(parts.netloc)
+                async with semaphore, session.get(f"{origin}/robots.txt") as response:
+                    if response.status == 200:
+                        parser = RobotFileParser()
+                        parser.parse((await response.text(errors='replace')).splitlines())
+                        delay = parser.crawl_delay(self.user_agent) or parser.crawl_delay('*')
+                        if delay:
+                            self.throttle.set_delay(parts.netloc, float(delay))
+            except Exception as e:
+                # no robots.txt reachable means nothing is disallowed
+                print(f"Could not read robots.txt for {origin}: {e}")
+            self.robots[origin] = parser
+            return parser
+
+    async def _fetch(self, session, semaphore: asyncio.Semaphore, url: str,
+                     handle_page: Callable[[str, str], Awaitable[Optional[Dict[str, Any]]]], has_output: Callable[[str], bool]):
+        if self.state.is_done(url):
+            self.counts['resumed'] += 1
+            return
+
+        robots = await self._robots(session, semaphore, url)
+        if robots is not None and not robots.can_fetch(self.user_agent, url):
+            print(f"Disallowed by robots.txt: {url}")
+            self.counts['skipped_robots'] += 1
+            self.state.record(url, status='disallowed')
+            self._notify(url, 'disallowed')
+            return
+
+        headers = {}
+        previous = self.state.page(url)
+        # only revalidate when the file from the last crawl is still on disk
+        if has_output(url):
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+
+        # wait for the host's turn before taking a slot, so one slow host can't hold up the others
+        await self.throttle.wait(urlsplit(url).netloc)
+        print(f"Scraping: {url}")
+        try:
+            async with semaphore, session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    self.counts['not_modified'] += 1
+                    print(f"Unchanged since last crawl: {url}")
+                    self.state.record(url, status='not_modified', checked_at=time.time())
+                    self._notify(url, 'not_modified')
+                    return
+                response.raise_for_status()
+                html = await response.text(errors='replace')
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            self.counts['failed'] += 1
+            # not recorded as done, a resumed run tries it again
+            self._notify(url, 'failed', error=str(e))
+            return
+
+        extra = await handle_page(url, html) or {}
+        self.counts['fetched'] += 1
+        self.state.record(url, status='fetched', etag=etag, last_modified=last_modified,
+                          fetched_at=time.time(), **extra)
+        self._notify(url, 'fetched', **extra)
+
+    def _notify(self, url: str, status: str, **fields):
+        if self.on_status is not None:
+            self.on_status(url, status, **fields)
+
+    async def crawl(self, urls: Iterable[str], handle_page, has_output: Callable[[str], bool] = lambda url: False,
+                    fresh: bool = False, on_status: Callable[..., None] = None) -> Dict[str, int]:
+        """on_status(url, status, **fields) is called once per URL with fetched / not_modified / disallowed / failed"""
+        import aiohttp
+
+        self.on_status = on_status
+
+        if self.state.start_run(fresh=fresh):
+            print(f"Resuming unfinished crawl, {len(self.state.data['run']['done'])} URLs already done")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': self.user_agent}) as session:
+            await asyncio.gather(*(self._fetch(session, semaphore, url, handle_page, has_output)
+                                   for url in dict.fromkeys(urls)))
+
+        self.state.finish_run()
+        return dict(self.counts)
@@ -0,0 +1,191 @@
+# Disk-backed embedding cache keyed by (model, sha256 of the text), shared by seeding and knowledge-base queries
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# outside chroma_db/ so deleting the vector store directory keeps the cache
+EMBEDDING_CACHE_DB = os.getenv("EMBEDDING_CACHE_DB", "scraped_data/embedding_cache.sqlite3")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE", "1") != "0"
+_SQL_BATCH = 500  # stays under SQLite's bound-parameter limit
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite store of float16 vectors (768 bytes for a MiniLM chunk).
+    Least recently used entries go first once max_bytes is exceeded, like the LLM cache.
+    """
+
+    def __init__(self, db_path: str = EMBEDDING_CACHE_DB, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)")
+        # running byte total, so inserts don't scan the table; recounted exactly whenever it passes max_bytes
+        self._bytes = self._stored_bytes()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _stored_bytes(self) -> int:
+        return self._connection().execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """float32 vector per text, None where it isn't cached"""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        conn = self._connection()
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), _SQL_BATCH):
+            batch = unique[start:start + _SQL_BATCH]
+            marks = ','.join('?' * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})", [model, *batch]
+            )
+            found.update((key, np.frombuffer(blob, dtype=np.float16).astype(np.float32)) for key, blob in rows)
+
+        if found:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found]
+                )
+        results = [found.get(key) for key in hashes]
+        hits = sum(vector is not None for vector in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        if not texts:
+            return
+        now = time.time()
+        blobs = np.asarray(vectors, dtype=np.float16)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                [(model, text_hash(text), blob.tobytes(), now) for text, blob in zip(texts, blobs)]
+            )
+        with self._lock:
+            # replaced rows are counted twice here, the recount in _evict corrects that
+            self._bytes += blobs.nbytes
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        conn = self._connection()
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            with self._lock:
+                self._bytes = total
+            return
+
+        # trim to 90% so we don't evict on every insert once full
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for model, key, size in conn.execute(
+            "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_access"
+        ):
+            if total - freed <= target:
+                break
+            doomed.append((model, key))
+            freed += size
+        with conn:
+            conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", doomed)
+        with self._lock:
+            self._bytes = total - freed
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM embeddings")
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'name': 'embedding',
+            'entries': self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0],
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def embed_with_cache(cache: Optional[EmbeddingCache], model: str, texts: List[str], embed_fn) -> List[List[float]]:
+    """embed_fn(texts) -> vectors is only called for the texts missing from the cache, each distinct text once"""
+    if cache is None:
+        return [np.asarray(vector).tolist() for vector in embed_fn(texts)]
+    cached = cache.get_many(model, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+    if missing:
+        fresh = dict(zip(missing, embed_fn(missing)))
+        cache.put_many(model, missing, [fresh[text] for text in missing])
+    else:
+        fresh = {}
+    return [np.asarray(fresh[text] if vector is None else vector).tolist() for text, vector in zip(texts, cached)]
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps any LangChain Embeddings so repeated texts and queries skip the model"""
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: Optional[EmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or get_embedding_cache()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return embed_with_cache(self.cache, self.model_name, texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        # some models embed queries differently from documents, so they get their own keys
+        return embed_with_cache(
+            self.cache, f"{self.model_name}#query", [text], lambda texts: [self.embeddings.embed_query(texts[0])]
+        )[0]
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    """One cache instance per process"""
+    from tools.telemetry import register_stats
+    cache = EmbeddingCache()
+    register_stats("cache", "embedding", cache.stats)
+    return cache
@@ -0,0 +1,114 @@
+# Batched, optionally multi-process embedding with bulk Chroma upserts, for seeding large corpora
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+# chroma refuses a single upsert above ~5k records
+WRITE_BATCH_SIZE = int(os.getenv("EMBED_WRITE_BATCH_SIZE", "2000"))
+
+
+class EmbeddingPipeline:
+    """
+    Embeds texts in batches of batch_size, with workers > 1 spread over that many CPU processes
+    (sentence-transformers' multi-process pool), and writes to Chroma write_batch_size records at a time.
+    The write of one batch overlaps with embedding the next.
+    With an EmbeddingCache only texts it hasn't seen reach the model (which isn't even loaded on a full hit).
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBED_BATCH_SIZE,
+                 workers: int = EMBED_WORKERS, write_batch_size: int = WRITE_BATCH_SIZE, model=None, cache=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.workers = max(workers, 1)
+        self.write_batch_size = write_batch_size
+        self._model = model
+        self._pool = None
+        self.cache = cache
+        self.stats = {'chunks': 0, 'cached': 0, 'embed_seconds': 0.0, 'write_seconds': 0.0, 'total_seconds': 0.0}
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device='cpu')
+        return self._model
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if self.cache is None:
+            return self._encode(texts).tolist()
+        from tools.embedding_cache import embed_with_cache
+        hits_before = self.cache.hits
+        vectors = embed_with_cache(self.cache, self.model_name, texts, self._encode)
+        self.stats['cached'] += self.cache.hits - hits_before
+        return vectors
+
+    def _encode(self, texts: List[str]):
+        start = time.perf_counter()
+        if self.workers > 1 and len(texts) > self.batch_size:
+            if self._pool is None:
+                # worker processes load their own copy of the model once and are reused for every batch
+                self._pool = self.model.start_multi_process_pool(target_devices=['cpu'] * self.workers)
+            vectors = self.model.encode_multi_process(texts, self._pool, batch_size=self.batch_size)
+        else:
+            vectors = self.model.encode(texts, batch_size=self.batch_size, show_progress_bar=False)
+        self.stats['embed_seconds'] += time.perf_counter() - start
+        return vectors
+
+    def _write(self, collection, ids, texts, metadatas, vectors):
+        start = time.perf_counter()
+        collection.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=vectors)
+        self.stats['write_seconds'] += time.perf_counter() - start
+
+    def upsert(self, collection, ids: List[str], texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Embed and upsert into a raw chromadb collection, returns the throughput stats"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer") as writer:
+            pending = None
+            for offset in range(0, len(texts), self.write_batch_size):
+                end = offset + self.write_batch_size
+                vectors = self.embed(texts[offset:end])
+                if pending is not None:
+                    pending.result()
+                batch_metadatas = metadatas[offset:end] if metadatas else None
+                pending = writer.submit(self._write, collection, ids[offset:end], texts[offset:end], batch_metadatas, vectors)
+                self.stats['chunks'] += len(vectors)
+                self._report()
+            if pending is not None:
+                pending.result()
+        self.stats['total_seconds'] += time.perf_counter() - start
+        return self.throughput()
+
+    def throughput(self) -> Dict[str, Any]:
+        total = self.stats['total_seconds']
+        embed = self.stats['embed_seconds']
+        return {
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in self.stats.items()},
+            'batch_size': self.batch_size,
+            'workers': self.workers,
+            'chunks_per_second': round(self.stats['chunks'] / total, 1) if total else 0.0,
+            'embed_chunks_per_second': round((self.stats['chunks'] - self.stats['cached']) / embed, 1) if embed else 0.0
+        }
+
+    def _report(self):
+        embed = self.stats['embed_seconds']
+        computed = self.stats['chunks'] - self.stats['cached']
+        rate = computed / embed if embed else 0.0
+        print(f"embedded {self.stats['chunks']} chunks, {self.stats['cached']} from the cache "
+              f"({rate:.1f} chunks/s embedding)")
@@ -0,0 +1,226 @@
+# Offline city -> country resolver, Nominatim is only asked when the bundled data has no answer
+import os
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Optional, List, Union
+from data.countries import COUNTRY_NAMES, COUNTRY_ALIASES
+from tools.airport_index import load_airports, normalize_text, airport_importance, MAJOR_HUBS
+from tools.telemetry import register_stats, traced
+
+GEOCODE_CACHE_FILE = "scraped_data/geocode_cache.json"
+GEOCODE_CACHE_SIZE = 5000
+REGION_WEIGHT = 0.75
+# the offline vote is only trusted when the leading country outweighs all others together this many times
+# and has a major airport there (a hub, or one named "International"); otherwise Nominatim decides
+OFFLINE_LEAD_RATIO = 3.0
+MAJOR_AIRPORT_SCORE = 4.0
+# airportsdata files some cities under their local name
+CITY_EXONYMS = {
+    'florence': 'firenze', 'venice': 'venezia', 'naples': 'napoli', 'turin': 'torino', 'genoa': 'genova',
+    'padua': 'padova', 'seville': 'sevilla', 'kiev': 'kyiv', 'marrakesh': 'marrakech', 'peking': 'beijing'
+}
+NOMINATIM_DOMAIN = os.getenv("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org")
+NOMINATIM_SCHEME = os.getenv("NOMINATIM_SCHEME", "https")
+
+
+class PersistentLRUCache:
+    """Small LRU cache of string -> string that is mirrored to a JSON file"""
+
+    def __init__(self, filename: str = GEOCODE_CACHE_FILE, max_size: int = GEOCODE_CACHE_SIZE):
+        self.filename = filename
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.filename or not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                self.entries.update(json.load(f))
+        except Exception as e:
+            print(f"Error reading geocode cache: {e}")
+
+    def _save(self):
+        if not self.filename:
+            return
+        os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+        tmp_filename = f"{self.filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_filename, self.filename)
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key: str, value: str):
+        with self.lock:
+            if self.entries.get(key) == value:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            try:
+                self._save()
+            except Exception as e:
+                print(f"Error writing geocode cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'name': 'geocode',
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class Gazetteer:
+    """Resolves place names to English country names using bundled data first"""
+
+    def __init__(self, airports: Dict[str, Dict[str, Any]] = None, cache_file: str = GEOCODE_CACHE_FILE,
+                 use_nominatim: bool = True):
+        self.use_nominatim = use_nominatim
+        self.cache = PersistentLRUCache(cache_file)
+        register_stats("cache", "geocode", self.cache.stats)
+        self._geolocator = None
+        self._geolocator_lock = threading.Lock()
+
+        self.country_lookup = {}
+        for code, name in COUNTRY_NAMES.items():
+            self.country_lookup[normalize_text(name)] = name
+        for alias, code in COUNTRY_ALIASES.items():
+            self.country_lookup[normalize_text(alias)] = COUNTRY_NAMES[code]
+
+        # place -> {country code: weight}, weighted by airport importance so "Paris" lands in France
+        self.city_weights = defaultdict(lambda: defaultdict(float))
+        self.region_weights = defaultdict(lambda: defaultdict(float))
+        # place -> countries with a major airport / a hub there
+        self.major_countries = defaultdict(set)
+        self.hub_countries = defaultdict(set)
+        for iata_code, airport_data in (airports or load_airports()).items():
+            country_code = airport_data.get('country', '')
+            if country_code not in COUNTRY_NAMES:
+                continue
+            importance = airport_importance(iata_code, airport_data)
+            weight = max(importance, 0) + 1
+
+            city = airport_data.get('city', '')
+            region = normalize_text(airport_data.get('subd', ''))
+            city_keys = {key for key in (normalize_text(city), normalize_text(city.split(',')[0])) if key}
+            for key in city_keys:
+                self.city_weights[key][country_code] += weight
+            if region:
+                self.region_weights[region][country_code] += weight
+            for key in city_keys | ({region} if region else set()):
+                if importance >= MAJOR_AIRPORT_SCORE:
+                    self.major_countries[key].add(country_code)
+                if iata_code in MAJOR_HUBS:
+                    self.hub_countries[key].add(country_code)
+
+    @property
+    def geolocator(self):
+        # built once and only when the offline data could not answer
+        with self._geolocator_lock:
+            if self._geolocator is None:
+                from geopy.geocoders import Nominatim
+                self._geolocator = Nominatim(user_agent="my_travel_agent", domain=NOMINATIM_DOMAIN, scheme=NOMINATIM_SCHEME)
+            return self._geolocator
+
+    def lookup_offline(self, place: str) -> Optional[str]:
+        """Country name for a place from the bundled data, or None"""
+        key = normalize_text(place)
+        if not key:
+            return None
+
+        if key in self.country_lookup:
+            return self.country_lookup[key]
+
+        keys = [key] + ([CITY_EXONYMS[key]] if key in CITY_EXONYMS else [])
+        # a region like "Cusco" adds to the city of the same name
+        weights = defaultdict(float)
+        major, hubs = set(), set()
+        for place in keys:
+            for country_code, weight in self.city_weights.get(place, {}).items():
+                weights[country_code] += weight
+            for country_code, weight in self.region_weights.get(place, {}).items():
+                weights[country_code] += weight * REGION_WEIGHT
+            major |= self.major_countries.get(place, set())
+            hubs |= self.hub_countries.get(place, set())
+        if not weights:
+            return None
+
+        # Florence, Venice, Valencia, Santiago... small airports elsewhere must not outvote the place meant
+        leader = max(weights, key=weights.get)
+        if hubs == {leader}:
+            return COUNTRY_NAMES[leader]
+        others = sum(weights.values()) - weights[leader]
+        # a lone small airport is no proof either: "Kochi" alone would be Kochi, Japan
+        if len(hubs) <= 1 and leader in major and weights[leader] >= OFFLINE_LEAD_RATIO * others:
+            return COUNTRY_NAMES[leader]
+        return None
+
+    @traced("http.nominatim", kind="http")
+    def lookup_nominatim(self, place: str) -> Optional[str]:
+        try:
+            location = self.geolocator.geocode(place, addressdetails=True, language='en')
+        except Exception as e:
+            print(f"Nominatim lookup failed for {place}: {e}")
+            return None
+        if location and 'country' in location.raw.get('address', {}):
+            return location.raw['address']['country']
+        return None
+
+    def resolve(self, place: str) -> str:
+        """Country name for a single place, falls back to the input itself"""
+        key = normalize_text(place)
+        if not key:
+            return place
+
+        # the cache only holds Nominatim answers (the offline data never changes its mind),
+        # so it is asked second and its hit ratio is the share of Nominatim calls saved
+        country = self.lookup_offline(place)
+        if country:
+            return country
+
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        if self.use_nominatim:
+            country = self.lookup_nominatim(place)
+            if country:
+                self.cache.put(key, country)
+                return country
+
+        return place
+
+    def city_to_country(self, city_input: str) -> Union[str, List[str]]:
+        """Same contract as LLMWebScrapper.city_to_country: one country, or a list when the places disagree"""
+        if ',' not in city_input:
+            return self.resolve(city_input.strip())
+
+        countries = []
+        for city in city_input.split(','):
+            if not city.strip():
+                continue
+            country = self.resolve(city.strip())
+            if country not in countries:
+                countries.append(country)
+
+        if len(countries) == 1:
+            return countries[0]
+        return countries or city_input
@@ -0,0 +1,84 @@
+# Shared HTTP client for APICaller: pooled keep-alive connections, per-endpoint timeouts, sync and async
+import os
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tools.telemetry import span
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+
+# (connect, read) seconds per upstream endpoint
+DEFAULT_TIMEOUT = (3.05, 15)
+ENDPOINT_TIMEOUTS = {
+    'weather': (3.05, 10),
+    'flights': (3.05, 20),
+    'routes': (3.05, 20)
+}
+# AviationStack bills every request that reaches it, while QuotaBudget counts one per logical call,
+# so these are only retried when the connection itself failed
+METERED_ENDPOINTS = {'flights', 'routes'}
+
+
+class HTTPClient:
+    """Pooled requests sessions (one without status retries for metered endpoints); async calls open a short-lived aiohttp session each"""
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 timeouts: Optional[Dict[str, Tuple[float, float]]] = None, retries: int = HTTP_RETRIES):
+        self.pool_maxsize = pool_maxsize
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+
+        # read=0: a read timeout already cost the full read timeout, retrying it would multiply the worst case
+        retry = Retry(total=retries, read=0, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                      allowed_methods=['GET'], raise_on_status=False)
+        metered_retry = Retry(total=retries, read=0, backoff_factor=0.3, allowed_methods=['GET'])
+        self.session = self._session(HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry))
+        self.metered_session = self._session(
+            HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=metered_retry)
+        )
+
+    @staticmethod
+    def _session(adapter: HTTPAdapter) -> requests.Session:
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def timeout_for(self, endpoint: str) -> Tuple[float, float]:
+        return self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    def get_json(self, url: str, params: Dict[str, Any] = None, endpoint: str = None) -> Dict[str, Any]:
+        with span(f"http.{endpoint or 'get'}", kind="http", host=urlparse(url).netloc) as current:
+            session = self.metered_session if endpoint in METERED_ENDPOINTS else self.session
+            response = session.get(url, params=params, timeout=self.timeout_for(endpoint))
+            if current is not None:
+                current.set(status_code=response.status_code)
+            response.raise_for_status()
+            return response.json()
+
+    async def aget_json(self, url: str, params: Dict[str, Any] = None, endpoint: str = None) -> Dict[str, Any]:
+        import aiohttp
+
+        connect_timeout, read_timeout = self.timeout_for(endpoint)
+        timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        # aiohttp only accepts str/int/float query values
+        query = {key: value if isinstance(value, (int, float)) else str(value)
+                 for key, value in (params or {}).items() if value is not None}
+
+        # a session kept per event loop outlived every asyncio.run that created it (nothing closed it),
+        # so each call gets its own and closes it; callers run on short-lived loops anyway
+        with span(f"http.{endpoint or 'get'}", kind="http", host=urlparse(url).netloc) as current:
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_maxsize)) as session:
+                async with session.get(url, params=query, timeout=timeout) as response:
+                    if current is not None:
+                        current.set(status_code=response.status)
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+
+    def close(self):
+        self.session.close()
+        self.metered_session.close()
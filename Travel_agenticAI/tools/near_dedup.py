@@ -0,0 +1,155 @@
+# MinHash / LSH near-duplicate detection for knowledge-base documents and chunks
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))  # estimated Jaccard similarity of word shingles
+DEDUP_NUM_PERM = 128
+DEDUP_SHINGLE_SIZE = 5
+
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the word `size`-grams, case and punctuation insensitive"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64)
+
+
+def _false_probabilities(threshold: float, bands: int, rows: int, steps: int = 50) -> Tuple[float, float]:
+    # area under the S-curve below the threshold (false positives) and above it (false negatives)
+    def candidate(s):
+        return 1 - (1 - s ** rows) ** bands
+    below = [threshold * (i + 0.5) / steps for i in range(steps)]
+    above = [threshold + (1 - threshold) * (i + 0.5) / steps for i in range(steps)]
+    false_positive = sum(candidate(s) for s in below) * threshold / steps
+    false_negative = sum(1 - candidate(s) for s in above) * (1 - threshold) / steps
+    return false_positive, false_negative
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) whose S-curve best separates pairs around the threshold"""
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive, false_negative = _false_probabilities(threshold, bands, rows)
+        if false_positive + false_negative < best_error:
+            best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    LSH over MinHash signatures. Candidates from the band buckets are confirmed with the
+    signature agreement (the Jaccard estimate), so a reported duplicate is always above the threshold.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 shingle_size: int = DEDUP_SHINGLE_SIZE, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a, b < 2^32 and 32-bit shingle hashes keep a*x + b inside uint64
+        self.a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.buckets = [dict() for _ in range(self.bands)]
+        self.signatures = {}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        hashes = shingles(text, self.shingle_size)
+        if hashes.size == 0:
+            return None
+        return (((self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME) & 0xFFFFFFFF).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.mean(first == second))
+
+    def find(self, text: str, signature: np.ndarray = None) -> Optional[Tuple[str, float]]:
+        """(key, estimated Jaccard) of the most similar indexed text above the threshold, or None"""
+        signature = self.signature(text) if signature is None else signature
+        if signature is None:
+            return None
+        best = None
+        seen = set()
+        for band, key in self._band_keys(signature):
+            for candidate in self.buckets[band].get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                score = self.similarity(signature, self.signatures[candidate])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (candidate, score)
+        return best
+
+    def add(self, key: str, text: str, signature: np.ndarray = None):
+        signature = self.signature(text) if signature is None else signature
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def check_and_add(self, key: str, text: str) -> Optional[str]:
+        """Key of the earlier near-duplicate (and text is not indexed), or None after indexing text"""
+        signature = self.signature(text)
+        match = self.find(text, signature)
+        if match is not None:
+            return match[0]
+        self.add(key, text, signature)
+        return None
+
+
+class DedupStage:
+    """Document- then chunk-level filtering for seeding, with counts of what was dropped"""
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.documents = NearDuplicateIndex(threshold)
+        self.chunks = NearDuplicateIndex(threshold)
+        self.stats = {'documents': 0, 'documents_dropped': 0, 'chunks': 0, 'chunks_dropped': 0,
+                      'chars': 0, 'chars_dropped': 0}
+
+    def seed(self, key: str, text: str, chunk_items: List[Tuple[str, str]]):
+        """Index content that is already stored so new content is compared against it too"""
+        self.documents.add(key, text)
+        for chunk_key, chunk_text in chunk_items:
+            self.chunks.add(chunk_key, chunk_text)
+
+    def check_document(self, key: str, text: str) -> Optional[str]:
+        self.stats['documents'] += 1
+        self.stats['chars'] += len(text)
+        duplicate_of = self.documents.check_and_add(key, text)
+        if duplicate_of is not None:
+            self.stats['documents_dropped'] += 1
+            self.stats['chars_dropped'] += len(text)
+        return duplicate_of
+
+    def filter_chunks(self, chunk_items: List[Tuple[str, str]]) -> Dict[str, Optional[str]]:
+        """chunk key -> key of the chunk it duplicates (None when kept)"""
+        result = {}
+        for chunk_key, chunk_text in chunk_items:
+            self.stats['chunks'] += 1
+            duplicate_of = self.chunks.check_and_add(chunk_key, chunk_text)
+            if duplicate_of is not None:
+                self.stats['chunks_dropped'] += 1
+            result[chunk_key] = duplicate_of
+        return result
+
+    def report(self) -> str:
+        s = self.stats
+        chars = 100 * s['chars_dropped'] / s['chars'] if s['chars'] else 0.0
+        return (f"dedup (Jaccard >= {self.threshold}): dropped {s['documents_dropped']}/{s['documents']} documents "
+                f"({chars:.1f}% of text) and {s['chunks_dropped']}/{s['chunks']} chunks")
@@ -0,0 +1,170 @@
+# Keeps only the parts of a visa page likely to hold visa facts, under a hard token budget
+import re
+from typing import List, Tuple, Union
+from bs4 import BeautifulSoup
+from data.countries import COUNTRY_NAMES, COUNTRY_ALIASES, COUNTRY_DEMONYMS
+from tools.airport_index import normalize_text
+
+PRUNE_TOKEN_BUDGET = 1500
+
+# a table row is one block, so a country stays together with its requirement
+BLOCK_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'p', 'li', 'tr', 'dt', 'dd']
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5'}
+NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside', 'form', 'noscript', 'svg']
+
+VISA_TERMS = re.compile(
+    r'\b(visa|e-?visa|eta|passport|arrival|entry|stay|permit|schengen|embassy|consulate|'
+    r'requirement|required|document|application|apply|processing|valid|validity|fee|cost|proof|insurance)s?\b',
+    re.IGNORECASE
+)
+DURATION = re.compile(r'\b\d+\s*(day|days|month|months|week|weeks|hours)\b', re.IGNORECASE)
+MONEY = re.compile(r'([$€£₹]\s?\d+|\d+\s?(usd|eur|gbp|inr|euros?|dollars?))', re.IGNORECASE)
+
+
+def _terms(code: str) -> List[str]:
+    """Name and demonyms of a country; pages write 'Indian citizens' far more often than 'India citizens'"""
+    demonyms = COUNTRY_DEMONYMS.get(code, ())
+    return [COUNTRY_NAMES[code], *([demonyms] if isinstance(demonyms, str) else demonyms)]
+
+
+CODE_BY_NAME = {normalize_text(name): code for code, name in COUNTRY_NAMES.items()}
+CODE_BY_NAME.update({normalize_text(alias): code for alias, code in COUNTRY_ALIASES.items()})
+ANY_COUNTRY = re.compile(
+    r'\b(' + '|'.join(re.escape(term) for term in sorted({term for code in COUNTRY_NAMES for term in _terms(code)},
+                                                        key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+MIN_BLOCK_SCORE = 1.5
+
+_encoder = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise the usual ~4 chars per token estimate"""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    return max(len(text) // 4, 1) if text else 0
+
+
+def _name_pattern(name) -> re.Pattern:
+    """Matches the given name(s) and, for known countries, their bundled name and demonyms"""
+    names = list(name) if isinstance(name, (list, tuple)) else [str(name)]
+    terms = []
+    for name in names:
+        code = CODE_BY_NAME.get(normalize_text(name))
+        for term in [name, *(_terms(code) if code else [])]:
+            if term not in terms:
+                terms.append(term)
+    terms.sort(key=len, reverse=True)
+    return re.compile(r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\b', re.IGNORECASE)
+
+
+def extract_blocks(soup: BeautifulSoup) -> List[Tuple[str, str]]:
+    """(tag, text) for every innermost text block, in document order, without repeats"""
+    blocks = []
+    seen = set()
+    for element in soup.find_all(BLOCK_TAGS):
+        if element.name == 'tr':
+            # cells are kept apart so "India | e-Visa | 30 days" still reads as a row; a row of a nested table counts on its own
+            if element.find('tr'):
+                continue
+            text = ' | '.join(cell.get_text(separator=' ', strip=True) for cell in element.find_all(['td', 'th']))
+        # a <li> holding a <p> would otherwise be counted twice, and a <p> inside a cell belongs to its row
+        elif element.find(BLOCK_TAGS) or element.find_parent('tr'):
+            continue
+        else:
+            text = element.get_text(separator=' ', strip=True)
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        blocks.append((element.name, text))
+    return blocks
+
+
+def _is_bare(text: str) -> bool:
+    return len(text) < 25 and not VISA_TERMS.search(text)
+
+
+def score_block(text: str, passport_pattern: re.Pattern, destination_pattern: re.Pattern) -> float:
+    score = 0.0
+    # other countries are blanked out first, "French" must not count as France inside "French Guiana"
+    others = [match for match in ANY_COUNTRY.finditer(text)
+              if not passport_pattern.fullmatch(match.group(0)) and not destination_pattern.fullmatch(match.group(0))]
+    own_text = text
+    for match in others:
+        own_text = own_text[:match.start()] + ' ' * len(match.group(0)) + own_text[match.end():]
+    mentions_destination = bool(destination_pattern.search(own_text))
+    mentions_passport = bool(passport_pattern.search(own_text))
+    if mentions_destination:
+        score += 2
+    if mentions_passport:
+        score += 2
+    score += min(len(VISA_TERMS.findall(text)), 4)
+    if DURATION.search(text):
+        score += 1.5
+    if MONEY.search(text):
+        score += 1.5
+    # long lists of bare country names match the names but carry no facts
+    if _is_bare(text):
+        score = min(score, 1)
+    # rows and FAQs about other passports ("Do Albanian citizens need a visa...")
+    if others:
+        score -= 3
+    return score
+
+
+def prune_page_text(page: Union[str, BeautifulSoup], passport_country, destination_country,
+                    token_budget: int = PRUNE_TOKEN_BUDGET) -> str:
+    """Highest scoring blocks (plus their headings) in page order, never more than token_budget tokens"""
+    soup = BeautifulSoup(page, 'html.parser') if isinstance(page, str) else page
+    for element in soup(NOISE_TAGS):
+        element.decompose()
+
+    passport_pattern = _name_pattern(passport_country)
+    destination_pattern = _name_pattern(destination_country)
+
+    blocks = extract_blocks(soup)
+    scores = [score_block(text, passport_pattern, destination_pattern) for _, text in blocks]
+    tokens = [count_tokens(text) for _, text in blocks]
+
+    # headings are only kept as context, but a relevant heading lifts the blocks under it
+    headings = {}
+    current_heading = None
+    for i, (tag, _) in enumerate(blocks):
+        if tag in HEADING_TAGS:
+            current_heading = i
+        else:
+            headings[i] = current_heading
+            if current_heading is not None and not _is_bare(blocks[i][1]):
+                scores[i] += 0.5 * max(scores[current_heading], 0)
+
+    selected = set()
+    used = 0
+    for i in sorted(headings, key=lambda i: -scores[i]):
+        if scores[i] < MIN_BLOCK_SCORE:
+            break
+        needed = {i}
+        heading = headings[i]
+        if heading is not None:
+            needed.add(heading)
+        cost = sum(tokens[j] for j in needed - selected)
+        if used + cost > token_budget:
+            continue
+        selected |= needed
+        used += cost
+
+    if not selected:
+        # unknown layout, fall back to the start of the page text
+        text = soup.get_text(separator='\n', strip=True)
+        while text and count_tokens(text) > token_budget:
+            text = text[:int(len(text) * 0.9)]
+        return text
+
+    return '\n'.join(blocks[i][1] for i in sorted(selected))
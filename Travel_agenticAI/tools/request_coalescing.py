@@ -0,0 +1,159 @@
+# Single-flight deduplication and a persisted monthly request budget for metered upstream APIs
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Awaitable, Dict
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Concurrent callers asking for the same key wait for one shared call instead of issuing their own"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.async_calls = {}
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            # BaseException too, otherwise waiters would take an interrupted call's None as the result
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self.async_calls.setdefault(loop, {})
+
+        future = calls.get(key)
+        if future is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # shield keeps our own cancellation away from the shared future, so a cancelled
+                # future means the leader was cancelled, not us: make the call ourselves
+                if not future.cancelled():
+                    raise
+                return await self.ado(key, fn)
+
+        future = loop.create_future()
+        calls[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # the leader was cancelled (e.g. a wait_for timeout), followers must not wait forever
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # nobody else may be waiting, mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del calls[key]
+
+
+class QuotaBudget:
+    """
+    Counts upstream requests per calendar month in a small JSON file.
+    Once only `reserve` requests are left, try_consume refuses so callers can degrade to cached data.
+    """
+
+    def __init__(self, monthly_limit: int, reserve: int = 0, state_file: str = None, name: str = "quota"):
+        self.monthly_limit = monthly_limit
+        self.reserve = reserve
+        self.state_file = state_file
+        self.name = name
+        self.lock = threading.Lock()
+        self.refused = 0
+        self.state = {'month': self._month(), 'used': 0}
+        self._load()
+
+    @staticmethod
+    def _month() -> str:
+        return time.strftime('%Y-%m')
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        except Exception as e:
+            print(f"Error reading {self.name} state: {e}")
+
+    def _save(self):
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            print(f"Error writing {self.name} state: {e}")
+
+    def _roll_month(self):
+        month = self._month()
+        if self.state['month'] != month:
+            self.state = {'month': month, 'used': 0}
+
+    def remaining(self) -> int:
+        with self.lock:
+            self._roll_month()
+            return max(self.monthly_limit - self.state['used'], 0)
+
+    def try_consume(self, count: int = 1) -> bool:
+        """Reserve `count` requests, False when that would dip into the reserve"""
+        with self.lock:
+            self._roll_month()
+            if self.state['used'] + count > self.monthly_limit - self.reserve:
+                self.refused += 1
+                return False
+            self.state['used'] += count
+            self._save()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        remaining = self.remaining()
+        return {
+            'name': self.name,
+            'month': self.state['month'],
+            'used': self.state['used'],
+            'limit': self.monthly_limit,
+            'remaining': remaining,
+            'refused': self.refused
+        }
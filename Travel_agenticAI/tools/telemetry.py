@@ -0,0 +1,411 @@
+# Spans, metrics and per-turn latency breakdowns for tools, upstream HTTP calls, Selenium and LLM calls.
+# Exported as JSON log lines (TELEMETRY_LOG) and Prometheus text (TELEMETRY_PORT, GET /metrics).
+import os
+import sys
+import json
+import time
+import uuid
+import inspect
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps, lru_cache
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.callbacks import BaseCallbackHandler
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "1") != "0"
+TELEMETRY_LOG = os.getenv("TELEMETRY_LOG", "")          # file path, '-' for stderr, empty for no JSON logs
+TELEMETRY_PORT = int(os.getenv("TELEMETRY_PORT", "0"))   # 0 leaves the /metrics endpoint off
+METRIC_PREFIX = "travel_agent"
+# seconds; from cached lookups (~ms) to Selenium visa lookups (~tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 45, 90)
+
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+_current_trace = contextvars.ContextVar("telemetry_trace", default=None)
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by label set, plus stats() callbacks read at export time"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = defaultdict(lambda: defaultdict(float))
+        self.histograms = defaultdict(dict)
+        self.help = {}
+        self.stats_sources = {}
+
+    def inc(self, metric: str, value: float = 1.0, help: str = "", **labels):
+        with self.lock:
+            self.counters[metric][_label_key(labels)] += value
+            self.help.setdefault(metric, help)
+
+    def observe(self, metric: str, seconds: float, help: str = "", **labels):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms[metric].get(key)
+            if series is None:
+                series = self.histograms[metric][key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += seconds
+            series['count'] += 1
+            self.help.setdefault(metric, help)
+
+    def register_stats(self, group: str, name: str, stats_fn: Callable[[], Dict[str, Any]]):
+        """
+        stats_fn's numeric fields are exported as gauges `<prefix>_<group>_<field>{name=...}`,
+        e.g. the hit/miss counters and hit_ratio of every cache. Re-registering a name replaces it.
+        """
+        with self.lock:
+            self.stats_sources[(group, name)] = stats_fn
+
+    def collect_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self.lock:
+            sources = dict(self.stats_sources)
+        collected = defaultdict(dict)
+        for (group, name), stats_fn in sources.items():
+            try:
+                collected[group][name] = stats_fn()
+            except Exception as e:
+                print(f"Telemetry could not read {group} stats for {name}: {e}")
+        return collected
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {name: {key: dict(value, buckets=list(value['buckets'])) for key, value in series.items()}
+                          for name, series in self.histograms.items()}
+            help = dict(self.help)
+
+        for name, series in sorted(counters.items()):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help.get(name) or name}")
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in series.items():
+                lines.append(f"{metric}{_format_labels(key)} {value:g}")
+
+        for name, series in sorted(histograms.items()):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help.get(name) or name}")
+            lines.append(f"# TYPE {metric} histogram")
+            for key, value in series.items():
+                for bound, count in zip(self.buckets, value['buckets']):
+                    lines.append(f"{metric}_bucket{_format_labels(key + (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{metric}_bucket{_format_labels(key + (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {value['sum']:.6f}")
+                lines.append(f"{metric}_count{_format_labels(key)} {value['count']}")
+
+        gauges = defaultdict(list)
+        for group, by_name in self.collect_stats().items():
+            for name, stats in by_name.items():
+                for field, value in stats.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        gauges[f"{METRIC_PREFIX}_{group}_{field}"].append((_label_key({'name': name}), value))
+        for metric, series in sorted(gauges.items()):
+            lines.append(f"# TYPE {metric} gauge")
+            for key, value in series:
+                lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+class JSONLogger:
+    """One JSON object per line, appended from any thread"""
+
+    def __init__(self, target: str = TELEMETRY_LOG):
+        self.target = target
+        self.lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]):
+        if not self.target:
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            try:
+                if self.target == '-':
+                    print(line, file=sys.stderr)
+                else:
+                    os.makedirs(os.path.dirname(self.target) or '.', exist_ok=True)
+                    with open(self.target, 'a', encoding='utf-8') as f:
+                        f.write(line + "\n")
+            except Exception as e:
+                print(f"Telemetry log write failed: {e}")
+
+
+metrics = MetricsRegistry()
+logger = JSONLogger()
+
+
+class Span:
+    def __init__(self, name: str, kind: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        parent = _current_span.get()
+        trace = _current_trace.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace = trace
+        self.trace_id = trace.trace_id if trace is not None else (parent.trace_id if parent is not None else None)
+        self.start_wall = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.status = 'ok'
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error: BaseException = None):
+        self.duration = time.perf_counter() - self.start
+        if error is not None:
+            self.status = 'error'
+            self.error = f"{type(error).__name__}: {error}"
+        record_span(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {
+            'type': 'span', 'ts': round(self.start_wall, 3), 'trace_id': self.trace_id, 'span_id': self.span_id,
+            'parent_id': self.parent_id, 'name': self.name, 'kind': self.kind,
+            'duration_ms': round(self.duration * 1000, 2) if self.duration is not None else None, 'status': self.status
+        }
+        if self.attributes:
+            record['attributes'] = self.attributes
+        if self.error:
+            record['error'] = self.error
+        return record
+
+
+def record_span(span: Span):
+    metrics.observe("span_duration_seconds", span.duration, help="Duration of instrumented operations",
+                    kind=span.kind, name=span.name, status=span.status)
+    if span.trace is not None:
+        span.trace.add(span)
+    logger.emit(span.to_dict())
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Times the block as a child of the current span; exceptions are recorded and re-raised"""
+    if not TELEMETRY_ENABLED:
+        yield None
+        return
+    current = Span(name, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        _current_span.reset(token)
+        current.finish(e)
+        raise
+    _current_span.reset(token)
+    current.finish()
+
+
+def traced(name: str = None, kind: str = "internal"):
+    """Decorator form of span() for sync and async functions"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Trace:
+    """Every span finished while this trace is current (one chat turn), for the latency breakdown"""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+        self.duration = None
+
+    def add(self, finished: Span):
+        with self.lock:
+            self.spans.append(finished)
+
+    def breakdown(self) -> Dict[str, Any]:
+        with self.lock:
+            spans = list(self.spans)
+        # self time: a tool span minus the HTTP / Selenium / LLM spans inside it, so nothing is counted twice
+        child_time = defaultdict(float)
+        for s in spans:
+            if s.parent_id is not None:
+                child_time[s.parent_id] += s.duration
+        by_kind, by_name = defaultdict(float), defaultdict(float)
+        for s in spans:
+            own = max(s.duration - child_time[s.span_id], 0.0)
+            by_kind[s.kind] += own
+            by_name[s.name] += own
+        slowest = sorted(spans, key=lambda s: -s.duration)[:10]
+        return {
+            'type': 'turn', 'ts': round(time.time(), 3), 'trace_id': self.trace_id, 'name': self.name,
+            'duration_ms': round(self.duration * 1000, 2) if self.duration is not None else None,
+            'self_ms_by_kind': {kind: round(seconds * 1000, 2) for kind, seconds in sorted(by_kind.items())},
+            'self_ms_by_name': {name: round(seconds * 1000, 2) for name, seconds in sorted(by_name.items(), key=lambda item: -item[1])},
+            'spans': len(spans),
+            'slowest': [{'name': s.name, 'kind': s.kind, 'duration_ms': round(s.duration * 1000, 2), 'status': s.status}
+                        for s in slowest],
+            'tokens': {
+                'prompt': sum(s.attributes.get('prompt_tokens') or 0 for s in spans if s.kind == 'llm'),
+                'completion': sum(s.attributes.get('completion_tokens') or 0 for s in spans if s.kind == 'llm')
+            },
+            **({'attributes': self.attributes} if self.attributes else {})
+        }
+
+
+@contextmanager
+def trace(name: str = "turn", **attributes):
+    """
+    Groups everything run inside (threads included, where the context is copied) into one trace,
+    logs its breakdown when the block exits. Yields the Trace so callers can read breakdown().
+    """
+    current = Trace(name, attributes)
+    if not TELEMETRY_ENABLED:
+        yield current
+        return
+    token = _current_trace.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - start
+        _current_trace.reset(token)
+        metrics.observe("turn_duration_seconds", current.duration, help="End-to-end time of a chat turn", name=name)
+        logger.emit(current.breakdown())
+
+
+def register_stats(group: str, name: str, stats_fn: Callable[[], Dict[str, Any]]):
+    metrics.register_stats(group, name, stats_fn)
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """
+    LLM calls as 'llm' spans with prompt / completion token counts. LangChain runs callbacks
+    in the caller's context, so the span joins the current trace and tool span.
+    """
+
+    def __init__(self):
+        self.running: Dict[Any, Span] = {}
+        self.lock = threading.Lock()
+
+    def _start(self, run_id, serialized, invocation_params=None):
+        params = invocation_params or {}
+        model = (params.get('azure_deployment') or params.get('model') or params.get('model_name')
+                 or (serialized or {}).get('name', 'llm'))
+        with self.lock:
+            self.running[run_id] = Span("llm.call", "llm", {'model': model})
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, serialized, kwargs.get('invocation_params'))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, serialized, kwargs.get('invocation_params'))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self.lock:
+            current = self.running.pop(run_id, None)
+        if current is None:
+            return
+        prompt_tokens, completion_tokens = _token_usage(response)
+        current.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        model = current.attributes['model']
+        for token_type, count in (('prompt', prompt_tokens), ('completion', completion_tokens)):
+            if count is not None:
+                metrics.inc("llm_tokens_total", count, help="LLM tokens by type", model=model, type=token_type)
+        current.finish()
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self.lock:
+            current = self.running.pop(run_id, None)
+        if current is not None:
+            current.finish(error)
+
+
+@lru_cache(maxsize=1)
+def _callback_handler() -> TelemetryCallbackHandler:
+    return TelemetryCallbackHandler()
+
+
+def get_callback_handler() -> Optional[TelemetryCallbackHandler]:
+    """Shared LangChain callback for LLM latency and token usage, None when telemetry is off"""
+    return _callback_handler() if TELEMETRY_ENABLED else None
+
+
+def _token_usage(response) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens from usage_metadata, else from the provider's token_usage"""
+    prompt = completion = None
+    for generations in response.generations or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+            if usage:
+                prompt = (prompt or 0) + usage.get('input_tokens', 0)
+                completion = (completion or 0) + usage.get('output_tokens', 0)
+    if prompt is None:
+        usage = (response.llm_output or {}).get('token_usage') or {}
+        prompt, completion = usage.get('prompt_tokens'), usage.get('completion_tokens')
+    return prompt, completion
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = TELEMETRY_PORT, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serves GET /metrics in a daemon thread, once per process; None when port is 0"""
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                print(f"Telemetry endpoint not started on port {port}: {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="telemetry-metrics", daemon=True).start()
+            print(f"Prometheus metrics on http://{host}:{port}/metrics")
+        return _server
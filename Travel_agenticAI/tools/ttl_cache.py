@@ -0,0 +1,171 @@
+# Bounded in-process TTL cache with stale-while-revalidate and optional JSON persistence
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Awaitable
+
+
+class TTLCache:
+    """
+    LRU cache whose entries are fresh for `ttl` seconds.
+    For a further `stale_ttl` seconds an entry is still served while one background refresh runs.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0, max_entries: int = 256,
+                 persist_path: Optional[str] = None, should_cache: Callable[[Any], bool] = None, name: str = "cache"):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.should_cache = should_cache or (lambda value: value is not None)
+        self.name = name
+
+        self.lock = threading.RLock()
+        self.entries = OrderedDict()  # key -> (value, stored_at wall clock)
+        self.refreshing = set()
+        self._tasks = set()
+        self.counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'evictions': 0}
+        self._load()
+
+    def _load(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            for key, (value, stored_at) in stored.items():
+                if time.time() - stored_at < self.ttl + self.stale_ttl:
+                    self.entries[key] = (value, stored_at)
+        except Exception as e:
+            print(f"Error reading {self.name} cache file: {e}")
+
+    def _save(self):
+        if not self.persist_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.persist_path) or '.', exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"Error writing {self.name} cache file: {e}")
+
+    def _count(self, counter: str):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _lookup(self, key: str):
+        """(value, state) where state is 'fresh', 'stale', 'expired' or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, None
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self.entries.move_to_end(key)
+                return value, 'fresh'
+            if age < self.ttl + self.stale_ttl:
+                self.entries.move_to_end(key)
+                return value, 'stale'
+            # expired entries stay until LRU eviction, callers may still want them as a last resort
+            return value, 'expired'
+
+    def get(self, key: str, allow_stale: bool = False, allow_expired: bool = False) -> Any:
+        value, state = self._lookup(key)
+        if state == 'fresh' or (state == 'stale' and allow_stale) or (state is not None and allow_expired):
+            return value
+        return None
+
+    def set(self, key: str, value: Any):
+        if not self.should_cache(value):
+            return
+        with self.lock:
+            self.entries[key] = (value, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters['evictions'] += 1
+            self._save()
+
+    def _start_refresh(self, key: str) -> bool:
+        with self.lock:
+            if key in self.refreshing:
+                return False
+            self.refreshing.add(key)
+            self.counters['refreshes'] += 1
+            return True
+
+    def _finish_refresh(self, key: str, value: Any):
+        try:
+            self.set(key, value)
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        value, state = self._lookup(key)
+        if state == 'fresh':
+            self._count('hits')
+            return value
+
+        if state == 'stale':
+            self._count('stale_hits')
+            if self._start_refresh(key):
+                def refresh():
+                    try:
+                        self._finish_refresh(key, loader())
+                    except Exception as e:
+                        print(f"Background refresh of {self.name} failed for {key}: {e}")
+                        self._finish_refresh(key, None)
+                threading.Thread(target=refresh, daemon=True).start()
+            return value
+
+        self._count('misses')
+        value = loader()
+        self.set(key, value)
+        return value
+
+    async def aget_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value, state = self._lookup(key)
+        if state == 'fresh':
+            self._count('hits')
+            return value
+
+        if state == 'stale':
+            self._count('stale_hits')
+            if self._start_refresh(key):
+                async def refresh():
+                    try:
+                        self._finish_refresh(key, await loader())
+                    except Exception as e:
+                        print(f"Background refresh of {self.name} failed for {key}: {e}")
+                        self._finish_refresh(key, None)
+                task = asyncio.get_running_loop().create_task(refresh())
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+
+        self._count('misses')
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters['hits'] + self.counters['stale_hits'] + self.counters['misses']
+        served = self.counters['hits'] + self.counters['stale_hits']
+        return {
+            'name': self.name,
+            'entries': len(self.entries),
+            **self.counters,
+            'hit_ratio': round(served / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,144 @@
+# Append-only JSONL frontier shared by url_finder.py (discovery) and gather_knowledge.py (crawling)
+import os
+import json
+import time
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Any, Dict, Iterable, List, Optional
+
+URL_FRONTIER_FILE = "scraped_data/url_frontier.jsonl"
+
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# statuses gather_knowledge.py still has to visit
+PENDING_STATUSES = {'new', 'failed'}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Lowercase scheme and host, drop default ports, fragments and tracking parameters, sort the query.
+    The path is kept as-is: gather_knowledge.py names files after its second-to-last segment.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class URLFrontier:
+    """
+    Every change is one appended JSON line, the current view is rebuilt by replaying them:
+      {"type": "url", "url", "topics", "query", "discovered_at"}   first sighting or a new topic tag
+      {"type": "status", "url", "status", "at", ...}               crawl outcome
+      {"type": "query", "query", "at", "results"}                  a search that has been run
+    """
+
+    def __init__(self, path: str = URL_FRONTIER_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.queries = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._apply(json.loads(line))
+                except Exception as e:
+                    # a torn last line after a crash shouldn't lose the rest of the frontier
+                    print(f"Skipping bad frontier line {line_number}: {e}")
+
+    def _apply(self, record: Dict[str, Any]):
+        kind = record.get('type')
+        if kind == 'url':
+            entry = self.entries.get(record['url'])
+            if entry is None:
+                self.entries[record['url']] = {
+                    'url': record['url'],
+                    'topics': list(record.get('topics', [])),
+                    'query': record.get('query'),
+                    'discovered_at': record.get('discovered_at'),
+                    'status': 'new'
+                }
+            else:
+                entry['topics'].extend(t for t in record.get('topics', []) if t not in entry['topics'])
+        elif kind == 'status':
+            entry = self.entries.get(record['url'])
+            if entry is not None:
+                entry.update({key: value for key, value in record.items() if key not in ('type', 'url')})
+        elif kind == 'query':
+            self.queries[record['query']] = record
+
+    def _append(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        for record in records:
+            self._apply(record)
+
+    def add(self, url: str, topic: Optional[str] = None, query: Optional[str] = None) -> bool:
+        return self.add_many([url], topic=topic, query=query) == 1
+
+    def add_many(self, urls: Iterable[str], topic: Optional[str] = None, query: Optional[str] = None) -> int:
+        """Adds unseen URLs (and new topic tags to seen ones), returns how many URLs were new"""
+        records = []
+        new = 0
+        now = time.time()
+        with self.lock:
+            seen = set()
+            for url in urls:
+                url = canonicalize_url(url)
+                if url in seen:
+                    continue
+                seen.add(url)
+                entry = self.entries.get(url)
+                if entry is None:
+                    new += 1
+                    records.append({'type': 'url', 'url': url, 'topics': [topic] if topic else [],
+                                    'query': query, 'discovered_at': now})
+                elif topic and topic not in entry['topics']:
+                    records.append({'type': 'url', 'url': url, 'topics': [topic]})
+            self._append(records)
+        return new
+
+    def mark(self, url: str, status: str, **fields):
+        url = canonicalize_url(url)
+        with self.lock:
+            if url in self.entries:
+                self._append([{'type': 'status', 'url': url, 'status': status, 'at': time.time(), **fields}])
+
+    def record_query(self, query: str, results: int):
+        with self.lock:
+            self._append([{'type': 'query', 'query': query, 'at': time.time(), 'results': results}])
+
+    def has_query(self, query: str) -> bool:
+        return query in self.queries
+
+    def urls(self, statuses: Optional[Iterable[str]] = None) -> List[str]:
+        """URLs in discovery order, optionally only those whose latest status is in `statuses`"""
+        statuses = set(statuses) if statuses is not None else None
+        return [url for url, entry in self.entries.items() if statuses is None or entry['status'] in statuses]
+
+    def pending(self) -> List[str]:
+        return self.urls(PENDING_STATUSES)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
@@ -0,0 +1,196 @@
+# Quantized (int8 / float16) embeddings in memory-mapped .npy files, brute-force or IVF top-k with NumPy
+import os
+import json
+import shutil
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+MEMMAP_STORE_DIR = os.getenv("MEMMAP_STORE_DIR", "chroma_db/memmap")
+MEMMAP_DTYPE = os.getenv("MEMMAP_DTYPE", "int8")
+IVF_NPROBE = int(os.getenv("MEMMAP_IVF_NPROBE", "8"))
+SEARCH_BLOCK_ROWS = 4096  # rows dequantized at a time; small blocks stay in CPU cache and bound temporary memory
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """(stored vectors, per-row scales) where int8 rows are v * 127 / max|v|"""
+    if dtype == 'float16':
+        return vectors.astype(np.float16), None
+    if dtype == 'int8':
+        if len(vectors) == 0:
+            # an empty collection, max() has nothing to reduce
+            return vectors.astype(np.int8), np.zeros(0, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1).astype(np.float32)
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, None] * 127), -127, 127).astype(np.int8)
+        return quantized, scales / 127
+    raise ValueError(f"Unsupported dtype {dtype}, use int8 or float16")
+
+
+def kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, sample: int = 50000, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (unit length) on a sample of the vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[rng.choice(len(vectors), sample, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(nlist):
+            members = vectors[assignment == cluster]
+            # an empty cluster keeps its old centroid
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+        centroids = _normalize(centroids)
+    return centroids.astype(np.float32)
+
+
+class MemmapVectorStore:
+    """
+    Read-only store opened with mmap_mode='r': every worker process maps the same files,
+    so the vectors sit once in the OS page cache instead of once per process.
+    With IVF the rows are stored grouped by cluster, a query only scans its nprobe nearest clusters.
+    """
+
+    def __init__(self, path: str = MEMMAP_STORE_DIR):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, 'ids.json'), 'r', encoding='utf-8') as f:
+            self.ids = json.load(f)
+        self.vectors = np.load(os.path.join(path, 'vectors.npy'), mmap_mode='r')
+        self.scales = np.load(os.path.join(path, 'scales.npy'), mmap_mode='r') if self.meta['dtype'] == 'int8' else None
+        self.centroids = None
+        self.offsets = None
+        if self.meta.get('nlist'):
+            self.centroids = np.load(os.path.join(path, 'centroids.npy'))
+            self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+        self.row_of = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+
+    @staticmethod
+    def exists(path: str = MEMMAP_STORE_DIR) -> bool:
+        return os.path.exists(os.path.join(path, 'meta.json'))
+
+    @classmethod
+    def build(cls, path: str, ids: Sequence[str], vectors: np.ndarray, dtype: str = MEMMAP_DTYPE,
+              nlist: int = 0) -> 'MemmapVectorStore':
+        """Write a new store next to `path` and swap it in, readers of the old files are not disturbed"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        vectors = _normalize(vectors)
+        ids = list(ids)
+        centroids = offsets = None
+        if nlist and len(vectors) >= nlist:
+            centroids = kmeans(vectors, nlist)
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind='stable')
+            vectors, ids = vectors[order], [ids[i] for i in order]
+            offsets = np.searchsorted(assignment[order], np.arange(nlist + 1)).astype(np.int64)
+        else:
+            nlist = 0
+
+        stored, scales = quantize(vectors, dtype)
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'vectors.npy'), stored)
+        if scales is not None:
+            np.save(os.path.join(tmp_path, 'scales.npy'), scales)
+        if nlist:
+            np.save(os.path.join(tmp_path, 'centroids.npy'), centroids)
+            np.save(os.path.join(tmp_path, 'offsets.npy'), offsets)
+        with open(os.path.join(tmp_path, 'ids.json'), 'w', encoding='utf-8') as f:
+            json.dump(ids, f)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'dtype': dtype, 'dim': int(stored.shape[1]) if len(stored) else 0,
+                       'count': len(ids), 'nlist': nlist}, f)
+
+        old_path = f"{path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return cls(path)
+
+    def nbytes(self) -> int:
+        total = self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+        if self.centroids is not None:
+            total += self.centroids.nbytes + self.offsets.nbytes
+        return total
+
+    def _scores(self, queries: np.ndarray, start: int, end: int) -> np.ndarray:
+        """Cosine similarity of every query against rows start:end, dequantized block by block"""
+        out = np.empty((len(queries), end - start), dtype=np.float32)
+        for block in range(start, end, SEARCH_BLOCK_ROWS):
+            block_end = min(block + SEARCH_BLOCK_ROWS, end)
+            rows = np.asarray(self.vectors[block:block_end], dtype=np.float32)
+            scores = queries @ rows.T
+            if self.scales is not None:
+                scores *= self.scales[block:block_end]
+            out[:, block - start:block_end - start] = scores
+        return out
+
+    def _ranges(self, query: np.ndarray, nprobe: int) -> List[Tuple[int, int]]:
+        if self.centroids is None:
+            return [(0, len(self.ids))]
+        nearest = np.argsort(-(self.centroids @ query))[:nprobe]
+        return [(int(self.offsets[c]), int(self.offsets[c + 1])) for c in nearest if self.offsets[c + 1] > self.offsets[c]]
+
+    def search(self, queries, k: int = 10, nprobe: int = IVF_NPROBE) -> List[List[Tuple[str, float]]]:
+        """Top-k (id, cosine similarity) per query"""
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if not self.ids:
+            return [[] for _ in queries]
+
+        results = []
+        if self.centroids is None:
+            scores = self._scores(queries, 0, len(self.ids))
+            for row_scores in scores:
+                results.append(self._top_k(row_scores, np.arange(len(self.ids)), k))
+            return results
+
+        for query in queries:
+            ranges = self._ranges(query, nprobe)
+            rows = np.concatenate([np.arange(start, end) for start, end in ranges]) if ranges else np.array([], dtype=np.int64)
+            scores = np.concatenate([self._scores(query[None, :], start, end)[0] for start, end in ranges]) if ranges else np.array([])
+            results.append(self._top_k(scores, rows, k))
+        return results
+
+    def _top_k(self, scores: np.ndarray, rows: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        if len(scores) == 0:
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[rows[i]], float(scores[i])) for i in top]
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """Dequantized vectors for the given ids (e.g. for MMR)"""
+        rows = [self.row_of[chunk_id] for chunk_id in ids]
+        vectors = np.asarray(self.vectors[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= np.asarray(self.scales[rows])[:, None]
+        return vectors
+
+
+def load_chroma_embeddings(collection, batch_size: int = 5000) -> Tuple[List[str], np.ndarray]:
+    """Every (id, embedding) in a chromadb collection"""
+    ids, vectors = [], []
+    offset = 0
+    while True:
+        batch = collection.get(include=['embeddings'], limit=batch_size, offset=offset)
+        if not batch['ids']:
+            break
+        ids.extend(batch['ids'])
+        vectors.append(np.asarray(batch['embeddings'], dtype=np.float32))
+        offset += len(batch['ids'])
+    return ids, (np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32))
+
+
+def build_from_chroma(collection, path: str = MEMMAP_STORE_DIR, dtype: str = MEMMAP_DTYPE, nlist: int = 0) -> MemmapVectorStore:
+    ids, vectors = load_chroma_embeddings(collection)
+    return MemmapVectorStore.build(path, ids, vectors, dtype=dtype, nlist=nlist)
@@ -0,0 +1,142 @@
+# SQLite store for scraped visa results, keyed by (passport country, destination country)
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Optional
+
+VISA_CACHE_DB = "scraped_data/visa_cache.sqlite3"
+LEGACY_VISA_CACHE_FILE = "scraped_data/visa_requirements.json"
+VISA_CACHE_TTL = int(os.getenv("VISA_CACHE_TTL", str(30 * 24 * 3600)))  # visa rules rarely change within a month
+
+
+class VisaCache:
+    """
+    Embedded key/value store for visa results.
+    WAL mode lets several workers read while one writes; each thread gets its own connection.
+    """
+
+    def __init__(self, db_path: str = VISA_CACHE_DB, default_ttl: int = VISA_CACHE_TTL,
+                 legacy_json: Optional[str] = LEGACY_VISA_CACHE_FILE):
+        self.db_path = db_path
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # a miss here means the scraping sources (visaindex, then Selenium) run
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS visa_cache (
+                    passport_country TEXT NOT NULL,
+                    destination_country TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    cached_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (passport_country, destination_country)
+                ) WITHOUT ROWID
+            """)
+
+        # first run after upgrading: carry over the old JSON cache
+        if legacy_json and os.path.exists(legacy_json) and self.count() == 0:
+            imported = self.import_json(legacy_json)
+            print(f"Imported {imported} visa entries from {legacy_json}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(country) -> str:
+        if isinstance(country, (list, tuple)):
+            country = ", ".join(country)
+        return str(country).strip().lower()
+
+    def get(self, passport_country: str, destination_country: str) -> Optional[Dict[str, Any]]:
+        """Cached visa info for the pair, None when missing or expired"""
+        row = self._connection().execute(
+            "SELECT data, cached_at, expires_at FROM visa_cache WHERE passport_country = ? AND destination_country = ?",
+            (self._key(passport_country), self._key(destination_country))
+        ).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+
+        data, cached_at, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self._count('expired')
+            return None
+
+        self._count('hits')
+        visa_info = json.loads(data)
+        visa_info['cached_at'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(cached_at))
+        return visa_info
+
+    def put(self, passport_country: str, destination_country: str, visa_info: Dict[str, Any],
+            ttl: Optional[int] = None, cached_at: Optional[float] = None):
+        """Insert or replace the entry for the pair, ttl=0 keeps it forever"""
+        ttl = self.default_ttl if ttl is None else ttl
+        cached_at = time.time() if cached_at is None else cached_at
+        expires_at = cached_at + ttl if ttl else None
+
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                INSERT INTO visa_cache (passport_country, destination_country, data, cached_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (passport_country, destination_country) DO UPDATE SET
+                    data = excluded.data, cached_at = excluded.cached_at, expires_at = excluded.expires_at
+            """, (self._key(passport_country), self._key(destination_country),
+                  json.dumps(visa_info, ensure_ascii=False), cached_at, expires_at))
+
+    def import_json(self, filename: str, default_passport: str = "India", ttl: Optional[int] = None) -> int:
+        """Bulk load a {destination: visa_info} JSON file like scraped_data/visa_requirements.json"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            data_cache = json.load(f)
+
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        rows = []
+        for destination, visa_info in data_cache.items():
+            passport = visa_info.get('passport_country') or default_passport
+            rows.append((self._key(passport), self._key(destination),
+                         json.dumps(visa_info, ensure_ascii=False), now, now + ttl if ttl else None))
+
+        conn = self._connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO visa_cache (passport_country, destination_country, data, cached_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (passport_country, destination_country) DO NOTHING
+            """, rows)
+        return len(rows)
+
+    def purge_expired(self) -> int:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM visa_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        return cursor.rowcount
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM visa_cache").fetchone()[0]
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.counters.values())
+        return {
+            'name': 'visa',
+            'entries': self.count(),
+            **self.counters,
+            'hit_ratio': round(self.counters['hits'] / lookups, 4) if lookups else 0.0
+        }
@@ -1,19 +1,33 @@
 # api calling not working for visa requirements and safety ratings, I can use web scraping for that
-from fileinput import filename
 import requests
 from bs4 import BeautifulSoup
 import os
 import json
 import time
-from typing import Dict, Any
-from models.llm_generator import build_llm
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable
+from models.llm_generator import get_llm
 from data.visa_data_class import ExtractedVisaInfo
 from selenium import webdriver
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from geopy.geocoders import Nominatim
+from tools.gazetteer import Gazetteer
+from tools.visa_cache import VisaCache
+from tools.page_pruner import prune_page_text
+from tools.browser_pool import BrowserPool, BROWSER_POOL_SIZE, BROWSER_PREWARM
+from tools.telemetry import register_stats, span
+
+VISA_RESULT_TIMEOUT = 20
+VISA_SOURCES_DEADLINE = float(os.getenv("VISA_SOURCES_DEADLINE", "45"))
+VISA_CONFIDENT_LEVEL = 0.8
+VISA_SOURCE_WORKERS = int(os.getenv("VISA_SOURCE_WORKERS", "8"))
+VISAINDEX_BASE_URL = os.getenv("VISAINDEX_BASE_URL", "https://visaindex.com").rstrip('/')
+# the Selenium source needs a local Chrome, set to 0 where there is none
+VISA_INTERACTIVE_SOURCE = os.getenv("VISA_INTERACTIVE_SOURCE", "1") != "0"
 
 class LLMWebScrapper:
 
@@ -24,8 +38,13 @@ class LLMWebScrapper:
 
         self.session = requests.Session()
         self.session.headers.update(self.headers)
-        self.llm = build_llm()
-        self.structured_visa_llm = self.llm.with_structured_output(ExtractedVisaInfo)
+        self._structured_visa_llm = None
+        self._gazetteer = None
+        self._lazy_lock = threading.Lock()
+        self.visa_cache = VisaCache()
+        register_stats("cache", "visa", self.visa_cache.stats)
+        # sources that miss the deadline keep running here and still fill the cache
+        self.source_executor = ThreadPoolExecutor(max_workers=VISA_SOURCE_WORKERS, thread_name_prefix="visa-source")
 
         self.chrome_options = webdriver.ChromeOptions()
         self.chrome_options.add_argument('--headless')
@@ -40,12 +59,37 @@ class LLMWebScrapper:
         self.chrome_options.add_argument(f"user-agent={self.headers['User-Agent']}")
         self.chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
         self.chrome_options.add_experimental_option('useAutomationExtension', False)
+
+        # warm Chrome sessions shared by concurrent interactive lookups
+        self.browser_pool = BrowserPool(self.chrome_options, size=BROWSER_POOL_SIZE)
+        if BROWSER_PREWARM:
+            self.browser_pool.prewarm(BROWSER_PREWARM)
     
+    @property
+    def structured_visa_llm(self):
+        # extraction is deterministic, so identical page content is answered from the LLM cache
+        with self._lazy_lock:
+            if self._structured_visa_llm is None:
+                self._structured_visa_llm = get_llm(temperature=0, cache=True).with_structured_output(ExtractedVisaInfo)
+            return self._structured_visa_llm
+
+    @property
+    def gazetteer(self):
+        with self._lazy_lock:
+            if self._gazetteer is None:
+                with span("gazetteer.load", kind="startup"):
+                    self._gazetteer = Gazetteer()
+            return self._gazetteer
+
     # Main callable function that inturn calls the other 2 functions
-    def scrape_visa_requirements(self, destination_country: str, passport_country: str = "India") -> Dict[str, Any]:
+    def scrape_visa_requirements(self, destination_country: str, passport_country: str = "India",
+                                 deadline: float = VISA_SOURCES_DEADLINE, return_on_confident: bool = False) -> Dict[str, Any]:
+        """
+        Runs both visa sources in parallel and returns whatever finished within `deadline` seconds.
+        With return_on_confident the first source reaching VISA_CONFIDENT_LEVEL ends the wait early.
+        """
         
         source_data = []
-        filename = f"scraped_data/visa_requirements.json"
 
         # resolving the country name if the city name is given
         dest_input = destination_country.strip()
@@ -53,7 +97,7 @@ class LLMWebScrapper:
         origin_country = self.city_to_country(passport_country.strip())
 
         # checking the previously cached data
-        cached_data = self.load_visa_info_from_cache(filename, dest_country)
+        cached_data = self.load_visa_info_from_cache(origin_country, dest_country)
         if cached_data:
             return {
             'destination_country': destination_country,
@@ -67,33 +111,76 @@ class LLMWebScrapper:
             'cache_hit': True
         }
 
-        visa_index_data = self.scrape_visa_index(dest_country, origin_country)
-        if visa_index_data and 'error' not in visa_index_data:
-            source_data.append({
-                'source': 'visa_index_static',
-                'data': visa_index_data
-            })
-        interactive_visa_data = self.check_visa_requirements(dest_country, origin_country)
-        if interactive_visa_data and 'error' not in interactive_visa_data:
-            source_data.append({
-                'source': 'visa_index_interactive',
-                'data': interactive_visa_data
-            })
+        sources = {'visa_index_static': self.scrape_visa_index}
+        if VISA_INTERACTIVE_SOURCE:
+            sources['visa_index_interactive'] = self.check_visa_requirements
+        started = time.perf_counter()
+        source_data, source_timings = self.run_visa_sources(sources, dest_country, origin_country,
+                                                            deadline, return_on_confident)
 
         return {
             'destination_country': destination_country,
             'passport_country': passport_country,
             'sources': source_data,
             'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-            'total_sources': len(source_data)
+            'total_sources': len(source_data),
+            'completed_sources': [name for name, timing in source_timings.items() if timing['status'] == 'ok'],
+            'source_timings': source_timings,
+            'elapsed_seconds': round(time.perf_counter() - started, 3)
         }
 
+    def run_visa_sources(self, sources: Dict[str, Callable], dest_country: str, origin_country: str,
+                         deadline: float, return_on_confident: bool = False):
+        """Launch every source on the shared executor and collect results until the deadline"""
+
+        def timed(source_fn):
+            source_start = time.perf_counter()
+            result = source_fn(dest_country, origin_country)
+            return result, time.perf_counter() - source_start
+
+        # each source runs in the caller's context so its spans land in the same turn
+        futures = {self.source_executor.submit(contextvars.copy_context().run, timed, source_fn): name
+                   for name, source_fn in sources.items()}
+        source_timings = {name: {'status': 'timed_out', 'elapsed_seconds': None} for name in sources}
+        results = {}
+
+        stop_at = time.monotonic() + deadline
+        pending = set(futures)
+        while pending:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+            confident = False
+            for future in done:
+                name = futures[future]
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    print(f"ERROR in {name}: {e}")
+                    source_timings[name] = {'status': 'error', 'elapsed_seconds': None}
+                    continue
+
+                status = 'ok' if result and 'error' not in result else 'error'
+                source_timings[name] = {'status': status, 'elapsed_seconds': round(elapsed, 3)}
+                if status == 'ok':
+                    results[name] = result
+                    if (result.get('confidence_level') or 0) >= VISA_CONFIDENT_LEVEL:
+                        confident = True
+
+            if return_on_confident and confident:
+                for future in pending:
+                    future.cancel()
+                    source_timings[futures[future]]['status'] = 'skipped'
+                break
+
+        # keep the static source first, as before
+        source_data = [{'source': name, 'data': results[name]} for name in sources if name in results]
+        return source_data, source_timings
+
     def scrape_visa_index (self, dest_country: str, origin_country: str) -> Dict[str, Any]:
         
-        output_dir = "scraped_data"
-        os.makedirs(output_dir, exist_ok=True)
-        filename = f"{output_dir}/visa_requirements.json"
-        
         try:
             
             country_slug = None
@@ -106,15 +193,19 @@ class LLMWebScrapper:
             else:
                 country_slug = dest_country.lower().replace(" ", "-")
 
-            url = f"https://visaindex.com/visa/{country_slug}-visa/"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            url = f"{VISAINDEX_BASE_URL}/visa/{country_slug}-visa/"
+            with span("http.visaindex", kind="http", url=url) as current:
+                response = self.session.get(url, timeout=15)
+                if current is not None:
+                    current.set(status_code=response.status_code)
+                response.raise_for_status()
 
             soup = BeautifulSoup(response.text, 'html.parser')
             for element in soup(['script', 'style', 'nav', 'footer']):
                 element.decompose()
             
-            page_content = soup.get_text(separator='\n', strip=True)
+            # only the visa-relevant sections go to the LLM
+            page_content = prune_page_text(soup, origin_country, dest_country)
 
             print("Processing content with LLM...")
             visa_info = self.structured_visa_llm.invoke(f"""
@@ -131,8 +222,7 @@ class LLMWebScrapper:
 
             visa_info_dict = visa_info.dict() if hasattr(visa_info, 'dict') else dict(visa_info)
             
-            country_key = dest_country
-            self.save_visa_info(filename, country_key, visa_info_dict)
+            self.save_visa_info(origin_country, dest_country, visa_info_dict)
 
             return visa_info_dict
         
@@ -142,39 +232,47 @@ class LLMWebScrapper:
     
     def check_visa_requirements(self, dest_country: str, origin_country: str) -> Dict[str, Any]:
 
-        driver = webdriver.Chrome(options=self.chrome_options)
-        
         try:
-            url = f"https://visaindex.com/"
-            driver.get(url)
-            wait = WebDriverWait(driver, 10)
-            try: 
-                initial_button = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div/div[2]/button")))
-                initial_button.click()
-            except Exception as e:
-                print(f"ERROR in check_visa_requirements: {e}")
-                print("Initial pop-up button not found or not needed.")
-
-            passport_dropdown = wait.until(EC.element_to_be_clickable((By.ID, "passport_to")))
-            select_passport = Select(passport_dropdown)
-            select_passport.select_by_visible_text(origin_country)
-
-            destination_dropdown = wait.until(EC.element_to_be_clickable((By.ID, "passport_from")))
-            select_destination = Select(destination_dropdown)
-            select_destination.select_by_visible_text(dest_country)
-
-            submit_button = driver.find_element(By.XPATH, "/html/body/div[4]/div/div[2]/div[3]/button")
-            submit_button.click()
-
-            time.sleep(8)
-
-            visa_page_source = driver.page_source
+            with span("selenium.visaindex", kind="selenium", destination=dest_country), \
+                    self.browser_pool.session() as driver:
+                url = f"{VISAINDEX_BASE_URL}/"
+                driver.get(url)
+                wait = WebDriverWait(driver, 10)
+
+                # the pop-up only shows on a fresh browser profile, warm sessions skip the wait
+                if not getattr(driver, 'visa_popup_dismissed', False):
+                    try: 
+                        initial_button = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div/div[2]/button")))
+                        initial_button.click()
+                    except Exception as e:
+                        print(f"ERROR in check_visa_requirements: {e}")
+                        print("Initial pop-up button not found or not needed.")
+                    driver.visa_popup_dismissed = True
+
+                passport_dropdown = wait.until(EC.element_to_be_clickable((By.ID, "passport_to")))
+                select_passport = Select(passport_dropdown)
+                select_passport.select_by_visible_text(origin_country)
+
+                destination_dropdown = wait.until(EC.element_to_be_clickable((By.ID, "passport_from")))
+                select_destination = Select(destination_dropdown)
+                select_destination.select_by_visible_text(dest_country)
+
+                submit_button = driver.find_element(By.XPATH, "/html/body/div[4]/div/div[2]/div[3]/button")
+                submit_button.click()
+
+                # wait for the result page to replace the form instead of sleeping a fixed 8s
+                result_wait = WebDriverWait(driver, VISA_RESULT_TIMEOUT)
+                result_wait.until(lambda d: d.current_url.rstrip('/') != url.rstrip('/') or EC.staleness_of(submit_button)(d))
+                result_wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+                visa_page_source = driver.page_source
+
             soup = BeautifulSoup(visa_page_source, 'html.parser')
 
             for element in soup(['script', 'style', 'nav', 'footer', 'header']):
                 element.decompose()
         
-            content_text = soup.get_text(separator='\n', strip=True)
+            content_text = prune_page_text(soup, origin_country, dest_country)
 
             visa_info = self.structured_visa_llm.invoke(f"""
             Extract visa requirement information for {origin_country} citizens traveling to {dest_country} from this webpage:
@@ -185,78 +283,26 @@ class LLMWebScrapper:
         except Exception as e:
             print(f"ERROR in check_visa_requirements: {e}")
             return {'error': f'VisaIndex (interactive) scraping failed: {str(e)}'}
-        finally:
-            driver.quit()
-
-    def save_visa_info(self, filename, country_key, visa_info_dict):
-
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                try:
-                    data_cache = json.load(f)
-                except Exception:
-                    data_cache = {}
-        else:
-            data_cache = {}
-
-        country_key_lc = country_key.strip().lower()
-        if country_key_lc not in data_cache:
-            data_cache[country_key_lc] = visa_info_dict
 
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data_cache, f, ensure_ascii=False, indent=4)
-        else:
-            print(f"Data for {country_key_lc} already present—no write needed.")
+    def save_visa_info(self, passport_country, dest_country, visa_info_dict):
+        """Upsert the result for this passport/destination pair"""
+        try:
+            self.visa_cache.put(passport_country, dest_country, visa_info_dict)
+        except Exception as e:
+            print(f"Error writing cache: {e}")
 
     def city_to_country(self, city_input: str) -> str:
-        geolocator = Nominatim(user_agent="my_travel_agent")
+        """Resolve a city (or comma separated cities) to its country, offline first"""
+        return self.gazetteer.city_to_country(city_input)
     
-    # Check if input contains multiple cities (comma-separated)
-        if ',' in city_input:
-            cities = [city.strip() for city in city_input.split(',')]
-            countries = []
-            
-            for city in cities:
-                location = geolocator.geocode(city, addressdetails=True, language='en')
-                if location and 'country' in location.raw['address']:
-                    country = location.raw['address']['country']
-                    countries.append(country)
-                else:
-                    countries.append(city)  # fallback to input city
-            
-            # Return the most common country (since all cities are in same country)
-            # Or return first country if all are the same
-            unique_countries = list(set(countries))
-            if len(unique_countries) == 1:
-                return unique_countries[0]
-            else:
-                # Multiple countries - return the first one or handle as needed
-                return unique_countries
-        
-        else:
-            # Single city - existing logic
-            location = geolocator.geocode(city_input, addressdetails=True, language='en')
-            if location and 'country' in location.raw['address']:
-                return location.raw['address']['country']
-            return city_input
-    
-    def load_visa_info_from_cache(self, filename, country_key):
-        """Load visa info from cache if it exists"""
-        if not os.path.exists(filename):
-            return None
-        
+    def load_visa_info_from_cache(self, passport_country, dest_country):
+        """Load visa info from cache if it exists and has not expired"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data_cache = json.load(f)
-            
-            country_key_lc = country_key.strip().lower()
-            
-            if country_key_lc in data_cache:
-                print(f"Found cached visa data for: {country_key}")
-                return data_cache[country_key_lc]
-            else:
-                return None
-                
+            cached_data = self.visa_cache.get(passport_country, dest_country)
         except Exception as e:
             print(f"Error reading cache: {e}")
-            return None
\ No newline at end of file
+            return None
+
+        if cached_data:
+            print(f"Found cached visa data for: {passport_country} -> {dest_country}")
+        return cached_data